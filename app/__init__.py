@@ -6,6 +6,7 @@ try:
 except ImportError:  # pragma: no cover
     pass
 import logging
+from datetime import datetime
 from logging.handlers import RotatingFileHandler
 from flask import Flask
 from flask_socketio import SocketIO
@@ -65,6 +66,9 @@ def create_app(test_config=None):
     # Register blueprints
     register_blueprints(app)
     
+    # Register CLI commands
+    register_commands(app)
+    
     # Initialize extensions
     init_extensions(app)
     
@@ -122,11 +126,26 @@ def register_blueprints(app):
     
     return app
 
+def register_commands(app):
+    """Register Flask CLI commands"""
+    import click
+    
+    @app.cli.command('rebuild-stats')
+    def rebuild_stats():
+        """Rebuild the execution_daily_stats rollup from execution history."""
+        from app.models.execution_stats_orm import ExecutionDailyStatsORM
+        
+        rows = ExecutionDailyStatsORM.rebuild()
+        click.echo(f"Rebuilt execution daily stats: {rows} rows")
+    
+    return app
+
 def init_services(app):
     """Initialize application services"""
     # Import service instances
     from app.services import (
-        script_service, aws_service, execution_service
+        script_service, aws_service, execution_service, dashboard_service, setting_adapter,
+        user_adapter
     )
     
     # Import and initialize scheduler service
@@ -136,20 +155,33 @@ def init_services(app):
     execution_service.set_socketio(socketio)
     execution_service.set_flask_app(app)
     
+    # Configure the in-memory dashboard state
+    dashboard_service.init_app(app)
+    
+    # Configure the settings cache, announcing changes to other workers
+    setting_adapter.init_app(app)
+    setting_adapter.set_socketio(socketio)
+    
+    # Configure the cache of logged-in users
+    user_adapter.init_app(app)
+    
+    # Configure the cache of boto3 sessions and clients
+    aws_service.init_app(app)
+    
     # Initialize the scheduler
     def run_script_wrapper(script_id, profile_id, user_id, parameters=None, job_id=None):  # pragma: no cover
         """Wrapper for scheduler to run scripts"""
-        # The scheduler context needs the app context
-        # Store app reference for later use in thread
-        from app.services.execution_service import ExecutionService
+        # Only queue the run, so the scheduler's pool is free for the next job;
+        # the execution service starts queued runs in batches
+        from app.services.scheduler_executor import get_scheduled_run_time
         
-        with app.app_context():
-            # Pass the app context explicitly when running from scheduler
-            return execution_service.run_script(
-                script_id, profile_id, user_id, 
-                parameters, is_scheduled=1, 
-                job_id=job_id  # Pass job_id to execution service
-            )
+        execution_service.enqueue_scheduled_run(
+            script_id, profile_id, user_id, parameters,
+            job_id=job_id,
+            # Measure the scheduling lag from the time the job was due to fire
+            scheduled_at=get_scheduled_run_time(),
+            dispatched_at=datetime.now()
+        )
     
     scheduler_service.init_app(app, run_script_wrapper)
     
@@ -157,9 +189,16 @@ def init_services(app):
 
 def init_extensions(app):
     """Initialize Flask extensions"""
-    # Initialize SocketIO with the app
-    socketio.init_app(app, cors_allowed_origins="*", async_mode="eventlet", manage_session=False)
-    
+    # Initialize SocketIO with the app, using a message queue when one is
+    # configured so that emits reach clients connected to any worker
+    from app.utils.socketio_manager import create_client_manager
+    socketio.init_app(app, cors_allowed_origins="*", async_mode="eventlet", manage_session=False,
+                      client_manager=create_client_manager(app))
+
+    # Register Socket.IO room subscription handlers
+    from app.routes.socket_events import register_socket_events
+    register_socket_events(socketio)
+
     # Initialize CSRF protection
     csrf.init_app(app)
     
@@ -21,9 +21,9 @@ def login_required(f):
             flash('Please log in to access this page', 'warning')
             return redirect(url_for('views.login'))
         
-        # Additional check for user validity
-        from app.models import UserORM
-        user = UserORM.get_by_id(session['user_id'])
+        # Additional check for user validity (cached briefly per process)
+        from app.services.user_adapter import user_adapter
+        user = user_adapter.get_session_user(session['user_id'])
         
         if not user:
             # Session refers to a user that no longer exists
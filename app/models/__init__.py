@@ -4,10 +4,13 @@ from app.models.user_orm import UserORM
 from app.models.script_orm import ScriptORM
 from app.models.aws_profile_orm import AWSProfileORM
 from app.models.execution_orm import ExecutionORM
+from app.models.execution_stats_orm import ExecutionDailyStatsORM
+from app.models.execution_timing_orm import ExecutionTimingORM
 from app.models.setting_orm import SettingORM
-from app.models.scheduler_orm import ScheduleORM
+from app.models.scheduler_orm import ScheduleORM, SchedulerLeaseORM
 
 __all__ = [
     # ORM models 
-    'UserORM', 'ScriptORM', 'AWSProfileORM', 'ExecutionORM', 'SettingORM', 'ScheduleORM'
+    'UserORM', 'ScriptORM', 'AWSProfileORM', 'ExecutionORM', 'ExecutionDailyStatsORM', 'ExecutionTimingORM',
+    'SettingORM', 'ScheduleORM', 'SchedulerLeaseORM'
 ]
\ No newline at end of file
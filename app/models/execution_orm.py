@@ -1,6 +1,11 @@
 import json
-from datetime import datetime
+from datetime import date, datetime, timedelta
 from app.utils.db import db
+from app.models.execution_stats_orm import ExecutionDailyStatsORM
+from app.utils.timestamps import EpochMillis, local_date, to_epoch_ms
+
+# Appended to the output of a cancelled execution
+CANCEL_MESSAGE = '\n[SYSTEM] Script execution was cancelled by user.'
 
 class ExecutionORM(db.Model):
     """SQLAlchemy ORM model for execution_history table"""
@@ -12,13 +17,28 @@ class ExecutionORM(db.Model):
     aws_profile_id = db.Column(db.Integer, db.ForeignKey('aws_profiles.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=True)
     status = db.Column(db.String(20), default="Pending")
-    start_time = db.Column(db.String(40), nullable=True)
-    end_time = db.Column(db.String(40), nullable=True)
+    start_time = db.Column(EpochMillis, nullable=True)
+    end_time = db.Column(EpochMillis, nullable=True)
+    duration_ms = db.Column(db.BigInteger, nullable=True)
     output = db.Column(db.Text, nullable=True)
     ai_analysis = db.Column(db.Text, nullable=True)
     ai_solution = db.Column(db.Text, nullable=True)
     parameters = db.Column(db.Text, nullable=True)
     is_scheduled = db.Column(db.Integer, default=0)
+    schedule_id = db.Column(db.Integer, nullable=True)  # Schedule that started the execution
+    
+    # Local date of start_time, kept in sync by _track_times so it can be indexed
+    start_date = db.Column(db.String(10), nullable=True)
+    
+    # Indexes for the history filters, the hung execution check, the stats
+    # and the last runs of schedules
+    __table_args__ = (
+        db.Index('ix_execution_history_status_start_time', status, start_time),
+        db.Index('ix_execution_history_script_id_id', script_id, id.desc()),
+        db.Index('ix_execution_history_user_id_id', user_id, id.desc()),
+        db.Index('ix_execution_history_start_date', start_date),
+        db.Index('ix_execution_history_schedule_id_id', schedule_id, id.desc()),
+    )
     
     # Define relationships
     script = db.relationship('ScriptORM', backref=db.backref('executions', passive_deletes=True))
@@ -26,7 +46,7 @@ class ExecutionORM(db.Model):
     
     def __init__(self, script_id=None, aws_profile_id=None, user_id=None,
                  status="Pending", start_time=None, end_time=None, output=None,
-                 ai_analysis=None, ai_solution=None, parameters=None, is_scheduled=0):
+                 ai_analysis=None, ai_solution=None, parameters=None, is_scheduled=0, schedule_id=None):
         """Initialize a new execution"""
         self.script_id = script_id
         self.aws_profile_id = aws_profile_id
@@ -39,6 +59,23 @@ class ExecutionORM(db.Model):
         self.ai_solution = ai_solution
         self.parameters = parameters
         self.is_scheduled = is_scheduled
+        self.schedule_id = schedule_id
+    
+    @db.validates('start_time', 'end_time')
+    def _track_times(self, key, value):
+        """Keep start_date and duration_ms in sync with the start and end times"""
+        start_time = value if key == 'start_time' else self.start_time
+        end_time = value if key == 'end_time' else self.end_time
+        
+        if key == 'start_time':
+            self.start_date = local_date(value)
+        
+        if start_time and end_time:
+            self.duration_ms = to_epoch_ms(end_time) - to_epoch_ms(start_time)
+        else:
+            self.duration_ms = None
+        
+        return value
     
     @classmethod
     def get_by_id(cls, execution_id):
@@ -92,8 +129,26 @@ class ExecutionORM(db.Model):
         return result
     
     @classmethod
-    def get_history(cls, page=1, per_page=10, filters=None):
-        """Get execution history with pagination and filters"""
+    def get_recent_summaries(cls, limit=10):
+        """Get recent executions without their output, for the dashboard"""
+        executions = cls.query.order_by(cls.id.desc()).limit(limit).all()
+        return [execution.to_summary_dict() for execution in executions]
+    
+    @classmethod
+    def get_statuses_started_between(cls, start, end, statuses=None):
+        """Get (id, status) pairs of executions started in the [start, end) range, optionally in given statuses"""
+        query = db.session.query(cls.id, cls.status).filter(
+            cls.start_time >= start,
+            cls.start_time < end
+        )
+        if statuses:
+            query = query.filter(cls.status.in_(statuses))
+        rows = query.all()
+        return [(row.id, row.status) for row in rows]
+    
+    @classmethod
+    def filter_history(cls, filters=None):
+        """Build the execution history query for the given filters, newest first"""
         # Start with base query
         query = cls.query
         
@@ -106,103 +161,120 @@ class ExecutionORM(db.Model):
                 query = query.filter(cls.status == filters['status'])
             
             if 'date' in filters and filters['date']:
-                query = query.filter(db.func.date(cls.start_time) == filters['date'])
+                query = query.filter(cls.start_date == filters['date'])
             
             if 'user_id' in filters and filters['user_id']:
                 query = query.filter(cls.user_id == filters['user_id'])
         
+        return query.order_by(cls.id.desc())
+    
+    @classmethod
+    def count_history(cls, filters=None):
+        """Count the executions matching the history filters"""
+        return cls.filter_history(filters).order_by(None).count()
+    
+    @classmethod
+    def get_history(cls, page=1, per_page=10, filters=None, total_count=None):
+        """
+        Get execution history with pagination and filters
+        
+        Args:
+            page (int): Page number, starting at 1
+            per_page (int): Executions per page
+            filters (dict): History filters
+            total_count (int): Known number of matching executions; counted
+                               when not provided
+        """
+        query = cls.filter_history(filters)
+        
         # Get total count for pagination
-        total_count = query.count()
+        if total_count is None:
+            total_count = cls.count_history(filters)
         total_pages = (total_count + per_page - 1) // per_page
         
         # Get paginated results
-        executions = query.order_by(cls.id.desc()).paginate(page=page, per_page=per_page)
-        
-        # Prepare result
-        result = []
-        for execution in executions.items:
-            execution_dict = execution.to_dict()
-            
-            # Add related data
-            if execution.script:
-                execution_dict['script_name'] = execution.script.name
-            
-            if execution.aws_profile:
-                execution_dict['aws_profile_name'] = execution.aws_profile.name
-            
-            if execution.user:
-                execution_dict['username'] = execution.user.username
-                
-            result.append(execution_dict)
+        executions = query.paginate(page=page, per_page=per_page, count=False).items
         
         return {
-            'executions': result,
+            'executions': [execution.to_history_dict() for execution in executions],
             'current_page': page,
             'total_pages': total_pages,
-            'total_count': total_count
+            'total_count': total_count,
+            'next_before_id': executions[-1].id if executions and page < total_pages else None
         }
     
     @classmethod
-    def get_stats(cls, days=7):
-        """Get execution statistics for the dashboard chart"""
-        # Calculate stats by date and status
-        stats = db.session.query(
-            db.func.date(cls.start_time).label('execution_date'),
-            cls.status,
-            db.func.count().label('count')
-        ).filter(
-            cls.start_time.isnot(None),
-            cls.start_time >= db.func.datetime('now', f'-{days} days')
-        ).group_by(
-            db.func.date(cls.start_time),
-            cls.status
-        ).order_by(
-            db.func.date(cls.start_time)
-        ).all()
-        
-        # Get unique dates
-        dates = db.session.query(
-            db.func.date(cls.start_time).label('execution_date')
-        ).filter(
-            cls.start_time.isnot(None),
-            cls.start_time >= db.func.datetime('now', f'-{days} days')
-        ).group_by(
-            db.func.date(cls.start_time)
-        ).order_by(
-            db.func.date(cls.start_time)
-        ).all()
-        
-        # Prepare data for chart
-        chart_data = []
-        for date_row in dates:
-            date_str = date_row.execution_date
+    def get_history_before(cls, before_id=None, per_page=10, filters=None):
+        """
+        Get a page of execution history older than a given execution.
+        
+        Seeks through the primary key instead of skipping rows, so every page
+        costs the same however far back it is.
+        
+        Args:
+            before_id (int): Only executions with a lower ID; None for the newest
+            per_page (int): Executions per page
+            filters (dict): History filters
             
-            # Create entry for this date
-            date_entry = {
+        Returns:
+            dict: 'executions', 'has_more' and 'next_before_id', the cursor
+                  for the following page
+        """
+        query = cls.filter_history(filters)
+        if before_id:
+            query = query.filter(cls.id < before_id)
+        
+        # Fetch one extra row to know whether there is a following page
+        executions = query.limit(per_page + 1).all()
+        has_more = len(executions) > per_page
+        executions = executions[:per_page]
+        
+        return {
+            'executions': [execution.to_history_dict() for execution in executions],
+            'has_more': has_more,
+            'next_before_id': executions[-1].id if has_more else None
+        }
+    
+    @classmethod
+    def get_stats(cls, days=7):
+        """Get execution statistics for the dashboard chart from the daily rollup"""
+        since = (date.today() - timedelta(days=days - 1)).isoformat()
+        
+        # Prepare data for chart, one entry per date
+        chart_data = {}
+        for date_str, status, count in ExecutionDailyStatsORM.get_daily_counts(since):
+            date_entry = chart_data.setdefault(date_str, {
                 'date': date_str,
                 'Success': 0,
                 'Failed': 0,
                 'Running': 0,
                 'Cancelled': 0
-            }
-            
-            # Fill counts for each status
-            for stat in stats:
-                if stat.execution_date == date_str:
-                    date_entry[stat.status] = stat.count
-            
-            chart_data.append(date_entry)
+            })
+            date_entry[status] = count
         
-        return chart_data
+        return list(chart_data.values())
+    
+    def add(self):
+        """Add a new execution to the session and count it in the daily stats, without committing"""
+        db.session.add(self)
+        ExecutionDailyStatsORM.record_transition(
+            self.start_date, self.script_id, None, self.status, duration=self.duration_ms
+        )
     
     def save(self):
         """Save the execution to the database"""
-        db.session.add(self)
+        # Count a new execution in the daily stats
+        if self.id is None:
+            self.add()
+        else:
+            db.session.add(self)
+        
         db.session.commit()
         return self.id
     
     def update_status(self, status, output=None):
-        """Update the status of the execution"""
+        """Update the status of the execution, returning the status it replaced"""
+        previous_status, previous_duration = self.status, self.duration_ms
         self.status = status
         
         # Set end time if completed
@@ -213,7 +285,9 @@ class ExecutionORM(db.Model):
         if output is not None:
             self.output = output if self.output is None else self.output + output
         
+        self._record_transition(previous_status, previous_duration)
         db.session.commit()
+        return previous_status
     
     def append_output(self, output):
         """Append output to the execution"""
@@ -226,20 +300,36 @@ class ExecutionORM(db.Model):
         self.ai_solution = solution
         db.session.commit()
     
-    def cancel(self):
-        """Cancel the execution"""
+    def cancel(self, output=CANCEL_MESSAGE):
+        """
+        Cancel the execution
+        
+        Args:
+            output (str): Message appended to the output, or None when the
+                          thread running the execution saves the message
+        """
         if self.status != 'Running':
             return False
         
+        previous_status, previous_duration = self.status, self.duration_ms
         self.status = 'Cancelled'
         self.end_time = datetime.now().isoformat()
         
         # Append message to output
-        self.output = (self.output or '') + '\n[SYSTEM] Script execution was cancelled by user.'
+        if output is not None:
+            self.output = (self.output or '') + output
         
+        self._record_transition(previous_status, previous_duration)
         db.session.commit()
         return True
     
+    def _record_transition(self, previous_status, previous_duration):
+        """Apply a status change to the daily stats, in the current transaction"""
+        ExecutionDailyStatsORM.record_transition(
+            self.start_date, self.script_id, previous_status, self.status,
+            previous_duration=previous_duration, duration=self.duration_ms
+        )
+    
     def to_dict(self):
         """Convert Execution object to dictionary"""
         return {
@@ -254,7 +344,46 @@ class ExecutionORM(db.Model):
             'ai_analysis': self.ai_analysis,
             'ai_solution': self.ai_solution,
             'parameters': self.parameters,
-            'is_scheduled': self.is_scheduled
+            'is_scheduled': self.is_scheduled,
+            'schedule_id': self.schedule_id,
+            'start_time_ms': to_epoch_ms(self.start_time),
+            'end_time_ms': to_epoch_ms(self.end_time),
+            'duration_ms': self.duration_ms
+        }
+    
+    def to_history_dict(self):
+        """Convert Execution object to dictionary with script, profile and user names"""
+        execution_dict = self.to_dict()
+        
+        # Add related data
+        if self.script:
+            execution_dict['script_name'] = self.script.name
+        
+        if self.aws_profile:
+            execution_dict['aws_profile_name'] = self.aws_profile.name
+        
+        if self.user:
+            execution_dict['username'] = self.user.username
+        
+        return execution_dict
+    
+    def to_summary_dict(self):
+        """Convert Execution object to a dictionary without output and analysis"""
+        return {
+            'id': self.id,
+            'script_id': self.script_id,
+            'script_name': self.script.name if self.script else None,
+            'aws_profile_id': self.aws_profile_id,
+            'user_id': self.user_id,
+            'username': self.user.username if self.user else None,
+            'status': self.status,
+            'start_time': self.start_time,
+            'end_time': self.end_time,
+            'is_scheduled': self.is_scheduled,
+            'schedule_id': self.schedule_id,
+            'start_time_ms': to_epoch_ms(self.start_time),
+            'end_time_ms': to_epoch_ms(self.end_time),
+            'duration_ms': self.duration_ms
         }
     
     def parse_parameters(self):
@@ -0,0 +1,215 @@
+from app.utils.db import db
+
+# Statuses that count as failures
+FAILURE_STATUSES = ('Failed',)
+
+# Statuses of executions that ran to completion
+FINISHED_STATUSES = ('Success',) + FAILURE_STATUSES
+
+# History filters that can be counted from the rollup
+ROLLUP_FILTERS = {'script_id', 'status', 'date'}
+
+class ExecutionDailyStatsORM(db.Model):
+    """
+    SQLAlchemy ORM model for the execution_daily_stats rollup table.
+
+    Holds the number of executions per start date, script and current
+    status, maintained on every status transition, so statistics are read
+    without scanning execution_history. Executions without a script are
+    counted under script_id 0.
+    """
+
+    __tablename__ = 'execution_daily_stats'
+
+    date = db.Column(db.String(10), primary_key=True)
+    script_id = db.Column(db.Integer, primary_key=True)
+    status = db.Column(db.String(20), primary_key=True)
+    count = db.Column(db.Integer, nullable=False, default=0)
+    total_duration = db.Column(db.BigInteger, nullable=False, default=0)  # Milliseconds
+    failures = db.Column(db.Integer, nullable=False, default=0)
+
+    @classmethod
+    def record_transition(cls, start_date, script_id, previous_status, status,
+                          previous_duration=None, duration=None):
+        """
+        Move an execution from one status to another in the rollup.
+
+        Runs in the caller's transaction, so the rollup is committed together
+        with the status change.
+
+        Args:
+            start_date (str): Local date the execution started on
+            script_id (int): Script of the execution, or None
+            previous_status (str): Status before the transition, None for a new execution
+            status (str): Status after the transition
+            previous_duration (int): Duration counted for the previous status (ms)
+            duration (int): Duration counted for the new status (ms)
+        """
+        if not start_date or (previous_status == status and previous_duration == duration):
+            return
+
+        if previous_status:
+            cls._add(start_date, script_id, previous_status, -1, -(previous_duration or 0))
+        if status:
+            cls._add(start_date, script_id, status, 1, duration or 0)
+
+    @classmethod
+    def _add(cls, date, script_id, status, count, duration):
+        """Add to the counters of a rollup row, creating it if needed"""
+        failures = count if status in FAILURE_STATUSES else 0
+        dialect = db.session.get_bind().dialect.name
+
+        values = dict(date=date, script_id=script_id or 0, status=status,
+                      count=count, total_duration=duration, failures=failures)
+
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            # Backends without INSERT ... ON CONFLICT update the row first
+            updated = cls.query.filter_by(
+                date=date, script_id=script_id or 0, status=status
+            ).update({
+                'count': cls.count + count,
+                'total_duration': cls.total_duration + duration,
+                'failures': cls.failures + failures
+            }, synchronize_session=False)
+            if not updated:
+                db.session.execute(db.insert(cls).values(**values))
+            return
+
+        statement = insert(cls).values(**values)
+        statement = statement.on_conflict_do_update(
+            index_elements=[cls.date, cls.script_id, cls.status],
+            set_={
+                'count': cls.count + statement.excluded.count,
+                'total_duration': cls.total_duration + statement.excluded.total_duration,
+                'failures': cls.failures + statement.excluded.failures
+            }
+        )
+        db.session.execute(statement)
+
+    @classmethod
+    def release_script(cls, script_id):
+        """
+        Move the rollup rows of a script to script_id 0.
+
+        Deleting a script sets script_id of its executions to NULL, so their
+        counts move with them. Runs in the caller's transaction, so the rollup
+        is committed together with the deletion.
+
+        Args:
+            script_id (int): Script being deleted
+        """
+        rows = cls.query.filter_by(script_id=script_id).all()
+        if not rows:
+            return
+
+        moved = [(row.date, row.status, row.count, row.total_duration) for row in rows]
+        cls.query.filter_by(script_id=script_id).delete(synchronize_session=False)
+        for date, status, count, duration in moved:
+            cls._add(date, 0, status, count, duration)
+
+    @classmethod
+    def rebuild(cls):
+        """
+        Recompute the rollup from execution_history.
+
+        Returns:
+            int: Number of rollup rows written
+        """
+        # Import here to avoid circular imports
+        from app.models.execution_orm import ExecutionORM
+
+        rows = db.session.query(
+            ExecutionORM.start_date,
+            db.func.coalesce(ExecutionORM.script_id, 0),
+            ExecutionORM.status,
+            db.func.count(),
+            db.func.coalesce(db.func.sum(ExecutionORM.duration_ms), 0),
+            db.func.sum(db.case((ExecutionORM.status.in_(FAILURE_STATUSES), 1), else_=0))
+        ).filter(
+            ExecutionORM.start_date.isnot(None),
+            ExecutionORM.status.isnot(None)
+        ).group_by(
+            ExecutionORM.start_date,
+            db.func.coalesce(ExecutionORM.script_id, 0),
+            ExecutionORM.status
+        ).all()
+
+        cls.query.delete()
+        db.session.add_all([
+            cls(date=row[0], script_id=row[1], status=row[2], count=row[3],
+                total_duration=row[4], failures=row[5])
+            for row in rows
+        ])
+        db.session.commit()
+
+        return len(rows)
+
+    @classmethod
+    def get_daily_counts(cls, since):
+        """
+        Get execution counts by date and status, across all scripts.
+
+        Args:
+            since (str): First date to include (YYYY-MM-DD)
+
+        Returns:
+            list: (date, status, count) tuples ordered by date
+        """
+        rows = db.session.query(
+            cls.date, cls.status, db.func.sum(cls.count)
+        ).filter(
+            cls.date >= since
+        ).group_by(
+            cls.date, cls.status
+        ).having(
+            db.func.sum(cls.count) > 0
+        ).order_by(
+            cls.date
+        ).all()
+
+        return [(row[0], row[1], row[2]) for row in rows]
+
+    @classmethod
+    def get_average_durations(cls, since=None):
+        """
+        Get the average duration of finished executions of each script.
+
+        Args:
+            since (str): First date to include (YYYY-MM-DD), or None for all dates
+
+        Returns:
+            dict: Average duration in milliseconds by script ID
+        """
+        query = db.session.query(
+            cls.script_id, db.func.sum(cls.total_duration), db.func.sum(cls.count)
+        ).filter(
+            cls.status.in_(FINISHED_STATUSES)
+        )
+        if since:
+            query = query.filter(cls.date >= since)
+
+        rows = query.group_by(cls.script_id).having(db.func.sum(cls.count) > 0).all()
+
+        return {row[0]: row[1] / row[2] for row in rows}
+
+    @classmethod
+    def count_executions(cls, script_id=None, status=None, date=None):
+        """
+        Count executions from the rollup, optionally by script, status and start date.
+
+        Returns:
+            int: Number of executions
+        """
+        query = db.session.query(db.func.coalesce(db.func.sum(cls.count), 0))
+        if script_id:
+            query = query.filter(cls.script_id == script_id)
+        if status:
+            query = query.filter(cls.status == status)
+        if date:
+            query = query.filter(cls.date == date)
+
+        return query.scalar()
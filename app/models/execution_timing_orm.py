@@ -0,0 +1,69 @@
+from app.utils.db import db
+from app.utils.timestamps import EpochMillis, to_epoch_ms
+
+class ExecutionTimingORM(db.Model):
+    """
+    SQLAlchemy ORM model for the execution_timings table.
+
+    Records how late a scheduled execution got going: when the scheduler
+    planned to fire it, and the delays from then until the job was
+    dispatched, the script process started and the first output arrived.
+    """
+
+    __tablename__ = 'execution_timings'
+
+    execution_id = db.Column(db.Integer, db.ForeignKey('execution_history.id', ondelete='CASCADE'), primary_key=True)
+    schedule_id = db.Column(db.Integer, nullable=True)
+    planned_at = db.Column(EpochMillis, nullable=False)
+    dispatch_lag_ms = db.Column(db.BigInteger, nullable=True)
+    start_lag_ms = db.Column(db.BigInteger, nullable=True)
+    first_output_lag_ms = db.Column(db.BigInteger, nullable=True)
+
+    __table_args__ = (
+        db.Index('ix_execution_timings_planned_at', planned_at),
+        db.Index('ix_execution_timings_schedule_id_planned_at', schedule_id, planned_at),
+    )
+
+    @classmethod
+    def record(cls, execution_id, schedule_id, planned_at, dispatched_at=None, started_at=None, first_output_at=None):
+        """
+        Save the timings of a scheduled execution.
+
+        Args:
+            execution_id (int): Execution the timings belong to
+            schedule_id (int): Schedule that fired it
+            planned_at: Time the scheduler planned to fire the job
+            dispatched_at: Time the job started running in the scheduler
+            started_at: Time the script process was started
+            first_output_at: Time the script first produced output
+        """
+        planned = to_epoch_ms(planned_at)
+
+        def lag(value):
+            return None if value is None else to_epoch_ms(value) - planned
+
+        db.session.add(cls(
+            execution_id=execution_id,
+            schedule_id=schedule_id,
+            planned_at=planned,
+            dispatch_lag_ms=lag(dispatched_at),
+            start_lag_ms=lag(started_at),
+            first_output_lag_ms=lag(first_output_at)
+        ))
+        db.session.commit()
+
+    @classmethod
+    def get_lags(cls, since):
+        """
+        Get the lags of executions planned since a given time.
+
+        Returns:
+            list: (schedule_id, dispatch_lag_ms, start_lag_ms, first_output_lag_ms) tuples
+        """
+        rows = db.session.query(
+            cls.schedule_id, cls.dispatch_lag_ms, cls.start_lag_ms, cls.first_output_lag_ms
+        ).filter(
+            cls.planned_at >= to_epoch_ms(since)
+        ).all()
+
+        return [tuple(row) for row in rows]
@@ -1,4 +1,6 @@
+from sqlalchemy.exc import IntegrityError
 from app.utils.db import db
+from app.utils.timestamps import EpochMillis
 from datetime import datetime
 
 class ScheduleORM(db.Model):
@@ -11,15 +13,20 @@ class ScheduleORM(db.Model):
     profile_id = db.Column(db.Integer, db.ForeignKey('aws_profiles.id'), nullable=False)
     user_id = db.Column(db.Integer, db.ForeignKey('users.id'), nullable=False)
     schedule_type = db.Column(db.String(32), nullable=False)
-    schedule_value = db.Column(db.String(32), nullable=False)
+    schedule_value = db.Column(db.String(128), nullable=False)
     enabled = db.Column(db.Integer, nullable=False, default=1)
     parameters = db.Column(db.Text, nullable=True)
     job_id = db.Column(db.String(64), nullable=True)
-    next_run = db.Column(db.String(32), nullable=True)
-    created_at = db.Column(db.String(32), default=lambda: datetime.now().isoformat())
-    last_run = db.Column(db.String(32), nullable=True)
+    next_run = db.Column(EpochMillis, nullable=True)
+    created_at = db.Column(EpochMillis, default=lambda: datetime.now().isoformat())
+    last_run = db.Column(EpochMillis, nullable=True)
     start_timestamp = db.Column(db.Float, nullable=True)
     
+    # Handling of missed runs; None uses the configured default
+    misfire_policy = db.Column(db.String(16), nullable=True)
+    misfire_grace_seconds = db.Column(db.Integer, nullable=True)
+    max_catchup_runs = db.Column(db.Integer, nullable=True)
+    
     # Define relationships
     script = db.relationship('ScriptORM', backref=db.backref('schedules', lazy=True, cascade='all, delete-orphan'))
     profile = db.relationship('AWSProfileORM', backref=db.backref('schedules', lazy=True))
@@ -27,7 +34,8 @@ class ScheduleORM(db.Model):
     
     def __init__(self, script_id=None, profile_id=None, user_id=None, schedule_type=None, 
                  schedule_value=None, enabled=1, parameters=None, job_id=None, next_run=None, created_at=None,
-                 last_run=None, start_timestamp=None):
+                 last_run=None, start_timestamp=None, misfire_policy=None, misfire_grace_seconds=None,
+                 max_catchup_runs=None):
         """Initialize a new schedule"""
         self.script_id = script_id
         self.profile_id = profile_id
@@ -41,6 +49,9 @@ class ScheduleORM(db.Model):
         self.created_at = created_at or datetime.now().isoformat()
         self.last_run = last_run
         self.start_timestamp = start_timestamp
+        self.misfire_policy = misfire_policy
+        self.misfire_grace_seconds = misfire_grace_seconds
+        self.max_catchup_runs = max_catchup_runs
     
     def to_dict(self):
         """Convert Schedule object to dictionary"""
@@ -57,5 +68,75 @@ class ScheduleORM(db.Model):
             'next_run': self.next_run,
             'created_at': self.created_at,
             'last_run': self.last_run,
-            'start_timestamp': self.start_timestamp
-        }
\ No newline at end of file
+            'start_timestamp': self.start_timestamp,
+            'misfire_policy': self.misfire_policy,
+            'misfire_grace_seconds': self.misfire_grace_seconds,
+            'max_catchup_runs': self.max_catchup_runs
+        }
+class SchedulerLeaseORM(db.Model):
+    """
+    SQLAlchemy ORM model for the scheduler_leases table.
+    
+    A lease names the process allowed to fire scheduled jobs until
+    `expires_at`; the holder renews it on every heartbeat and any process
+    may take it over once it has expired. `version` counts schedule changes
+    so the leader notices changes made by other processes.
+    """
+    
+    __tablename__ = 'scheduler_leases'
+    
+    name = db.Column(db.String(64), primary_key=True)
+    holder = db.Column(db.String(128), nullable=True)
+    expires_at = db.Column(db.Float, nullable=True)  # Epoch seconds
+    version = db.Column(db.Integer, nullable=False, default=0)
+    
+    @classmethod
+    def acquire(cls, name, holder, ttl, now):
+        """
+        Take or renew a lease.
+        
+        Args:
+            name (str): Lease name
+            holder (str): ID of the process asking for the lease
+            ttl (float): Seconds the lease is valid for
+            now (float): Current epoch time
+            
+        Returns:
+            bool: True if `holder` holds the lease until now + ttl
+        """
+        # A single conditional update, so two processes can't both win
+        acquired = cls.query.filter(
+            cls.name == name,
+            db.or_(cls.holder == holder, cls.holder.is_(None), cls.expires_at < now)
+        ).update({'holder': holder, 'expires_at': now + ttl}, synchronize_session=False)
+        
+        if not acquired and not cls.query.filter_by(name=name).count():
+            db.session.add(cls(name=name, holder=holder, expires_at=now + ttl, version=0))
+            acquired = 1
+        
+        try:
+            db.session.commit()
+        except IntegrityError:
+            # Another process created the lease first
+            db.session.rollback()
+            return False
+        
+        return bool(acquired)
+    
+    @classmethod
+    def release(cls, name, holder):
+        """Give up a lease so another process can take it over immediately"""
+        cls.query.filter_by(name=name, holder=holder).update(
+            {'holder': None, 'expires_at': None}, synchronize_session=False
+        )
+        db.session.commit()
+    
+    @classmethod
+    def bump_version(cls, name):
+        """Record a schedule change in the caller's transaction"""
+        cls.query.filter_by(name=name).update({'version': cls.version + 1}, synchronize_session=False)
+    
+    @classmethod
+    def get_version(cls, name):
+        """Get the number of schedule changes recorded on a lease"""
+        return db.session.query(cls.version).filter_by(name=name).scalar()
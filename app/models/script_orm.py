@@ -1,5 +1,6 @@
 import json
 from app.utils.db import db
+from app.models.execution_stats_orm import ExecutionDailyStatsORM
 
 class ScriptORM(db.Model):
     """SQLAlchemy ORM model for scripts table"""
@@ -59,6 +60,13 @@ class ScriptORM(db.Model):
         if not self.id:
             return False
             
+        # Import the model here to avoid circular imports
+        from app.models.execution_orm import ExecutionORM
+        
+        # Executions keep their history without a script, so their rollup counts move to script 0.
+        # script_id is cleared here as well for databases that do not enforce ON DELETE SET NULL
+        ExecutionORM.query.filter_by(script_id=self.id).update({'script_id': None}, synchronize_session=False)
+        ExecutionDailyStatsORM.release_script(self.id)
         db.session.delete(self)
         db.session.commit()
         return True
@@ -2,6 +2,7 @@ import hashlib
 import secrets
 from datetime import datetime
 from app.utils.db import db
+from app.utils.timestamps import EpochMillis
 
 class UserORM(db.Model):
     """SQLAlchemy ORM model for users table"""
@@ -13,7 +14,7 @@ class UserORM(db.Model):
     password = db.Column(db.String(64), nullable=False)
     salt = db.Column(db.String(32), nullable=False)
     is_admin = db.Column(db.Integer, default=0)
-    created_at = db.Column(db.String(32), default=lambda: datetime.now().isoformat())
+    created_at = db.Column(EpochMillis, default=lambda: datetime.now().isoformat())
     
     def __init__(self, username=None, password=None, salt=None, is_admin=0, created_at=None):
         """Initialize a new user"""
@@ -1,5 +1,7 @@
-from flask import Blueprint, request, jsonify, session
-from app.services import execution_service
+from flask import Blueprint, Response, request, jsonify, session, current_app
+from app.services import execution_service, dashboard_service
+from app.services.execution_service import DASHBOARD_ROOM, execution_room
+from app.services.event_bus import event_bus
 import logging
 import json
 
@@ -18,16 +20,223 @@ def get_executions_base():
         'message': 'Executions API is available',
         'endpoints': {
             'recent_executions': 'Get recent executions',
+            'dashboard_state': 'Get recent executions and today\'s status counts',
+            'execution_output': 'Get a range of execution output by offset',
             'execution_details': 'Get execution details by ID',
             'run_script': 'Run a script',
             'execution_history': 'Get execution history',
             'execution_stats': 'Get execution statistics',
             'ai_help': 'Get AI help for failed executions',
             'cancel_execution': 'Cancel a running execution',
-            'provide_input': 'Provide input to an interactive script'
+            'provide_input': 'Provide input to an interactive script',
+            'executions/<id>/stream': 'Stream output and status of an execution (Server-Sent Events)',
+            'executions/stream': 'Stream status changes of all executions (Server-Sent Events)'
         }
     })
 
+# Statuses of executions that can still produce output
+ACTIVE_STATUSES = ('Pending', 'Running')
+
+def _format_sse(event, data, event_id=None):
+    """Format an event for a text/event-stream response"""
+    message = f"event: {event}\ndata: {json.dumps(data)}\n\n"
+    if event_id is not None:
+        message = f"id: {event_id}\n" + message
+    return message
+
+def _event_stream_response(stream):
+    """Create a streaming response that proxies do not buffer"""
+    return Response(stream, mimetype='text/event-stream', headers={
+        'Cache-Control': 'no-cache',
+        'X-Accel-Buffering': 'no'
+    })
+
+def _last_event_id():
+    """Get the ID of the last event the client received, if it is resuming"""
+    return request.headers.get('Last-Event-ID') or request.args.get('last_event_id')
+
+def _execution_event_stream(app, execution_id, offset, heartbeat, retry_ms):
+    """
+    Generate output and status events of an execution.
+
+    Output events use the offset after their text as event ID, so a client
+    reconnecting with Last-Event-ID resumes exactly where it stopped. Missed
+    or skipped output is fetched from the output store; live frames come
+    from the event bus that feeds Socket.IO.
+    """
+    subscription = event_bus.subscribe([execution_room(execution_id)])
+
+    def catch_up():
+        """Send output after the current offset from the output store"""
+        nonlocal offset
+        # A fresh app context per read, so no database session stays open
+        # for the lifetime of the stream
+        with app.app_context():
+            frame = execution_service.get_output_since(execution_id, offset)
+            status = execution_service.get_execution_status(execution_id)
+
+        if frame and (frame['output'] or frame['skipped']):
+            offset = frame['next_offset']
+            yield _format_sse('script_output', frame, offset)
+        return status
+
+    try:
+        yield f"retry: {retry_ms}\n\n"
+
+        status = yield from catch_up()
+        yield _format_sse('script_status_update', {'execution_id': execution_id, 'status': status}, offset)
+        if status not in ACTIVE_STATUSES:
+            yield _format_sse('end', {'execution_id': execution_id, 'status': status}, offset)
+            return
+
+        while True:
+            item = subscription.get(timeout=heartbeat)
+            if item is None:
+                yield ": heartbeat\n\n"
+                continue
+
+            _, event, data = item
+
+            if subscription.overflowed:
+                # Events were dropped while this client was behind
+                subscription.overflowed = False
+                status = yield from catch_up()
+                if status not in ACTIVE_STATUSES:
+                    yield _format_sse('script_status_update', {'execution_id': execution_id, 'status': status}, offset)
+                    yield _format_sse('end', {'execution_id': execution_id, 'status': status}, offset)
+                    return
+                continue
+
+            if event == 'script_output':
+                if data['next_offset'] <= offset:
+                    continue
+
+                if data['offset'] > offset:
+                    # Gap before this frame, fill it from the output store
+                    yield from catch_up()
+                    continue
+
+                frame = dict(data, offset=offset, output=data['output'][offset - data['offset']:])
+                offset = frame['next_offset']
+                yield _format_sse('script_output', frame, offset)
+
+            elif event == 'script_status_update':
+                status = data.get('status')
+                if status not in ACTIVE_STATUSES:
+                    # Make sure the final output is sent before the stream ends
+                    yield from catch_up()
+                    yield _format_sse('script_status_update', data, offset)
+                    yield _format_sse('end', {'execution_id': execution_id, 'status': status}, offset)
+                    return
+
+                yield _format_sse('script_status_update', data, offset)
+    finally:
+        event_bus.unsubscribe(subscription)
+
+def _dashboard_event_stream(last_event_id, heartbeat, retry_ms):
+    """
+    Generate status events of all executions.
+
+    Events are replayed from the event bus history when resuming; if that
+    is not possible, a resync event tells the client to reload its state.
+    """
+    subscription = event_bus.subscribe([DASHBOARD_ROOM])
+
+    try:
+        yield f"retry: {retry_ms}\n\n"
+
+        last_seq = 0
+        if last_event_id:
+            seq = event_bus.parse_event_id(last_event_id)
+            history = event_bus.history_since(DASHBOARD_ROOM, seq) if seq is not None else None
+
+            if history is None:
+                last_seq = event_bus.seq
+                yield _format_sse('resync', {}, event_bus.event_id(last_seq))
+            else:
+                last_seq = seq
+                for item_seq, event, data in history:
+                    last_seq = item_seq
+                    yield _format_sse(event, data, event_bus.event_id(item_seq))
+
+        while True:
+            item = subscription.get(timeout=heartbeat)
+            if item is None:
+                yield ": heartbeat\n\n"
+                continue
+
+            item_seq, event, data = item
+            if subscription.overflowed:
+                subscription.overflowed = False
+                last_seq = event_bus.seq
+                yield _format_sse('resync', {}, event_bus.event_id(last_seq))
+                continue
+
+            if item_seq <= last_seq:
+                continue
+
+            last_seq = item_seq
+            yield _format_sse(event, data, event_bus.event_id(item_seq))
+    finally:
+        event_bus.unsubscribe(subscription)
+
+# Stream status changes of all executions
+@execution_api.route('/executions/stream', methods=['GET'])
+def stream_executions():
+    """Stream execution status changes as Server-Sent Events"""
+    if not session.get('user_id'):
+        return jsonify({
+            'success': False,
+            'message': 'User not authenticated'
+        }), 401
+
+    return _event_stream_response(_dashboard_event_stream(
+        _last_event_id(),
+        current_app.config.get('SSE_HEARTBEAT_SECONDS', 15),
+        current_app.config.get('SSE_RETRY_MS', 3000)
+    ))
+
+# Stream output and status of one execution
+@execution_api.route('/executions/<int:execution_id>/stream', methods=['GET'])
+def stream_execution(execution_id):
+    """Stream execution output and status as Server-Sent Events"""
+    if not session.get('user_id'):
+        return jsonify({
+            'success': False,
+            'message': 'User not authenticated'
+        }), 401
+
+    try:
+        offset = int(_last_event_id() or request.args.get('offset') or 0)
+    except ValueError:
+        return jsonify({
+            'success': False,
+            'message': 'Invalid offset'
+        }), 400
+
+    try:
+        status = execution_service.get_execution_status(execution_id)
+    except Exception as e:
+        logger.error(f"Error getting execution status for ID {execution_id}: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Internal server error'
+        }), 500
+
+    if status is None:
+        return jsonify({
+            'success': False,
+            'message': 'Execution record not found'
+        }), 404
+
+    return _event_stream_response(_execution_event_stream(
+        current_app._get_current_object(),
+        execution_id,
+        max(0, offset),
+        current_app.config.get('SSE_HEARTBEAT_SECONDS', 15),
+        current_app.config.get('SSE_RETRY_MS', 3000)
+    ))
+
 # Get recent executions for the dashboard
 @execution_api.route('/recent_executions', methods=['GET'])
 def get_recent_executions():
@@ -40,6 +249,25 @@ def get_recent_executions():
         'executions': executions
     })
 
+# Get the in-memory dashboard state
+@execution_api.route('/dashboard_state', methods=['GET'])
+def get_dashboard_state():
+    """Get recent executions and today's status counts without querying them"""
+    try:
+        state = dashboard_service.get_state()
+        
+        return jsonify({
+            'success': True,
+            'executions': state['executions'],
+            'counts': state['counts']
+        })
+    except Exception as e:
+        logger.error(f"Error getting dashboard state: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Internal server error'
+        }), 500
+
 # Get execution details
 @execution_api.route('/execution_details/<int:execution_id>', methods=['GET'])
 def get_execution_details(execution_id):
@@ -54,6 +282,9 @@ def get_execution_details(execution_id):
                 'message': 'Execution record not found'
             }), 404
         
+        # Offset to resume live output from, counted the same way as output frames
+        execution['output_offset'] = len(execution['output'] or '')
+        
         return jsonify({
             'success': True,
             'execution': execution
@@ -67,6 +298,56 @@ def get_execution_details(execution_id):
             'message': 'Internal server error'
         }), 500
 
+# Get a range of execution output, e.g. to fill a gap in live output
+@execution_api.route('/execution_output/<int:execution_id>', methods=['GET'])
+def get_execution_output(execution_id):
+    """Get execution output from an offset, optionally up to an end offset"""
+    offset = request.args.get('offset', 0, type=int)
+    end = request.args.get('end', type=int)
+    
+    try:
+        frame = execution_service.get_output_since(execution_id, offset, end)
+        
+        if not frame:
+            return jsonify({
+                'success': False,
+                'message': 'Execution record not found'
+            }), 404
+        
+        return jsonify({
+            'success': True,
+            'frame': frame
+        })
+    except Exception as e:
+        logger.error(f"Error getting output for execution ID {execution_id}: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': 'Internal server error'
+        }), 500
+
+# Get send queue metrics of Socket.IO clients (admin only)
+@execution_api.route('/socket_clients', methods=['GET'])
+def get_socket_clients():
+    """Get queue depth and dropped output of each Socket.IO client in this process"""
+    if not session.get('is_admin'):
+        return jsonify({
+            'success': False,
+            'message': 'Unauthorized: Admin access required'
+        }), 403
+    
+    # Import here to avoid circular imports
+    from app import socketio
+    
+    manager = socketio.server.manager if socketio.server else None
+    clients = manager.get_client_metrics() if hasattr(manager, 'get_client_metrics') else []
+    
+    return jsonify({
+        'success': True,
+        'clients': clients,
+        'total_pending_bytes': sum(client['pending_bytes'] for client in clients),
+        'total_dropped_bytes': sum(client['dropped_bytes'] for client in clients)
+    })
+
 # Run a script
 @execution_api.route('/run_script', methods=['POST'])
 def run_script_api():
@@ -137,7 +418,19 @@ def get_execution_history():
         if user_id:
             filters['user_id'] = user_id
         
-        # Get execution history
+        # Get execution history, after a cursor when one is given
+        before_id = request.args.get('before_id', type=int)
+        if before_id:
+            result = execution_service.get_execution_history(filters=filters, before_id=before_id)
+            
+            return jsonify({
+                'success': True,
+                'executions': result['executions'],
+                'has_more': result['has_more'],
+                'next_before_id': result['next_before_id'],
+                'total_count': result['total_count']
+            })
+        
         result = execution_service.get_execution_history(page, filters=filters)
         
         return jsonify({
@@ -145,7 +438,9 @@ def get_execution_history():
             'executions': result['executions'],
             'current_page': result['current_page'],
             'total_pages': result['total_pages'],
-            'total_count': result['total_count']
+            'total_count': result['total_count'],
+            'has_more': result['current_page'] < result['total_pages'],
+            'next_before_id': result.get('next_before_id')
         })
     except Exception as e:
         logger.error(f"Error getting execution history: {str(e)}")
@@ -8,6 +8,9 @@ logger = logging.getLogger('yellowstack')
 # Create blueprint
 scheduler_api = Blueprint('scheduler_api', __name__, url_prefix='/api')
 
+# Longest forecast that can be requested, in hours
+MAX_FORECAST_HOURS = 31 * 24
+
 # Main API endpoint for scheduler
 @scheduler_api.route('/scheduler', methods=['GET'])
 def get_scheduler_base():
@@ -15,24 +18,63 @@ def get_scheduler_base():
     return jsonify({
         'success': True,
         'message': 'Scheduler API is available',
+        'status': scheduler_service.get_status(),
         'endpoints': {
             'schedules': 'Get all schedules',
             'schedules/{id}': 'Get, update, or delete a specific schedule',
-            'schedules/{id}/run': 'Run a scheduled script immediately'
+            'schedules/{id}/run': 'Run a scheduled script immediately',
+            'schedules/histogram': 'Get the number of runs in each minute of the day',
+            'schedules/forecast': 'Project the number of running executions per minute',
+            'scheduler/metrics': 'Get scheduler lag percentiles and executor saturation'
         }
     })
 
+@scheduler_api.route('/scheduler/metrics', methods=['GET'])
+def get_scheduler_metrics():
+    """Get lag percentiles of scheduled runs, globally and per schedule, and executor saturation"""
+    hours = request.args.get('hours', 24, type=int)
+    if hours is None or hours < 1:
+        return jsonify({
+            'success': False,
+            'message': "hours must be a positive number"
+        }), 400
+    
+    try:
+        return jsonify({
+            'success': True,
+            'metrics': scheduler_service.get_metrics(hours)
+        })
+    except Exception as e:
+        logger.error(f"Error getting scheduler metrics: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': "Error retrieving scheduler metrics"
+        }), 500
+
 @scheduler_api.route('/schedules', methods=['GET'])
 def get_schedules():
-    """Get all schedules with option to include disabled ones"""
+    """Get schedules with their last run, filtered and sorted, with option to include disabled ones"""
     try:
         include_disabled = request.args.get('include_disabled', 'false').lower() == 'true'
-        schedules = scheduler_service.get_schedules(include_disabled)
+        schedules = scheduler_service.get_schedules(
+            include_disabled,
+            script_id=request.args.get('script_id', type=int),
+            schedule_type=request.args.get('schedule_type'),
+            last_status=request.args.get('last_status'),
+            search=request.args.get('search'),
+            sort=request.args.get('sort', 'created_at'),
+            order=request.args.get('order', 'desc')
+        )
         
         return jsonify({
             'success': True,
             'schedules': schedules
         })
+    except ValueError as e:
+        return jsonify({
+            'success': False,
+            'message': str(e)
+        }), 400
     except Exception as e:
         logger.error(f"Error getting schedules: {str(e)}")
         return jsonify({
@@ -40,6 +82,57 @@ def get_schedules():
             'message': "Error retrieving schedules"
         }), 500
 
+@scheduler_api.route('/schedules/histogram', methods=['GET'])
+def get_schedule_histogram():
+    """Get the number of scheduled runs in each minute of the day"""
+    try:
+        histogram = scheduler_service.get_fire_histogram()
+        
+        minutes = [
+            {'time': f"{minute // 60:02d}:{minute % 60:02d}", 'count': count}
+            for minute, count in enumerate(histogram) if count
+        ]
+        peak = max(minutes, key=lambda minute: minute['count']) if minutes else None
+        
+        return jsonify({
+            'success': True,
+            'histogram': minutes,
+            'total_runs': sum(histogram),
+            'peak': peak,
+            'jitter_seconds': scheduler_service.jitter_seconds
+        })
+    except Exception as e:
+        logger.error(f"Error getting schedule histogram: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': "Error retrieving schedule histogram"
+        }), 500
+
+@scheduler_api.route('/schedules/forecast', methods=['GET'])
+def get_schedule_forecast():
+    """Project the executions starting and running in each minute of the coming hours"""
+    hours = request.args.get('hours', 48, type=int)
+    threshold = request.args.get('threshold', type=int)
+    if hours is None or not 1 <= hours <= MAX_FORECAST_HOURS:
+        return jsonify({
+            'success': False,
+            'message': f"hours must be between 1 and {MAX_FORECAST_HOURS}"
+        }), 400
+    
+    try:
+        forecast = scheduler_service.get_forecast(hours, threshold)
+        
+        return jsonify({
+            'success': True,
+            **forecast
+        })
+    except Exception as e:
+        logger.error(f"Error getting schedule forecast: {str(e)}")
+        return jsonify({
+            'success': False,
+            'message': "Error retrieving schedule forecast"
+        }), 500
+
 @scheduler_api.route('/schedules/<int:schedule_id>', methods=['GET'])
 def get_schedule(schedule_id):
     """Get a specific schedule"""
@@ -89,7 +182,11 @@ def create_schedule():
             user_id=user_id,
             schedule_type=data.get('schedule_type'),
             schedule_value=data.get('schedule_value'),
-            parameters=data.get('parameters')
+            parameters=data.get('parameters'),
+            balance=bool(data.get('balance')),
+            misfire_policy=data.get('misfire_policy'),
+            misfire_grace_seconds=data.get('misfire_grace_seconds'),
+            max_catchup_runs=data.get('max_catchup_runs')
         )
         
         if result.get('success'):
@@ -122,7 +219,10 @@ def update_schedule(schedule_id):
             schedule_type=data.get('schedule_type'),
             schedule_value=data.get('schedule_value'),
             profile_id=data.get('profile_id'),
-            parameters=data.get('parameters')
+            parameters=data.get('parameters'),
+            misfire_policy=data.get('misfire_policy'),
+            misfire_grace_seconds=data.get('misfire_grace_seconds'),
+            max_catchup_runs=data.get('max_catchup_runs')
         )
         
         if result.get('success'):
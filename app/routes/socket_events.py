@@ -0,0 +1,88 @@
+from flask import session
+from flask_socketio import join_room, leave_room
+from app.services.execution_service import execution_service, DASHBOARD_ROOM, execution_room
+import logging
+
+# Create logger
+logger = logging.getLogger('yellowstack')
+
+def _get_execution_id(data):
+    """Extract a valid execution ID from a Socket.IO event payload"""
+    if not isinstance(data, dict):
+        return None
+
+    try:
+        return int(data.get('execution_id'))
+    except (TypeError, ValueError):
+        return None
+
+def register_socket_events(socketio):
+    """
+    Register Socket.IO event handlers for room subscriptions.
+
+    Clients only receive output for executions they have joined,
+    and status-only events after joining the dashboard room.
+
+    Args:
+        socketio: SocketIO instance to register the handlers on
+    """
+    @socketio.on('join_dashboard')
+    def on_join_dashboard(data=None):
+        """Subscribe the client to status-only dashboard events"""
+        if 'user_id' not in session:
+            return {'success': False, 'message': 'User not authenticated'}
+
+        join_room(DASHBOARD_ROOM)
+        return {'success': True}
+
+    @socketio.on('leave_dashboard')
+    def on_leave_dashboard(data=None):
+        """Unsubscribe the client from dashboard events"""
+        leave_room(DASHBOARD_ROOM)
+        return {'success': True}
+
+    @socketio.on('join_execution')
+    def on_join_execution(data):
+        """
+        Subscribe the client to output and status events of one execution.
+
+        If the payload includes the offset the client already has output up to,
+        the missing output is replayed in the acknowledgement. The room is
+        joined first, so live frames that overlap the replay can be
+        de-duplicated by offset on the client.
+        """
+        if 'user_id' not in session:
+            return {'success': False, 'message': 'User not authenticated'}
+
+        execution_id = _get_execution_id(data)
+        if execution_id is None:
+            return {'success': False, 'message': 'Execution ID is required'}
+
+        join_room(execution_room(execution_id))
+        logger.debug(f"Client joined room for execution {execution_id}")
+
+        offset = data.get('offset')
+        if offset is None:
+            return {'success': True}
+
+        try:
+            replay = execution_service.get_output_since(execution_id, int(offset))
+        except (TypeError, ValueError):
+            return {'success': False, 'message': 'Invalid offset'}
+
+        if replay is None:
+            return {'success': False, 'message': 'Execution record not found'}
+
+        return {'success': True, 'replay': replay}
+
+    @socketio.on('leave_execution')
+    def on_leave_execution(data):
+        """Unsubscribe the client from an execution room"""
+        execution_id = _get_execution_id(data)
+        if execution_id is None:
+            return {'success': False, 'message': 'Execution ID is required'}
+
+        leave_room(execution_room(execution_id))
+        return {'success': True}
+
+    return socketio
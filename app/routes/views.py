@@ -3,6 +3,7 @@ import os
 from datetime import datetime
 from functools import wraps
 from app.models import UserORM
+from app.services.user_adapter import user_adapter
 
 # Create blueprint
 views = Blueprint('views', __name__)
@@ -18,8 +19,8 @@ def login_required(f):
             flash('Please log in to access this page', 'warning')
             return redirect(url_for('views.login'))
         
-        # Additional check for user validity
-        user = UserORM.get_by_id(session['user_id'])
+        # Additional check for user validity (cached briefly per process)
+        user = user_adapter.get_session_user(session['user_id'])
         
         if not user:
             # Session refers to a user that no longer exists
@@ -4,6 +4,7 @@ from app.services.aws_service import AWSService, aws_service
 from app.services.execution_service import ExecutionService, execution_service
 from app.services.auth_service import AuthService, auth_service
 from app.services.setting_service import SettingService, setting_service
+from app.services.dashboard_service import DashboardService, dashboard_service
 
 # Import scheduler service directly from its module
 from app.services.scheduler_service import scheduler_service
@@ -29,6 +30,7 @@ __all__ = [
     'ExecutionService', 'execution_service',
     'AuthService', 'auth_service',
     'SettingService', 'setting_service',
+    'DashboardService', 'dashboard_service',
     'scheduler_service',
     
     # Adapters
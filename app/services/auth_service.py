@@ -158,8 +158,8 @@ class AuthService:
                 flash('Please log in to access this page', 'warning')
                 return redirect(url_for('views.login'))
             
-            # Additional check for user validity
-            user = self.user_adapter.get_by_id(session['user_id'])
+            # Additional check for user validity (cached briefly per process)
+            user = self.user_adapter.get_session_user(session['user_id'])
             
             if not user:
                 # Session refers to a user that no longer exists
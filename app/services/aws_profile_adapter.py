@@ -19,6 +19,12 @@ class AWSProfileAdapter:
         """Get an AWS profile by ID"""
         return AWSProfileORM.get_by_id(profile_id)
     
+    def get_by_ids(self, profile_ids):
+        """Get AWS profiles by ID in one query, as a dictionary keyed by ID"""
+        if not profile_ids:
+            return {}
+        return {profile.id: profile for profile in AWSProfileORM.query.filter(AWSProfileORM.id.in_(profile_ids)).all()}
+    
     def get_all(self):
         """Get all AWS profiles"""
         return AWSProfileORM.get_all()
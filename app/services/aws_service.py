@@ -1,11 +1,24 @@
 import boto3
+import hashlib
 import logging
+import threading
+from collections import OrderedDict
 from app.services.aws_profile_adapter import aws_profile_adapter
 
 logger = logging.getLogger('yellowstack')
 
 class AWSService:
-    """Service for managing AWS profiles and connections using the ORM adapter"""
+    """
+    Service for managing AWS profiles and connections using the ORM adapter.
+    
+    Creating a boto3 client loads the service's botocore models, so sessions
+    and clients are kept in a per-process LRU cache of `cache_size` entries.
+    Entries are keyed by profile, region, service and credential version; the
+    version changes when the profile is updated or deleted through this
+    service, and with the stored credentials, so changes made by other
+    processes are picked up on the next lookup. Resources are not safe to
+    share between threads and are created anew from the cached session.
+    """
     
     # List of AWS regions for UI/validation
     AWS_REGIONS = [
@@ -33,12 +46,28 @@ class AWSService:
         {"id": "sa-east-1", "name": "South America (São Paulo)"}
     ]
     
-    def __init__(self, use_orm=True):
+    def __init__(self, use_orm=True, cache_size=64):
         """
         Initialize the AWS service
+        
+        Args:
+            cache_size (int): Most sessions and clients kept; 0 disables caching
         """
         self.aws_profile_adapter = aws_profile_adapter
         self.aws_profile_adapter.use_orm = True
+        self.cache_size = cache_size
+        
+        # (profile ID, region, service, credential version) -> session or client,
+        # least recently used first; sessions have no service
+        self._cache = OrderedDict()
+        self._profile_versions = {}
+        self._lock = threading.Lock()
+    
+    def init_app(self, app):
+        """Apply settings from the Flask app configuration"""
+        self.cache_size = app.config.get('AWS_CLIENT_CACHE_SIZE', self.cache_size)
+        with self._lock:
+            self._cache.clear()
     
     def get_all_profiles(self):
         """Get all AWS profiles"""
@@ -121,6 +150,8 @@ class AWSService:
             is_default=1 if is_default else 0
         )
         
+        self.invalidate(profile_id)
+        
         if success:
             logger.info(f"AWS profile updated: {name} (ID: {profile_id})")
         
@@ -135,6 +166,9 @@ class AWSService:
 
         # Try to delete the profile
         success = self.aws_profile_adapter.delete(profile_id)
+        
+        if success:
+            self.invalidate(profile_id)
 
         if success:
             logger.info(f"AWS profile deleted: {profile.name} (ID: {profile_id})")
@@ -158,8 +192,54 @@ class AWSService:
         
         return success
     
-    def get_boto3_session(self, profile_id=None):
-        """Get a boto3 session for a profile"""
+    def get_boto3_session(self, profile_id=None, region=None):
+        """
+        Get a new boto3 session for a profile, in its own region unless another is given.
+        
+        Sessions are not thread-safe, so the cached ones stay internal to
+        get_aws_client and get_aws_resource; the caller owns the session returned.
+        """
+        profile = self._get_profile(profile_id)
+        return self._create_session(profile, region or profile.aws_region)
+    
+    def get_aws_client(self, service, profile_id=None, region=None):
+        """Get a boto3 client for a service"""
+        profile = self._get_profile(profile_id)
+        region = region or profile.aws_region
+        session = self._get_session(profile, region)
+        
+        return self._get_cached(
+            (profile.id, region, service, self._get_credential_version(profile)),
+            lambda: session.client(service)
+        )
+    
+    def get_aws_resource(self, service, profile_id=None, region=None):
+        """Get a boto3 resource for a service, for use by the calling thread only"""
+        profile = self._get_profile(profile_id)
+        session = self._get_session(profile, region or profile.aws_region)
+        
+        # Sessions are not thread-safe, and resources not shareable
+        with self._lock:
+            return session.resource(service)
+    
+    def invalidate(self, profile_id=None):
+        """
+        Drop the cached sessions and clients of a profile.
+        
+        Args:
+            profile_id (int): Profile to drop, or None for all profiles
+        """
+        with self._lock:
+            if profile_id is None:
+                self._cache.clear()
+                return
+            
+            self._profile_versions[profile_id] = self._profile_versions.get(profile_id, 0) + 1
+            for key in [key for key in self._cache if key[0] == profile_id]:
+                del self._cache[key]
+    
+    def _get_profile(self, profile_id):
+        """Get a profile, or the default one if no ID is given"""
         # If no profile_id is provided, use the default
         if profile_id is None:
             profile = self.aws_profile_adapter.get_default()
@@ -170,22 +250,44 @@ class AWSService:
             if not profile:
                 raise ValueError(f"Profile with ID {profile_id} not found")
         
-        # Create and return the session
+        return profile
+    
+    def _get_session(self, profile, region):
+        """Get the cached session of a profile in a region"""
+        return self._get_cached(
+            (profile.id, region, None, self._get_credential_version(profile)),
+            lambda: self._create_session(profile, region)
+        )
+    
+    def _create_session(self, profile, region):
+        """Create a boto3 session with the credentials of a profile"""
         return boto3.Session(
             aws_access_key_id=profile.aws_access_key,
             aws_secret_access_key=profile.aws_secret_key,
-            region_name=profile.aws_region
+            region_name=region
         )
     
-    def get_aws_client(self, service, profile_id=None):
-        """Get a boto3 client for a service"""
-        session = self.get_boto3_session(profile_id)
-        return session.client(service)
+    def _get_credential_version(self, profile):
+        """Get the version of a profile's credentials, changing when they change"""
+        fingerprint = hashlib.sha256(f"{profile.aws_access_key}:{profile.aws_secret_key}".encode()).hexdigest()
+        with self._lock:
+            return self._profile_versions.get(profile.id, 0), fingerprint
     
-    def get_aws_resource(self, service, profile_id=None):
-        """Get a boto3 resource for a service"""
-        session = self.get_boto3_session(profile_id)
-        return session.resource(service)
+    def _get_cached(self, key, create):
+        """Get a cached session or client, creating it on a miss"""
+        with self._lock:
+            if self.cache_size > 0 and key in self._cache:
+                self._cache.move_to_end(key)
+                return self._cache[key]
+            
+            # Created under the lock, as sessions are not thread-safe
+            value = create()
+            if self.cache_size > 0 and key[3][0] == self._profile_versions.get(key[0], 0):
+                self._cache[key] = value
+                while len(self._cache) > self.cache_size:
+                    self._cache.popitem(last=False)
+            
+            return value
     
     def _validate_aws_credentials(self, access_key, secret_key, region):
         """Validate AWS credentials by calling the STS service"""
@@ -0,0 +1,168 @@
+import time
+import logging
+import threading
+from collections import Counter
+from datetime import date, datetime, timedelta
+from app.services.execution_adapter import execution_adapter
+
+logger = logging.getLogger('yellowstack')
+
+# Statuses that end an execution
+FINISHED_STATUSES = ('Success', 'Failed', 'Cancelled')
+
+# Statuses of executions that have not finished yet
+ACTIVE_STATUSES = ('Pending', 'Running')
+
+class DashboardService:
+    """
+    In-memory dashboard state: the most recent executions and the status
+    counts of executions started today.
+
+    The state is loaded from the database once, with the counts read from
+    the daily rollup and only today's unfinished executions tracked by ID,
+    and then updated on every status transition, so dashboards are served
+    and kept current without re-running their queries. Each transition
+    produces a delta that is pushed to the dashboard Socket.IO room.
+    Transitions made by other worker processes are picked up by reloading
+    the state after `max_age` seconds.
+    """
+
+    def __init__(self, limit=10, max_age=60):
+        """
+        Initialize the service
+
+        Args:
+            limit (int): Number of recent executions kept
+            max_age (float): Seconds before the state is reloaded from the
+                             database; 0 disables reloading
+        """
+        self.execution_adapter = execution_adapter
+        self.limit = limit
+        self.max_age = max_age
+
+        self._recent = []
+        self._statuses = {}
+        self._counts = Counter()
+        self._today = None
+        self._loaded_at = None
+        self._lock = threading.RLock()
+
+    def init_app(self, app):
+        """Apply settings from the Flask app configuration"""
+        self.limit = app.config.get('DASHBOARD_RECENT_LIMIT', self.limit)
+        self.max_age = app.config.get('DASHBOARD_STATE_MAX_AGE', self.max_age)
+        self.invalidate()
+
+    def invalidate(self):
+        """Drop the in-memory state so it is reloaded on next use"""
+        with self._lock:
+            self._loaded_at = None
+
+    def get_state(self):
+        """
+        Get a snapshot of the dashboard state
+
+        Returns:
+            dict: 'executions' (most recent first) and 'counts' of executions
+                  started today by status, with the date they apply to
+        """
+        with self._lock:
+            self._ensure_loaded()
+            return {
+                'executions': [dict(execution) for execution in self._recent],
+                'counts': dict(self._counts, date=self._today)
+            }
+
+    def record_status(self, execution_id, status, previous_status=None):
+        """
+        Apply a status transition of an execution to the state.
+
+        Must be called after the new status has been committed, within an
+        app context.
+
+        Args:
+            execution_id: ID of the execution
+            status (str): Status after the transition
+            previous_status (str): Status before the transition, as written to
+                                   the database; None for a new execution or
+                                   to use the status held in memory
+
+        Returns:
+            dict: Delta for dashboards with the updated 'execution' summary
+                  and the status count 'changes' for the date it started
+                  on, or None if the execution does not exist
+        """
+        with self._lock:
+            self._ensure_loaded()
+
+            execution = next((item for item in self._recent if item['id'] == execution_id), None)
+            known_status = execution['status'] if execution else None
+
+            if execution is None:
+                execution = self.execution_adapter.get_summary(execution_id)
+                if execution is None:
+                    return None
+                self._add_recent(execution)
+
+            execution['status'] = status
+            if status in FINISHED_STATUSES and not execution.get('end_time'):
+                execution['end_time'] = datetime.now().isoformat()
+
+            start_date = (execution.get('start_time') or '')[:10]
+            if start_date == self._today:
+                known_status = self._statuses.pop(execution_id, known_status)
+                if status in ACTIVE_STATUSES:
+                    self._statuses[execution_id] = status
+
+            # Finished executions are no longer tracked, so a repeated final status
+            # is only recognised from the status the transition replaced
+            if previous_status is None:
+                previous_status = known_status
+
+            changes = {}
+            if previous_status != status:
+                if previous_status:
+                    changes[previous_status] = -1
+                changes[status] = 1
+
+            if start_date == self._today:
+                self._counts.update(changes)
+
+            return {
+                'execution': dict(execution),
+                'counts': {'date': start_date, 'changes': changes}
+            }
+
+    def _add_recent(self, execution):
+        """Insert an execution into the recent list, keeping it ordered by ID"""
+        self._recent.append(execution)
+        self._recent.sort(key=lambda item: item['id'], reverse=True)
+        del self._recent[self.limit:]
+
+    def _ensure_loaded(self):
+        """Load the state if it is missing, stale or from a previous day (lock must be held)"""
+        today = date.today().isoformat()
+        now = time.monotonic()
+
+        if (self._loaded_at is not None and self._today == today and
+                (not self.max_age or now - self._loaded_at < self.max_age)):
+            return
+
+        self._recent = self.execution_adapter.get_recent_summaries(self.limit)
+
+        # Counts come from the rollup; only unfinished executions can still change status
+        self._counts = Counter({
+            status: count
+            for day, status, count in self.execution_adapter.get_daily_counts(today)
+            if day == today
+        })
+        tomorrow = (date.today() + timedelta(days=1)).isoformat()
+        self._statuses = dict(self.execution_adapter.get_statuses_started_between(
+            today, tomorrow, ACTIVE_STATUSES))
+
+        self._today = today
+        self._loaded_at = now
+        logger.debug(f"Loaded dashboard state with {len(self._statuses)} unfinished executions started today")
+
+# Create a singleton instance
+dashboard_service = DashboardService()
@@ -0,0 +1,155 @@
+import queue
+import secrets
+import threading
+from collections import deque
+
+class Subscription:
+    """
+    Queue of events delivered to one subscriber of the event bus.
+
+    The queue is bounded. When a subscriber falls behind, further events are
+    dropped and `overflowed` is set, so the subscriber can resynchronize from
+    the output store instead of holding an unbounded backlog.
+    """
+
+    def __init__(self, rooms, max_events=1000):
+        self.rooms = set(rooms)
+        self.overflowed = False
+        self._queue = queue.Queue(maxsize=max_events)
+
+    def put(self, item):
+        """Queue an event, flagging the subscription if it is full"""
+        try:
+            self._queue.put_nowait(item)
+        except queue.Full:
+            self.overflowed = True
+
+    def get(self, timeout=None):
+        """
+        Wait for the next event.
+
+        Returns:
+            tuple: (seq, event, data), or None if the timeout expired
+        """
+        try:
+            return self._queue.get(timeout=timeout)
+        except queue.Empty:
+            return None
+
+class EventBus:
+    """
+    In-process publish/subscribe bus for real-time events.
+
+    Every event the Socket.IO server delivers in this process is also
+    published here, which lets consumers that do not speak Socket.IO, such
+    as the Server-Sent Events endpoints, receive the same events. With a
+    message queue configured this includes events emitted by other workers.
+
+    Events are numbered with a sequence local to this process. For the rooms
+    in `history_rooms`, a bounded history allows resuming after a short
+    disconnect; event IDs include `bus_id`, so IDs issued by another process
+    are recognised as unknown. Output is not kept here, since it can be
+    resumed by offset from the output store instead.
+    """
+
+    def __init__(self, history_rooms=(), history_size=500):
+        self.bus_id = secrets.token_hex(4)
+        self.history_rooms = set(history_rooms)
+        self.history_size = history_size
+        self.seq = 0
+        self._subscriptions = set()
+        self._history = {}
+        self._trimmed = {}
+        self._lock = threading.Lock()
+
+    def subscribe(self, rooms, max_events=1000):
+        """Subscribe to events addressed to any of the given rooms"""
+        subscription = Subscription(rooms, max_events)
+        with self._lock:
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        """Stop delivering events to a subscription"""
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def publish(self, event, data, rooms=None):
+        """
+        Publish an event to subscribers of its rooms.
+
+        Args:
+            event (str): Event name
+            data: Event payload
+            rooms: Room name or list of room names; None addresses everyone
+
+        Returns:
+            int: Sequence number assigned to the event
+        """
+        if rooms is None:
+            rooms = set()
+        elif isinstance(rooms, str):
+            rooms = {rooms}
+        else:
+            rooms = set(rooms)
+
+        with self._lock:
+            self.seq += 1
+            item = (self.seq, event, data)
+
+            for room in rooms & self.history_rooms:
+                history = self._history.get(room)
+                if history is None:
+                    history = self._history[room] = deque(maxlen=self.history_size)
+                elif len(history) == self.history_size:
+                    # Remember the newest event that can no longer be replayed
+                    self._trimmed[room] = history[0][0]
+                history.append(item)
+
+            subscriptions = [subscription for subscription in self._subscriptions
+                             if not rooms or subscription.rooms & rooms]
+
+        for subscription in subscriptions:
+            subscription.put(item)
+
+        return item[0]
+
+    def history_since(self, room, seq):
+        """
+        Get events of a room published after a sequence number.
+
+        Returns:
+            list: (seq, event, data) tuples, or None if some of the events
+                  after `seq` are no longer retained
+        """
+        with self._lock:
+            if seq > self.seq or seq < self._trimmed.get(room, 0):
+                return None
+
+            return [item for item in self._history.get(room, ()) if item[0] > seq]
+
+    def event_id(self, seq):
+        """Build an event ID that is only valid within this process"""
+        return f"{self.bus_id}-{seq}"
+
+    def parse_event_id(self, event_id):
+        """
+        Get the sequence number from an event ID issued by this process.
+
+        Returns:
+            int: Sequence number, or None if the ID is unknown
+        """
+        if not event_id:
+            return None
+
+        bus_id, _, seq = str(event_id).partition('-')
+        if bus_id != self.bus_id:
+            return None
+
+        try:
+            return int(seq)
+        except ValueError:
+            return None
+
+# Create a singleton instance, keeping history for the dashboard room
+event_bus = EventBus(history_rooms=['dashboard'])
@@ -1,6 +1,8 @@
 import logging
 from datetime import datetime
-from app.models import ExecutionORM
+from app.models import ExecutionORM, ExecutionDailyStatsORM
+from app.models.execution_orm import CANCEL_MESSAGE
+from app.models.execution_stats_orm import ROLLUP_FILTERS
 from app.utils.db import db
 
 logger = logging.getLogger('yellowstack')
@@ -29,16 +31,63 @@ class ExecutionAdapter:
         """Get recent executions"""
         return ExecutionORM.get_recent(limit)
     
-    def get_history(self, page=1, per_page=10, filters=None):
+    def get_recent_summaries(self, limit=10):
+        """Get recent executions without their output"""
+        return ExecutionORM.get_recent_summaries(limit)
+    
+    def get_summary(self, execution_id):
+        """Get an execution by ID as a dictionary without its output"""
+        orm_execution = ExecutionORM.get_by_id(execution_id)
+        return orm_execution.to_summary_dict() if orm_execution else None
+    
+    def get_statuses_started_between(self, start, end, statuses=None):
+        """Get (id, status) pairs of executions started in the [start, end) range, optionally in given statuses"""
+        return ExecutionORM.get_statuses_started_between(start, end, statuses)
+    
+    def get_daily_counts(self, since):
+        """Get (date, status, count) tuples of executions started since a date, from the daily rollup"""
+        return ExecutionDailyStatsORM.get_daily_counts(since)
+    
+    def get_history(self, page=1, per_page=10, filters=None, total_count=None):
         """Get execution history with pagination and filters"""
-        return ExecutionORM.get_history(page, per_page, filters)
+        return ExecutionORM.get_history(page, per_page, filters, total_count=total_count)
+    
+    def get_history_before(self, before_id=None, per_page=10, filters=None):
+        """Get a page of execution history older than a given execution ID"""
+        return ExecutionORM.get_history_before(before_id, per_page, filters)
+    
+    def count_history(self, filters=None):
+        """Count the executions matching the history filters"""
+        count = self.count_history_from_rollup(filters)
+        if count is not None:
+            return count
+        
+        return ExecutionORM.count_history(filters)
+    
+    def count_history_from_rollup(self, filters=None):
+        """Count the executions matching the history filters from the daily rollup, or None if it cannot answer them"""
+        filters = {key: value for key, value in (filters or {}).items() if value}
+        
+        # Filters on script, status and date can be answered by the daily rollup
+        if not set(filters) <= ROLLUP_FILTERS:
+            return None
+        
+        return ExecutionDailyStatsORM.count_executions(
+            script_id=filters.get('script_id'),
+            status=filters.get('status'),
+            date=filters.get('date')
+        )
+    
+    def get_latest_id(self):
+        """Get the ID of the newest execution, or None"""
+        return db.session.query(db.func.max(ExecutionORM.id)).scalar()
     
     def get_stats(self, days=7):
         """Get execution statistics for the dashboard chart"""
         return ExecutionORM.get_stats(days)
     
     def create(self, script_id, aws_profile_id, user_id, status="Pending", 
-               start_time=None, parameters=None, is_scheduled=0):
+               start_time=None, parameters=None, is_scheduled=0, schedule_id=None):
         """Create a new execution record"""
         # Set default start time if not provided
         if start_time is None:
@@ -52,7 +101,8 @@ class ExecutionAdapter:
             status=status,
             start_time=start_time,
             parameters=parameters,
-            is_scheduled=is_scheduled
+            is_scheduled=is_scheduled,
+            schedule_id=schedule_id
         )
         execution_id = orm_execution.save()
         
@@ -60,7 +110,7 @@ class ExecutionAdapter:
         return execution_id
     
     def update_status(self, execution_id, status, output=None):
-        """Update the status of an execution"""
+        """Update the status of an execution, returning the status it replaced, or False if it does not exist"""
         orm_execution = ExecutionORM.get_by_id(execution_id)
         if orm_execution:
             # Make sure we have an ORM object, not a dict
@@ -69,8 +119,7 @@ class ExecutionAdapter:
                 orm_execution = db.session.get(ExecutionORM, execution_id)
                 
             if orm_execution:
-                orm_execution.update_status(status, output)
-                return True
+                return orm_execution.update_status(status, output)
         
         return False
     
@@ -104,8 +153,8 @@ class ExecutionAdapter:
         
         return False
     
-    def cancel(self, execution_id):
-        """Cancel an execution"""
+    def cancel(self, execution_id, output=CANCEL_MESSAGE):
+        """Cancel an execution, appending output unless it is None"""
         orm_execution = ExecutionORM.get_by_id(execution_id)
         if orm_execution:
             # Make sure we have an ORM object, not a dict
@@ -114,7 +163,7 @@ class ExecutionAdapter:
                 orm_execution = db.session.get(ExecutionORM, execution_id)
                 
             if orm_execution:
-                return orm_execution.cancel()
+                return orm_execution.cancel(output)
         
         return False
     
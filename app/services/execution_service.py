@@ -4,15 +4,20 @@ import logging
 import subprocess
 import threading
 import signal
+import time
 import psutil
+from queue import Queue, Empty
 from datetime import datetime, timedelta
 import openai
 from flask_socketio import emit
-from app.models import ExecutionORM
+from app.models import ExecutionORM, ExecutionTimingORM
 from app.services.execution_adapter import execution_adapter
 from app.services.script_adapter import script_adapter
 from app.services.aws_profile_adapter import aws_profile_adapter
 from app.services.setting_adapter import setting_adapter
+from app.services.dashboard_service import dashboard_service
+from app.services.output_stream import OutputBatcher, output_batchers, register_batcher, unregister_batcher
+from app.utils.db import db
 
 logger = logging.getLogger('yellowstack')
 
@@ -25,6 +30,13 @@ input_queues = {}
 # Dictionary to track running processes
 running_processes = {}
 
+# Socket.IO room that receives lightweight status-only events
+DASHBOARD_ROOM = 'dashboard'
+
+def execution_room(execution_id):
+    """Get the Socket.IO room name for a single execution's output and status"""
+    return f"execution:{execution_id}"
+
 class ExecutionService:
     """Service for managing script executions using the ORM adapters"""
     
@@ -38,6 +50,16 @@ class ExecutionService:
         self.aws_profile_adapter = aws_profile_adapter
         self.setting_adapter = setting_adapter
         
+        # Cached history counts: (filters, latest execution ID) -> (count, time)
+        self._history_counts = {}
+        
+        # Scheduled runs waiting to be started, in batches, by the dispatcher thread
+        self.app = None
+        self.dispatch_batch_size = 100
+        self._scheduled_runs = Queue()
+        self._dispatcher_thread = None
+        self._dispatcher_lock = threading.Lock()
+        
         # Set use_orm for all adapters
         self.execution_adapter.use_orm = True
         self.script_adapter.use_orm = True
@@ -54,6 +76,7 @@ class ExecutionService:
         """Set the Flask app for use in threads"""
         # Store the app for use in threads
         self.app = app
+        self.dispatch_batch_size = int(app.config.get('SCHEDULED_RUN_BATCH_SIZE', self.dispatch_batch_size))
     
     def get_recent_executions(self, limit=10):
         """Get recent executions for the dashboard"""
@@ -63,25 +86,135 @@ class ExecutionService:
         """Get an execution by ID with details (as dictionary)"""
         return self.execution_adapter.get_by_id_with_details(execution_id)
     
-    def get_execution_history(self, page=1, per_page=None, filters=None):
-        """Get execution history with pagination and filters"""
+    def get_execution_status(self, execution_id):
+        """Get the current status of an execution, or None if it does not exist"""
+        execution = self.execution_adapter.get_by_id(execution_id)
+        return execution.status if execution else None
+    
+    def get_output_since(self, execution_id, offset=0, end=None):
+        """
+        Get the output of an execution from a character offset.
+        
+        Recent output of a running execution is served from memory, since it may
+        not have been written to the database yet; older output comes from the
+        database. The result has the same shape as a live output frame.
+        
+        Args:
+            execution_id: ID of the execution
+            offset (int): Character offset to start from
+            end (int): Optional offset to stop at
+        
+        Returns:
+            dict: Output frame, or None if the execution does not exist
+        """
+        offset = max(0, int(offset or 0))
+        
+        batcher = output_batchers.get(execution_id)
+        if batcher:
+            recent_offset, recent_text, seq = batcher.read_since(offset)
+        
+        if batcher and recent_offset <= offset:
+            start_offset, text = recent_offset, recent_text
+        else:
+            execution = self.execution_adapter.get_by_id(execution_id)
+            if not execution:
+                return None
+            
+            stored = execution.output or ''
+            if batcher:
+                # Stored output up to where the in-memory output takes over
+                stored_end = max(offset, min(len(stored), recent_offset))
+                if stored_end < recent_offset:
+                    # Neither store has the output in between
+                    start_offset, text = recent_offset, recent_text
+                else:
+                    start_offset = offset
+                    text = stored[offset:recent_offset] + recent_text
+            else:
+                seq = None
+                start_offset = min(offset, len(stored))
+                text = stored[start_offset:]
+        
+        if end is not None and start_offset + len(text) > end:
+            text = text[:max(0, end - start_offset)]
+        
+        return {
+            'execution_id': execution_id,
+            'seq': seq,
+            'offset': start_offset,
+            'next_offset': start_offset + len(text),
+            'skipped': max(0, start_offset - offset),
+            'output': text,
+            'replay': True
+        }
+    
+    def get_execution_history(self, page=1, per_page=None, filters=None, before_id=None):
+        """
+        Get execution history with pagination and filters
+        
+        Args:
+            page (int): Page number, used when no cursor is given
+            per_page (int): Executions per page (default: history_limit setting)
+            filters (dict): History filters
+            before_id (int): Cursor; return executions older than this ID
+        """
         if per_page is None:
             # Get the value from settings
-            per_page = self.setting_adapter.get('history_limit', 10)
-            # Convert to integer, as the value from DB comes as string
-            try:
-                per_page = int(per_page)
-            except (ValueError, TypeError):
-                per_page = 10
-
-        return self.execution_adapter.get_history(page, per_page, filters)
+            per_page = self.setting_adapter.get_int('history_limit', 10)
+        
+        total_count = self.count_execution_history(filters)
+        
+        if before_id:
+            result = self.execution_adapter.get_history_before(before_id, per_page, filters)
+            result['total_count'] = total_count
+            return result
+        
+        return self.execution_adapter.get_history(page, per_page, filters, total_count=total_count)
+    
+    def count_execution_history(self, filters=None):
+        """
+        Count executions matching history filters.
+        
+        Counts the rollup can answer are exact and cheap. Other counts need a
+        scan, so they are cached for HISTORY_COUNT_CACHE_SECONDS, or until a
+        new execution is created.
+        """
+        from flask import current_app
+        
+        count = self.execution_adapter.count_history_from_rollup(filters)
+        if count is not None:
+            return count
+        
+        filters = {key: value for key, value in (filters or {}).items() if value}
+        max_age = current_app.config.get('HISTORY_COUNT_CACHE_SECONDS', 30)
+        key = (tuple(sorted(filters.items())), self.execution_adapter.get_latest_id())
+        now = time.monotonic()
+        
+        cached = self._history_counts.get(key)
+        if cached and now - cached[1] < max_age:
+            return cached[0]
+        
+        count = self.execution_adapter.count_history(filters)
+        
+        # Drop expired entries so the cache does not grow without bound
+        self._history_counts = {cache_key: value for cache_key, value in self._history_counts.items()
+                                if now - value[1] < max_age}
+        self._history_counts[key] = (count, now)
+        return count
     
     def get_execution_stats(self, days=7):
         """Get statistics about script executions for the dashboard chart"""
         return self.execution_adapter.get_stats(days)
     
-    def run_script(self, script_id, profile_id, user_id, parameters=None, region_override=None, is_scheduled=0, job_id=None):
-        """Run a script with the given parameters"""
+    def run_script(self, script_id, profile_id, user_id, parameters=None, region_override=None, is_scheduled=0, job_id=None,
+                   scheduled_at=None, dispatched_at=None, schedule_id=None):
+        """
+        Run a script with the given parameters
+        
+        For scheduled runs, scheduled_at (the time the scheduler planned to
+        fire the job) and dispatched_at (the time the job started running)
+        are recorded with the process start and first output times.
+        """
         # Get script and profile
         script = self.script_adapter.get_by_id(script_id)
         profile = self.aws_profile_adapter.get_by_id(profile_id)
@@ -99,9 +232,200 @@ class ExecutionService:
             user_id=user_id,
             status="Pending",
             parameters=json.dumps(parameters) if parameters else None,
-            is_scheduled=is_scheduled
+            is_scheduled=is_scheduled,
+            schedule_id=schedule_id if schedule_id is not None else self._get_schedule_id(job_id)
         )
+        self._emit_status_update(execution_id, 'Pending', script_id=script.id)
+        
+        # Get the current Flask app for the thread
+        try:
+            from flask import current_app
+            flask_app = current_app._get_current_object()
+        except RuntimeError:
+            flask_app = None
+        
+        self._start_script_thread(execution_id, script, profile, parameters, region_override, flask_app,
+                                  is_scheduled, job_id, self._get_timing(is_scheduled, scheduled_at, dispatched_at))
+        
+        return execution_id
+    
+    def enqueue_scheduled_run(self, script_id, profile_id, user_id, parameters=None, job_id=None,
+                              scheduled_at=None, dispatched_at=None):
+        """
+        Queue a scheduled run to be started by the dispatcher thread.
+        
+        Does no database work, so scheduler jobs return at once; the
+        dispatcher starts queued runs in batches with one commit each.
+        """
+        self._scheduled_runs.put({
+            'script_id': script_id,
+            'profile_id': profile_id,
+            'user_id': user_id,
+            'parameters': parameters,
+            'job_id': job_id,
+            'scheduled_at': scheduled_at,
+            'dispatched_at': dispatched_at
+        })
+        self._start_dispatcher()
+    
+    def run_scheduled_batch(self, runs):
+        """
+        Start a batch of scheduled runs.
+        
+        Scripts and profiles are loaded in one query each and the execution
+        records created in one commit, before the script threads start. The
+        same commit moves the schedules past the runs that fired.
+        
+        Args:
+            runs (list): Runs queued by enqueue_scheduled_run
+        
+        Returns:
+            list: IDs of the executions started
+        """
+        scripts = self.script_adapter.get_by_ids({run['script_id'] for run in runs})
+        profiles = self.aws_profile_adapter.get_by_ids({run['profile_id'] for run in runs})
+        
+        now = datetime.now()
+        start_time = now.isoformat()
+        started = []
+        for run in runs:
+            script = scripts.get(run['script_id'])
+            profile = profiles.get(run['profile_id'])
+            if not script or not profile:
+                logger.error(f"Cannot start scheduled job {run['job_id']}: "
+                             f"{'script' if not script else 'AWS profile'} not found")
+                continue
+            
+            execution = ExecutionORM(
+                script_id=script.id,
+                aws_profile_id=profile.id,
+                user_id=run['user_id'],
+                status="Pending",
+                start_time=start_time,
+                parameters=json.dumps(run['parameters']) if run['parameters'] else None,
+                is_scheduled=1,
+                schedule_id=self._get_schedule_id(run['job_id'])
+            )
+            execution.add()
+            started.append((execution, script, profile, run))
+        
+        # Import here to avoid circular imports
+        from app.services.scheduler_service import scheduler_service
+        scheduler_service.advance_fired_schedules(
+            {execution.schedule_id: run['job_id'] for execution, _, _, run in started if execution.schedule_id},
+            now
+        )
+        
+        db.session.commit()
+        
+        for execution, script, profile, run in started:
+            self._emit_status_update(execution.id, 'Pending', script_id=script.id)
+            self._start_script_thread(execution.id, script, profile, run['parameters'], None, self.app, 1,
+                                      run['job_id'], self._get_timing(1, run['scheduled_at'], run['dispatched_at']))
+        
+        if started:
+            logger.info(f"Started {len(started)} scheduled executions")
+        return [execution.id for execution, _, _, _ in started]
+    
+    def _start_dispatcher(self):
+        """Start the thread that starts queued scheduled runs, if it is not running"""
+        with self._dispatcher_lock:
+            if self._dispatcher_thread and self._dispatcher_thread.is_alive():
+                return
+            self._dispatcher_thread = threading.Thread(target=self._dispatch_loop, name='scheduled-run-dispatcher')
+            self._dispatcher_thread.daemon = True
+            self._dispatcher_thread.start()
+    
+    def _dispatch_loop(self):  # pragma: no cover
+        """Start queued scheduled runs, taking up to dispatch_batch_size at a time"""
+        while True:
+            runs = [self._scheduled_runs.get()]
+            while len(runs) < self.dispatch_batch_size:
+                try:
+                    runs.append(self._scheduled_runs.get_nowait())
+                except Empty:
+                    break
+            
+            self._dispatch_batch(runs)
+    
+    def _dispatch_batch(self, runs):
+        """
+        Start a batch of scheduled runs in the app context.
+        
+        If the batch cannot be committed, its runs are retried one at a time,
+        so one bad run or a transient error does not drop the others. A run
+        that still cannot be started is recorded as a failed execution.
+        """
+        try:
+            with self.app.app_context():
+                try:
+                    return self.run_scheduled_batch(runs)
+                except Exception as e:
+                    db.session.rollback()
+                    if len(runs) == 1:
+                        self._record_failed_run(runs[0], e)
+                        return []
+                    logger.warning(f"Error starting {len(runs)} scheduled executions, retrying one by one: {str(e)}")
+                
+                started = []
+                for run in runs:
+                    try:
+                        started.extend(self.run_scheduled_batch([run]))
+                    except Exception as e:
+                        db.session.rollback()
+                        self._record_failed_run(run, e)
+                return started
+        except Exception as e:
+            logger.error(f"Error starting {len(runs)} scheduled executions: {str(e)}", exc_info=True)
+            return []
+    
+    def _record_failed_run(self, run, error):
+        """Record a scheduled run that could not be started as a failed execution (app context required)"""
+        logger.error(f"Error starting scheduled job {run['job_id']}: {str(error)}", exc_info=error)
         
+        now = datetime.now()
+        try:
+            execution = ExecutionORM(
+                script_id=run['script_id'],
+                aws_profile_id=run['profile_id'],
+                user_id=run['user_id'],
+                status="Failed",
+                start_time=now.isoformat(),
+                end_time=now.isoformat(),
+                output=f"[SYSTEM] Scheduled run could not be started: {str(error)}",
+                parameters=json.dumps(run['parameters']) if run['parameters'] else None,
+                is_scheduled=1,
+                schedule_id=self._get_schedule_id(run['job_id'])
+            )
+            execution.add()
+            
+            # Import here to avoid circular imports
+            from app.services.scheduler_service import scheduler_service
+            if execution.schedule_id:
+                scheduler_service.advance_fired_schedules({execution.schedule_id: run['job_id']}, now)
+            
+            db.session.commit()
+            self._emit_status_update(execution.id, 'Failed', script_id=run['script_id'])
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error recording failed scheduled job {run['job_id']}: {str(e)}")
+    
+    def _get_schedule_id(self, job_id):
+        """Get the schedule ID from a scheduler job ID, which ends with it"""
+        try:
+            return int(job_id.rsplit('_', 1)[-1]) if job_id else None
+        except ValueError:
+            return None
+    
+    def _get_timing(self, is_scheduled, scheduled_at, dispatched_at):
+        """Get the times to measure the scheduling lag of a run by, or None for unscheduled runs"""
+        if is_scheduled == 1 and scheduled_at is not None:
+            return {'planned_at': scheduled_at, 'dispatched_at': dispatched_at}
+        return None
+    
+    def _start_script_thread(self, execution_id, script, profile, parameters, region_override, flask_app,
+                             is_scheduled, job_id, timing):
+        """Start a thread running the script of an execution"""
         # Prepare AWS environment variables
         aws_env = os.environ.copy()
         aws_env['AWS_ACCESS_KEY_ID'] = profile.aws_access_key
@@ -120,22 +444,13 @@ class ExecutionService:
                 elif value:  # For parameters with values
                     script_params.extend([f'--{key}', str(value)])
         
-        # Get the current Flask app for the thread
-        try:
-            from flask import current_app
-            flask_app = current_app._get_current_object()
-        except RuntimeError:
-            flask_app = None
-
         # Start script in a thread
         thread = threading.Thread(
             target=self._run_script_thread, 
-            args=(execution_id, script.path, aws_env, script_params, flask_app, is_scheduled, job_id)
+            args=(execution_id, script.path, aws_env, script_params, flask_app, is_scheduled, job_id, timing)
         )
         thread.daemon = True
         thread.start()
-        
-        return execution_id
     
     def cancel_execution(self, execution_id):
         """Cancel a running script execution"""
@@ -152,12 +467,15 @@ class ExecutionService:
             if execution_dict['status'] != 'Running':
                 raise ValueError("Cannot cancel execution that is not running")
             
-            # Flag this execution as explicitly cancelled in the database first
-            self.execution_adapter.update_status(
-                execution_id=execution_id,
-                status="Cancelled",
-                output="\n[SYSTEM] Cancellation requested by user - terminating process..."
-            )
+            # Flag this execution as explicitly cancelled in the database first.
+            # While it is streaming here, the thread running it saves the message
+            # in order with the rest of its output
+            cancel_message = "\n[SYSTEM] Cancellation requested by user - terminating process..."
+            streaming = execution_id in output_batchers
+            if not self.execution_adapter.cancel(execution_id, output=None if streaming else cancel_message):
+                raise ValueError("Cannot cancel execution that is not running")
+            if streaming:
+                self._write_output(execution_id, cancel_message)
             
             # Check if we have a reference to the running process
             process = running_processes.get(execution_id)
@@ -217,19 +535,15 @@ class ExecutionService:
             # We've already set the status to Cancelled, so we just need to capture success
             success = True
             
-            # Update completion message
-            self.execution_adapter.append_output(
-                execution_id, 
-                "\n[SYSTEM] Process terminated successfully."
-            )
+            # Update completion message; a thread running the execution here reports it itself
+            if not streaming:
+                terminated_message = "\n[SYSTEM] Process terminated successfully."
+                self.execution_adapter.append_output(execution_id, terminated_message)
         
         # Emit status update
-        if success and socketio:
-            socketio.emit('script_status_update', {
-                'execution_id': execution_id,
-                'script_id': execution_dict['script_id'],
-                'status': 'Cancelled'
-            })
+        if success:
+            self._emit_status_update(execution_id, 'Cancelled', script_id=execution_dict['script_id'],
+                                     previous_status='Running')
         
         return success
     
@@ -254,13 +568,12 @@ class ExecutionService:
                 }
             
             # Check if AI help is enabled (using the lowercase version first, which is set in the UI)
-            ai_help_enabled = self.setting_adapter.get('enable_ai_help')
+            ai_help_enabled = self.setting_adapter.get_bool('enable_ai_help', None)
             if ai_help_enabled is None:
                 # If not found, try the uppercase version as fallback
-                ai_help_enabled = self.setting_adapter.get('ENABLE_AI_HELP', 'true')
+                ai_help_enabled = self.setting_adapter.get_bool('ENABLE_AI_HELP', True)
 
-            # Convert to lowercase and check if it's 'true'
-            if ai_help_enabled.lower() != 'true':
+            if not ai_help_enabled:
                 raise ValueError("AI help is disabled in settings")
             
             # Try to get API key from settings (check both keys)
@@ -319,11 +632,7 @@ class ExecutionService:
         
         with flask_app.app_context():
             # Check the EXECUTION_TIMEOUT setting
-            timeout_setting = self.setting_adapter.get('EXECUTION_TIMEOUT', '30')
-            try:
-                timeout_minutes = int(timeout_setting)
-            except ValueError:
-                timeout_minutes = 30
+            timeout_minutes = self.setting_adapter.get_int('EXECUTION_TIMEOUT', 30)
             
             # Calculate the cutoff time
             cutoff_time = (datetime.now() - timedelta(minutes=timeout_minutes)).isoformat()
@@ -340,26 +649,93 @@ class ExecutionService:
                 script_id = execution.script_id
                 
                 # Update the execution status
-                self.execution_adapter.update_status(
+                previous_status = self.execution_adapter.update_status(
                     execution_id=execution_id,
                     status="Failed",
                     output="\n[SYSTEM] Script execution timed out and was automatically terminated."
                 )
                 
                 # Emit status update
-                if socketio:
-                    socketio.emit('script_status_update', {
-                        'execution_id': execution_id,
-                        'script_id': script_id,
-                        'status': 'Failed'
-                    })
+                self._emit_status_update(execution_id, 'Failed', script_id=script_id, previous_status=previous_status)
                 
                 logger.warning(f"Execution {execution_id} (script: {script_id}) marked as failed due to timeout")
     
-    def _run_script_thread(self, execution_id, script_path, env_vars, script_params, flask_app, is_scheduled=0, job_id=None):
+    def _emit_status_update(self, execution_id, status, script_id=None, previous_status=None):
+        """Emit a status change to the dashboard room and the execution's own room"""
+        # Keep the in-memory dashboard state current, even without Socket.IO
+        try:
+            dashboard_update = dashboard_service.record_status(execution_id, status, previous_status)
+        except Exception as e:
+            logger.error(f"Error updating dashboard state for execution {execution_id}: {str(e)}")
+            dashboard_update = None
+        
+        if not socketio:
+            return
+        
+        payload = {
+            'execution_id': execution_id,
+            'status': status
+        }
+        if script_id is not None:
+            payload['script_id'] = script_id
+        
+        # A list of rooms is delivered once per client, even if it is in both
+        socketio.emit('script_status_update', payload,
+                      to=[DASHBOARD_ROOM, execution_room(execution_id)])
+        
+        # Dashboards apply the delta instead of reloading their data
+        if dashboard_update:
+            socketio.emit('dashboard_update', dashboard_update, to=DASHBOARD_ROOM)
+    
+    def _create_output_batcher(self, execution_id, flask_app):
+        """Create the batcher that coalesces output into frames for the execution room"""
+        config = flask_app.config if flask_app else {}
+        room = execution_room(execution_id)
+        
+        def emit_frame(frame):
+            if socketio:
+                socketio.emit('script_output', frame, to=room)
+        
+        return OutputBatcher(
+            execution_id,
+            emit_frame,
+            flush_interval=config.get('OUTPUT_FLUSH_INTERVAL_MS', 100) / 1000.0,
+            flush_chars=config.get('OUTPUT_FLUSH_CHARS', 16384),
+            max_frame_chars=config.get('OUTPUT_MAX_FRAME_CHARS', 262144),
+            replay_chars=config.get('OUTPUT_REPLAY_CHARS', 1048576)
+        )
+    
+    def _stream_output(self, execution_id, text):
+        """Send output to live viewers if the execution is still streaming"""
+        batcher = output_batchers.get(execution_id)
+        if batcher:
+            batcher.write(text)
+    
+    def _write_output(self, execution_id, text):
+        """
+        Add output to a running execution from another thread.
+        
+        The output goes through the execution's batcher, so the thread running
+        the execution saves it in the order it is streamed. Once that thread
+        has saved its last output, it is saved and streamed directly.
+        """
+        batcher = output_batchers.get(execution_id)
+        if batcher and batcher.write(text, persist=True):
+            return
+        
+        self.execution_adapter.append_output(execution_id, text)
+        self._stream_output(execution_id, text)
+    
+    def _save_output(self, execution_id, batcher, close=False):
+        """Append the output written to the batcher since the last save to the database"""
+        text = batcher.take_unsaved(close)
+        if text:
+            self.execution_adapter.append_output(execution_id, text)
+    
+    def _run_script_thread(self, execution_id, script_path, env_vars, script_params, flask_app, is_scheduled=0, job_id=None,
+                           timing=None):
         """Run a script in a thread and capture output"""
         global input_queues, running_processes
-        from queue import Queue
         
         # Create input queue for this execution
         input_queues[execution_id] = Queue()
@@ -369,20 +745,27 @@ class ExecutionService:
             app_context = flask_app.app_context()
             app_context.push()
         
+        # Coalesce live output into frames instead of one message per line
+        batcher = self._create_output_batcher(execution_id, flask_app)
+        register_batcher(batcher)
+        
+        # Persist output to the database in larger chunks than it is streamed
+        config = flask_app.config if flask_app else {}
+        persist_interval = config.get('OUTPUT_PERSIST_INTERVAL_MS', 1000) / 1000.0
+        persist_chars = config.get('OUTPUT_PERSIST_CHARS', 65536)
+        
         try:
             # Update status to Running
-            self.execution_adapter.update_status(
+            start_message = "[SYSTEM] Starting script execution...\n"
+            previous_status = self.execution_adapter.update_status(
                 execution_id=execution_id,
                 status="Running",
-                output="[SYSTEM] Starting script execution...\n"
+                output=start_message
             )
+            self._stream_output(execution_id, start_message)
             
             # Emit status update
-            if socketio:
-                socketio.emit('script_status_update', {
-                    'execution_id': execution_id,
-                    'status': 'Running'
-                })
+            self._emit_status_update(execution_id, 'Running', previous_status=previous_status)
             
             # Assemble command
             command = ['python', script_path] + script_params
@@ -397,13 +780,15 @@ class ExecutionService:
                 universal_newlines=True,
                 bufsize=1  # Line buffered
             )
+            if timing is not None:
+                timing['started_at'] = datetime.now()
             
             # Store the process in the global dictionary
             running_processes[execution_id] = process
             
-            # Read output and update execution
-            output_buffer = ""
-            last_update_time = datetime.now()
+            # Read output and update execution; output is saved from the batcher so
+            # messages written by other threads are stored in stream order
+            last_update_time = time.monotonic()
             
             while True:
                 # Check if there's input in the queue
@@ -413,12 +798,11 @@ class ExecutionService:
                     process.stdin.flush()
                     
                     # Echo input to output
-                    output_buffer += f"[INPUT]: {input_text}"
+                    batcher.write(f"[INPUT]: {input_text}", persist=True)
                     
                     # Update execution more frequently when there's interaction
-                    self.execution_adapter.append_output(execution_id, output_buffer)
-                    output_buffer = ""
-                    last_update_time = datetime.now()
+                    self._save_output(execution_id, batcher)
+                    last_update_time = time.monotonic()
                 
                 # Read output
                 output_line = process.stdout.readline()
@@ -426,29 +810,23 @@ class ExecutionService:
                     break
                 
                 if output_line:
-                    # Add line to buffer
-                    output_buffer += output_line
+                    if timing is not None and 'first_output_at' not in timing:
+                        timing['first_output_at'] = datetime.now()
                     
-                    # Emit output to socket
-                    if socketio:
-                        socketio.emit('script_output', {
-                            'execution_id': execution_id,
-                            'output': output_line
-                        })
+                    # Queue output for the next frame sent to this execution's room
+                    batcher.write(output_line, persist=True)
                     
                     # Update execution in database periodically
-                    time_since_update = (datetime.now() - last_update_time).total_seconds()
-                    if time_since_update > 1.0 or len(output_buffer) > 1000:
-                        self.execution_adapter.append_output(execution_id, output_buffer)
-                        output_buffer = ""
-                        last_update_time = datetime.now()
+                    now = time.monotonic()
+                    if now - last_update_time > persist_interval or batcher.unsaved_size > persist_chars:
+                        self._save_output(execution_id, batcher)
+                        last_update_time = now
             
             # Get return code
             return_code = process.poll()
             
-            # Write any remaining output
-            if output_buffer:
-                self.execution_adapter.append_output(execution_id, output_buffer)
+            # Write any remaining output; later messages from other threads are saved directly
+            self._save_output(execution_id, batcher, close=True)
             
             # Update status based on return code
             # Only mark as cancelled if it was explicitly cancelled by the user
@@ -471,55 +849,50 @@ class ExecutionService:
                 final_status = "Failed"
                 output_message = f"\n[SYSTEM] Script execution failed with return code {return_code}"
                 
-            self.execution_adapter.update_status(
+            previous_status = self.execution_adapter.update_status(
                 execution_id=execution_id,
                 status=final_status,
                 output=output_message
             )
+            self._stream_output(execution_id, output_message)
+            unregister_batcher(execution_id)
             
-            # Emit status update
-            if socketio:
-                socketio.emit('script_status_update', {
-                    'execution_id': execution_id,
-                    'status': final_status
-                })
+            # Emit status update; a cancelled execution is already counted as cancelled
+            self._emit_status_update(execution_id, final_status, previous_status=previous_status)
                 
             logger.info(f"Script execution {execution_id} completed with status: {final_status}")
             
-            # Update next_run time in scheduler if this was a scheduled execution and was successful
-            if is_scheduled == 1 and final_status == "Success" and job_id:
-                try:
-                    # Import here to avoid circular imports
-                    from app.services.scheduler_service import scheduler_service
-                    # Update the next run time in the database
-                    scheduler_service.update_next_run_after_execution(job_id)
-                    logger.info(f"Updated next_run time for job {job_id} after successful execution")
-                except Exception as e:
-                    logger.error(f"Error updating next_run time for job {job_id}: {str(e)}", exc_info=True)
-            
         except Exception as e:
             # Handle any exceptions in the thread
+            try:
+                self._save_output(execution_id, batcher, close=True)
+            except Exception as save_error:
+                logger.error(f"Error saving output of execution {execution_id}: {str(save_error)}")
+            
             error_message = f"\n[SYSTEM] Error running script: {str(e)}"
-            self.execution_adapter.update_status(
+            previous_status = self.execution_adapter.update_status(
                 execution_id=execution_id,
                 status="Failed",
                 output=error_message
             )
+            self._stream_output(execution_id, error_message)
             
             # Emit status update
-            if socketio:
-                socketio.emit('script_status_update', {
-                    'execution_id': execution_id,
-                    'status': 'Failed'
-                })
+            self._emit_status_update(execution_id, 'Failed', previous_status=previous_status)
                 
             logger.error(f"Error in script execution {execution_id}: {str(e)}", exc_info=True)
             
         finally:
+            if timing is not None:
+                self._record_timing(execution_id, job_id, timing)
+            
             # Clean up
             if flask_app:
                 app_context.pop()
             
+            # Send any output still pending and stop streaming
+            unregister_batcher(execution_id)
+            
             # Remove input queue
             if execution_id in input_queues:
                 del input_queues[execution_id]
@@ -528,6 +901,19 @@ class ExecutionService:
             if execution_id in running_processes:
                 del running_processes[execution_id]
     
+    def _record_timing(self, execution_id, job_id, timing):
+        """Save how late a scheduled execution got going"""
+        try:
+            ExecutionTimingORM.record(
+                execution_id, self._get_schedule_id(job_id), timing['planned_at'],
+                dispatched_at=timing.get('dispatched_at'),
+                started_at=timing.get('started_at'),
+                first_output_at=timing.get('first_output_at')
+            )
+        except Exception as e:
+            db.session.rollback()
+            logger.error(f"Error recording timings of execution {execution_id}: {str(e)}")
+    
     def _analyze_error_with_openai(self, script_name, script_path, error_output, api_key):
         """Analyze a script error using OpenAI API"""
         try:
@@ -0,0 +1,251 @@
+import time
+import logging
+import threading
+from collections import deque
+
+logger = logging.getLogger('yellowstack')
+
+# Active output batchers by execution ID
+output_batchers = {}
+
+# Lock guarding the registry and the background flusher
+_registry_lock = threading.Lock()
+_flusher_thread = None
+
+class OutputBatcher:
+    """
+    Coalesces script output into time/size-bounded frames.
+
+    Output written between flushes is sent as a single frame, either when
+    `flush_chars` characters are pending or `flush_interval` seconds have
+    passed since the last flush. Each frame carries a sequence number and
+    the character offset of its text within the execution output, so
+    clients can detect gaps and resume from a known position. The most
+    recent frames are kept in memory so reconnecting clients can be
+    replayed output that has not been written to the database yet. All
+    sizes and offsets are in characters of the output text.
+
+    Output written with `persist` is also kept until the thread saving the
+    execution takes it, so output from several threads is stored in the
+    same order it is streamed and the frame offsets match the stored output.
+    """
+
+    def __init__(self, execution_id, emit_func, flush_interval=0.1, flush_chars=16384,
+                 max_frame_chars=262144, start_offset=0, replay_chars=1048576):
+        """
+        Initialize the batcher
+
+        Args:
+            execution_id: ID of the execution the output belongs to
+            emit_func: Callable receiving each frame dictionary
+            flush_interval (float): Maximum seconds output stays pending
+            flush_chars (int): Pending characters that trigger an immediate flush
+            max_frame_chars (int): Most characters sent in one frame; older pending
+                                   output beyond this is skipped and reported as a gap
+            start_offset (int): Length of output already stored for the execution
+            replay_chars (int): Characters of recent output kept for replay
+        """
+        self.execution_id = execution_id
+        self.emit_func = emit_func
+        self.flush_interval = flush_interval
+        self.flush_chars = flush_chars
+        self.max_frame_chars = max_frame_chars
+        self.replay_chars = replay_chars
+
+        self.seq = 0
+        self.offset = start_offset
+        self.dropped_chars = 0
+
+        self._pending = []
+        self._pending_size = 0
+        self._last_flush = time.monotonic()
+
+        # Output not yet saved to the database, and whether more is accepted
+        self._unsaved = []
+        self.unsaved_size = 0
+        self._saving_closed = False
+        self._lock = threading.Lock()
+
+        # Recently emitted frames as (offset, text) pairs, oldest first
+        self._recent = deque()
+        self._recent_size = 0
+
+    def write(self, text, persist=False):
+        """
+        Add output to the pending frame, flushing if the size limit is reached.
+
+        Args:
+            text (str): Output to send
+            persist (bool): Also keep the output until take_unsaved() so it is
+                            saved in stream order
+
+        Returns:
+            bool: False if the output was to be persisted but the batcher no
+                  longer accepts output to save; it is not streamed either
+        """
+        if not text:
+            return True
+
+        with self._lock:
+            if persist:
+                if self._saving_closed:
+                    return False
+                self._unsaved.append(text)
+                self.unsaved_size += len(text)
+
+            self._pending.append(text)
+            self._pending_size += len(text)
+
+            if self._pending_size >= self.flush_chars:
+                self._flush_locked()
+
+        return True
+
+    def take_unsaved(self, close=False):
+        """
+        Take the output written with `persist` since the last call.
+
+        Args:
+            close (bool): Stop accepting output to persist, once the caller
+                          has saved its last output
+
+        Returns:
+            str: Output to append to the stored execution output
+        """
+        with self._lock:
+            text = ''.join(self._unsaved)
+            self._unsaved = []
+            self.unsaved_size = 0
+            if close:
+                self._saving_closed = True
+            return text
+
+    def flush_if_due(self, now=None):
+        """Flush pending output if the flush interval has elapsed"""
+        now = time.monotonic() if now is None else now
+
+        with self._lock:
+            if self._pending and now - self._last_flush >= self.flush_interval:
+                self._flush_locked()
+
+    def flush(self):
+        """Flush any pending output immediately"""
+        with self._lock:
+            self._flush_locked()
+
+    def read_since(self, offset):
+        """
+        Flush pending output and return the recent output from an offset.
+
+        Args:
+            offset (int): Character offset the caller already has output up to
+
+        Returns:
+            tuple: (start_offset, text, seq) where start_offset is where the
+                   returned text begins. It is greater than the requested
+                   offset when that part of the output is no longer in memory.
+        """
+        with self._lock:
+            self._flush_locked()
+
+            start_offset = self.offset
+            chunks = []
+            for chunk_offset, text in self._recent:
+                chunk_end = chunk_offset + len(text)
+                if chunk_end <= offset:
+                    continue
+
+                skip = max(0, offset - chunk_offset)
+                if not chunks:
+                    start_offset = chunk_offset + skip
+                chunks.append(text[skip:])
+
+            return start_offset, ''.join(chunks), self.seq
+
+    def _flush_locked(self):
+        """Build and emit a frame from pending output (lock must be held)"""
+        self._last_flush = time.monotonic()
+
+        if not self._pending:
+            return
+
+        text = ''.join(self._pending)
+        self._pending = []
+        self._pending_size = 0
+
+        frame_offset = self.offset
+        self.offset += len(text)
+
+        # A consumer that cannot keep up gets the latest output, not a backlog
+        skipped = 0
+        if len(text) > self.max_frame_chars:
+            skipped = len(text) - self.max_frame_chars
+            text = text[skipped:]
+            frame_offset += skipped
+            self.dropped_chars += skipped
+
+        self._remember(frame_offset, text)
+
+        self.seq += 1
+        frame = {
+            'execution_id': self.execution_id,
+            'seq': self.seq,
+            'offset': frame_offset,
+            'next_offset': self.offset,
+            'skipped': skipped,
+            'output': text
+        }
+
+        try:
+            self.emit_func(frame)
+        except Exception as e:
+            logger.error(f"Error emitting output frame for execution {self.execution_id}: {str(e)}")
+
+    def _remember(self, offset, text):
+        """Keep a frame for replay, discarding the oldest beyond replay_chars"""
+        self._recent.append((offset, text))
+        self._recent_size += len(text)
+
+        while self._recent_size > self.replay_chars and len(self._recent) > 1:
+            _, dropped = self._recent.popleft()
+            self._recent_size -= len(dropped)
+
+def register_batcher(batcher):
+    """Register a batcher so the background flusher picks up its pending output"""
+    global _flusher_thread
+
+    with _registry_lock:
+        output_batchers[batcher.execution_id] = batcher
+
+        # The flusher thread exits when there is nothing to flush, so restart it on demand
+        if _flusher_thread is None or not _flusher_thread.is_alive():
+            _flusher_thread = threading.Thread(target=_flush_loop, name='output-flusher')
+            _flusher_thread.daemon = True
+            _flusher_thread.start()
+
+def unregister_batcher(execution_id):
+    """Flush and remove the batcher for an execution"""
+    with _registry_lock:
+        batcher = output_batchers.pop(execution_id, None)
+
+    if batcher:
+        batcher.flush()
+    return batcher
+
+def _flush_loop():
+    """Periodically flush batchers whose interval has elapsed"""
+    global _flusher_thread
+
+    while True:
+        with _registry_lock:
+            batchers = list(output_batchers.values())
+            if not batchers:
+                _flusher_thread = None
+                return
+
+        interval = min(batcher.flush_interval for batcher in batchers)
+        time.sleep(interval)
+
+        now = time.monotonic()
+        for batcher in batchers:
+            batcher.flush_if_due(now)
@@ -0,0 +1,84 @@
+import threading
+from apscheduler.executors.base import run_job
+from apscheduler.executors.pool import ThreadPoolExecutor
+
+# Run time of the job the current thread is running
+_current = threading.local()
+
+def get_scheduled_run_time():
+    """
+    Get the time the scheduler planned to run the job on this thread.
+
+    Returns:
+        datetime: Planned run time, or None outside a scheduled job
+    """
+    return getattr(_current, 'run_time', None)
+
+class InstrumentedThreadPoolExecutor(ThreadPoolExecutor):
+    """
+    Thread pool executor that tracks how busy the pool is.
+
+    Each job is run once per run time with the planned run time available
+    through get_scheduled_run_time(), so callbacks can measure how late they
+    got going. The number of running and queued jobs is counted, along with
+    the highest number of jobs running at once.
+    """
+
+    def __init__(self, max_workers=10, pool_kwargs=None):
+        super().__init__(max_workers, pool_kwargs)
+        self.max_workers = int(max_workers)
+        self._stats_lock = threading.Lock()
+        self._queued = 0
+        self._running = 0
+        self._peak_running = 0
+        self._submitted = 0
+
+    def _do_submit_job(self, job, run_times):
+        def callback(f):
+            exc = f.exception()
+            if exc:
+                self._run_job_error(job.id, exc, exc.__traceback__)
+            else:
+                self._run_job_success(job.id, f.result())
+
+        with self._stats_lock:
+            self._queued += 1
+            self._submitted += 1
+
+        f = self._pool.submit(self._run_job, job, job._jobstore_alias, run_times, self._logger.name)
+        f.add_done_callback(callback)
+
+    def _run_job(self, job, jobstore_alias, run_times, logger_name):
+        """Run a job for each of its run times, counting it as running meanwhile"""
+        with self._stats_lock:
+            self._queued -= 1
+            self._running += 1
+            self._peak_running = max(self._peak_running, self._running)
+
+        try:
+            events = []
+            for run_time in run_times:
+                _current.run_time = run_time
+                events.extend(run_job(job, jobstore_alias, [run_time], logger_name))
+            return events
+        finally:
+            _current.run_time = None
+            with self._stats_lock:
+                self._running -= 1
+
+    def get_stats(self):
+        """
+        Get the pool size and how many jobs are running and waiting.
+
+        Returns:
+            dict: Pool statistics, with saturation as the share of busy threads
+        """
+        with self._stats_lock:
+            return {
+                'max_workers': self.max_workers,
+                'running': self._running,
+                'queued': self._queued,
+                'peak_running': self._peak_running,
+                'submitted': self._submitted,
+                'saturation': round(self._running / self.max_workers, 3) if self.max_workers else 0
+            }
@@ -1,19 +1,159 @@
+import os
 import json
+import math
+import time
+import zlib
+import socket
 import logging
+import threading
+from bisect import bisect_left, bisect_right
 from datetime import datetime, timedelta
+from functools import lru_cache
+from itertools import accumulate
+from apscheduler.events import EVENT_JOB_MISSED
 from apscheduler.schedulers.background import BackgroundScheduler
 from apscheduler.triggers.cron import CronTrigger
+from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 from flask import current_app
+from sqlalchemy.orm import aliased
 from app.services import execution_service
+from app.services.event_bus import event_bus
+from app.services.scheduler_executor import InstrumentedThreadPoolExecutor
+from app.services.dashboard_service import dashboard_service
 from app.utils.db import db
 from app.models.script_orm import ScriptORM
 from app.models.aws_profile_orm import AWSProfileORM
 
 logger = logging.getLogger('yellowstack')
 
+# Schedule types and the prefixes of their scheduler job IDs
+SCHEDULE_TYPES = ('daily', 'interval', 'cron')
+SCHEDULE_JOB_PREFIXES = tuple(f"{schedule_type}_" for schedule_type in SCHEDULE_TYPES)
+
+MINUTES_PER_DAY = 24 * 60
+
+# Longest interval schedule, and most days of a cron schedule walked through
+# when counting missed runs
+MAX_INTERVAL_MINUTES = 7 * MINUTES_PER_DAY
+MAX_CRON_DAYS_COUNTED = 31
+
+# Longest schedule value, the size of the schedule_value column
+SCHEDULE_VALUE_MAX_LENGTH = 128
+
+# Days of execution history a forecast takes script durations from, and the
+# duration assumed for scripts without finished executions in that time
+FORECAST_HISTORY_DAYS = 30
+FORECAST_DEFAULT_DURATION_MS = 60 * 1000
+
+# What to do with runs missed by more than the grace window: skip them, run
+# once to catch up, or run each of them up to the schedule's max_catchup_runs
+MISFIRE_POLICIES = ('skip', 'once', 'all')
+
+# Prefix of the one-off jobs that catch up on missed runs
+CATCHUP_JOB_PREFIX = 'catchup_'
+
+# Execution status recording a misfire decision
+MISSED_STATUS = 'Missed'
+
+# Fields schedule listings can be sorted by
+SCHEDULE_SORT_FIELDS = ('created_at', 'next_run', 'last_run', 'script_name', 'last_status', 'consecutive_failures')
+
+@lru_cache(maxsize=1024)
+def compile_cron(expression):
+    """
+    Compile a five-field crontab expression into a trigger, once per expression.
+    
+    Triggers hold no state between fire times, so jobs with the same
+    expression share one.
+    
+    Raises:
+        ValueError: If the expression is not valid
+    """
+    return CronTrigger.from_crontab(expression)
+
+@lru_cache(maxsize=1024)
+def get_cron_times_of_day(expression):
+    """
+    Get the minutes of the day at which a crontab expression fires, on the
+    days it fires at all.
+    
+    The minute and hour fields of a crontab do not depend on the date, so
+    this is worked out once per expression from the fields' values.
+    
+    Returns:
+        tuple: Minutes since midnight, ascending
+    """
+    fields = {field.name: field for field in compile_cron(expression).fields}
+    hours = [hour for hour in range(24) if fields['hour'].get_next_value(datetime(2000, 1, 1, hour)) == hour]
+    minutes = [minute for minute in range(60)
+               if fields['minute'].get_next_value(datetime(2000, 1, 1, 0, minute)) == minute]
+    return tuple(hour * 60 + minute for hour in hours for minute in minutes)
+
+def iter_cron_days(expression, start, end):
+    """
+    Iterate the days on which a crontab expression fires, from the day of
+    start up to end.
+    
+    Takes one trigger lookup per day that fires, however often it fires.
+    
+    Args:
+        expression (str): Crontab expression
+        start (datetime): Naive local time in the first day
+        end (datetime): Naive local time the days start before
+        
+    Yields:
+        datetime: Naive local midnight of each day
+    """
+    trigger = compile_cron(expression)
+    day = start.replace(hour=0, minute=0, second=0, microsecond=0)
+    while day < end:
+        fire_time = trigger.get_next_fire_time(None, day.astimezone(trigger.timezone))
+        if fire_time is None:
+            return
+        
+        day = fire_time.astimezone().replace(tzinfo=None, hour=0, minute=0, second=0, microsecond=0)
+        if day < end:
+            yield day
+        day += timedelta(days=1)
+
+def get_cron_fire_minutes(expression, start, minutes):
+    """
+    Get the minutes after start at which a crontab expression fires.
+    
+    Args:
+        expression (str): Crontab expression
+        start (datetime): Naive local time on a whole minute
+        minutes (int): Length of the window
+        
+    Returns:
+        list: Minutes from start, ascending, all below `minutes`
+    """
+    times_of_day = get_cron_times_of_day(expression)
+    fire_minutes = []
+    for day in iter_cron_days(expression, start, start + timedelta(minutes=minutes)):
+        offset = int((day - start).total_seconds() // 60)
+        fire_minutes.extend(offset + minute for minute in times_of_day if 0 <= offset + minute < minutes)
+    return fire_minutes
+
+# Lease that elects the one process firing scheduled jobs
+SCHEDULER_LEASE = 'scheduler'
+
+# Lag percentiles reported by the scheduler metrics
+LAG_PERCENTILES = (50, 95, 99)
+LAG_METRICS = ('dispatch_lag_ms', 'start_lag_ms', 'first_output_lag_ms')
+
 class SchedulerService:
-    """Service for managing scheduled script executions using the ORM"""
+    """
+    Service for managing scheduled script executions using the ORM
+    
+    Every process (e.g. each gunicorn worker) runs a scheduler, but with
+    leader election only the one holding the scheduler lease fires jobs; the
+    others keep theirs paused. The lease is renewed on a heartbeat and taken
+    over by another process once it expires. Schedule changes bump a version
+    on the lease row, which the leader checks on every heartbeat to reload
+    schedules changed through other processes.
+    """
     
     # Allowed time and interval values for UI/validation
     ALLOWED_TIME_SLOTS = [
@@ -30,29 +170,224 @@ class SchedulerService:
     
     def __init__(self, use_orm=True):
         """Initialize the scheduler manager"""
-        self.scheduler = BackgroundScheduler()
+        self.executor = InstrumentedThreadPoolExecutor()
+        self.scheduler = BackgroundScheduler(executors={'default': self.executor})
         self.run_script_func = None
         self.app = None
+        self.jitter_seconds = 0
+        self.balance_window_minutes = 30
+        self.misfire_policy = 'skip'
+        self.misfire_grace_seconds = 60
+        self.max_catchup_runs = 3
+        self.catchup_interval_seconds = 2
         self.execution_service = execution_service
+        
+        # Leader election
+        self.leader_election = True
+        self.lease_seconds = 15
+        self.heartbeat_seconds = 5
+        self.instance_id = f"{socket.gethostname()}:{os.getpid()}:{event_bus.bus_id}"
+        self.is_leader = False
+        self._lease_expires = 0
+        self._loaded_version = None
+        self._election_lock = threading.Lock()
+        self._heartbeat_thread = None
+        self._stopping = threading.Event()
         self.execution_service.use_orm = True
     
     def init_app(self, app, run_script_func):
         """Initialize with Flask app and run_script function"""
         self.app = app
         self.run_script_func = run_script_func
+        self.jitter_seconds = int(app.config.get('SCHEDULE_JITTER_SECONDS', self.jitter_seconds))
+        self.balance_window_minutes = int(app.config.get('SCHEDULE_BALANCE_WINDOW_MINUTES', self.balance_window_minutes))
+        self.misfire_policy = app.config.get('SCHEDULE_MISFIRE_POLICY', self.misfire_policy)
+        self.misfire_grace_seconds = int(app.config.get('SCHEDULE_MISFIRE_GRACE_SECONDS', self.misfire_grace_seconds))
+        self.max_catchup_runs = int(app.config.get('SCHEDULE_MAX_CATCHUP_RUNS', self.max_catchup_runs))
+        self.catchup_interval_seconds = float(app.config.get('SCHEDULE_CATCHUP_INTERVAL_SECONDS', self.catchup_interval_seconds))
+        self.leader_election = bool(app.config.get('SCHEDULER_LEADER_ELECTION', self.leader_election))
+        self.lease_seconds = float(app.config.get('SCHEDULER_LEASE_SECONDS', self.lease_seconds))
+        self.heartbeat_seconds = float(app.config.get('SCHEDULER_HEARTBEAT_SECONDS', self.heartbeat_seconds))
+        
+        # Jobs only queue their run, so a small pool can fire many jobs at once
+        executor_workers = int(app.config.get('SCHEDULER_EXECUTOR_WORKERS', self.executor.max_workers))
+        if executor_workers != self.executor.max_workers:
+            self.executor = InstrumentedThreadPoolExecutor(executor_workers)
+            self.scheduler.configure(executors={'default': self.executor})
+        
+        # Record runs the scheduler skipped for being too late
+        self.scheduler.add_listener(self._on_job_missed, EVENT_JOB_MISSED)
+        
+        if not self.leader_election:
+            # Start the scheduler
+            self.scheduler.start()
+            self.is_leader = True
+            logger.info("ORM Scheduler initialized and started")
+            
+            # Load existing schedules
+            self.load_schedules()
+            return
         
-        # Start the scheduler
-        self.scheduler.start()
-        logger.info("ORM Scheduler initialized and started")
+        # Jobs only fire while this process holds the scheduler lease
+        self.scheduler.start(paused=True)
+        logger.info(f"ORM Scheduler initialized as {self.instance_id}")
         
-        # Load existing schedules
-        self.load_schedules()
+        self.run_election()
+        self._start_heartbeat()
     
-    def load_schedules(self):
-        """Load and restore all enabled schedules from the database"""
+    def run_election(self):
+        """
+        Take or renew the scheduler lease, and start or stop firing jobs accordingly.
+        
+        On taking the lease, schedules are loaded before jobs start firing;
+        the leader also reloads them whenever the change version on the lease
+        has moved. A leader that cannot reach the database keeps firing only
+        until the lease it holds expires, when another process may take over.
+        
+        Returns:
+            bool: True if this process is the leader
+        """
+        # Import the model here to avoid circular imports
+        from app.models.scheduler_orm import SchedulerLeaseORM
+        
+        with self._election_lock:
+            now = time.time()
+            try:
+                with self.app.app_context():
+                    leader = SchedulerLeaseORM.acquire(SCHEDULER_LEASE, self.instance_id, self.lease_seconds, now)
+                    version = SchedulerLeaseORM.get_version(SCHEDULER_LEASE) if leader else None
+                if leader:
+                    self._lease_expires = now + self.lease_seconds
+            except Exception as e:
+                logger.error(f"Error renewing scheduler lease: {str(e)}")
+                leader = self.is_leader and now < self._lease_expires
+                version = self._loaded_version
+            
+            if leader and not self.is_leader:
+                logger.info(f"Scheduler lease taken by {self.instance_id}, firing scheduled jobs")
+                # Jobs held while paused have not fired, so their missed runs go through the misfire policy
+                self.load_schedules(reset=True)
+                self._loaded_version = version
+                self.scheduler.resume()
+                self.is_leader = True
+            elif leader and version != self._loaded_version:
+                # Schedules were changed, possibly through another process
+                self.load_schedules()
+                self._loaded_version = version
+            elif not leader and self.is_leader:
+                logger.warning(f"Scheduler lease lost by {self.instance_id}, no longer firing scheduled jobs")
+                self.scheduler.pause()
+                self.is_leader = False
+            
+            return leader
+    
+    def get_status(self):
+        """Get the leader election status of this process"""
+        return {
+            'instance_id': self.instance_id,
+            'leader_election': self.leader_election,
+            'is_leader': self.is_leader
+        }
+    
+    def get_metrics(self, hours=24):
+        """
+        Get scheduler lag percentiles and executor pool saturation.
+        
+        Lags are measured from the time the scheduler planned to fire a job
+        until it was dispatched, its script process started and its first
+        output arrived, over executions planned in the last `hours` hours.
+        
+        Returns:
+            dict: Global and per-schedule lag percentiles, and executor statistics
+        """
+        # Import the model here to avoid circular imports
+        from app.models.execution_timing_orm import ExecutionTimingORM
+        
+        since = datetime.now() - timedelta(hours=hours)
+        rows = ExecutionTimingORM.get_lags(since)
+        
+        by_schedule = {}
+        for row in rows:
+            by_schedule.setdefault(row[0], []).append(row)
+        
+        return {
+            'hours': hours,
+            'global': self._summarize_lags(rows),
+            'schedules': {
+                str(schedule_id): self._summarize_lags(schedule_rows)
+                for schedule_id, schedule_rows in by_schedule.items()
+            },
+            'executor': self.executor.get_stats()
+        }
+    
+    def _summarize_lags(self, rows):
+        """Get the number of runs and lag percentiles of (schedule_id, *lags) rows"""
+        summary = {'runs': len(rows)}
+        for index, metric in enumerate(LAG_METRICS, start=1):
+            values = sorted(row[index] for row in rows if row[index] is not None)
+            summary[metric] = {
+                f"p{percentile}": self._percentile(values, percentile) for percentile in LAG_PERCENTILES
+            }
+        return summary
+    
+    def _percentile(self, values, percentile):
+        """Get a percentile of sorted values by the nearest-rank method"""
+        if not values:
+            return None
+        rank = max(1, -(-percentile * len(values) // 100))
+        return values[rank - 1]
+    
+    def _start_heartbeat(self):
+        """Start a background thread that runs the election periodically"""
+        if not self.heartbeat_seconds or (self._heartbeat_thread and self._heartbeat_thread.is_alive()):
+            return
+        
+        def heartbeat_loop():  # pragma: no cover
+            while not self._stopping.wait(self.heartbeat_seconds):
+                try:
+                    self.run_election()
+                except Exception as e:
+                    logger.error(f"Error running scheduler election: {str(e)}")
+        
+        self._stopping.clear()
+        self._heartbeat_thread = threading.Thread(target=heartbeat_loop, name='scheduler-heartbeat')
+        self._heartbeat_thread.daemon = True
+        self._heartbeat_thread.start()
+    
+    def _record_change(self):
+        """Record a schedule change for the leader, in the caller's transaction"""
+        # Import the model here to avoid circular imports
+        from app.models.scheduler_orm import SchedulerLeaseORM
+        SchedulerLeaseORM.bump_version(SCHEDULER_LEASE)
+    
+    def load_schedules(self, reset=False):
+        """
+        Reconcile the scheduler's jobs with the enabled schedules in the database.
+        
+        All schedules are read in one query and compared with the jobs already
+        in the scheduler: jobs whose trigger and arguments are unchanged are
+        kept, others are (re)added, and jobs of schedules that were disabled or
+        deleted are removed. The job_id, next_run and start_timestamp of all
+        schedules are then written in a single commit, so loading takes the
+        same few queries however many schedules there are.
+        
+        Runs missed while no job existed for a schedule, e.g. during a restart,
+        are handled by the schedule's misfire policy: each decision is recorded
+        in the execution history in the same commit, and catch-up runs are
+        queued one `catchup_interval_seconds` apart.
+        
+        Args:
+            reset (bool): Replace all jobs of schedules, as when the lease is
+                          taken: jobs kept by a paused scheduler would otherwise
+                          fire every run they missed at once on resuming
+        """
         if not self.app:
             logger.error("Cannot load schedules: app not initialized")
             return
+        
+        if not self.run_script_func:
+            logger.error("Cannot load schedules: run_script_func not set")
+            return
             
         with self.app.app_context():
             try:
@@ -64,55 +399,179 @@ class SchedulerService:
                 
                 logger.info(f"Found {len(schedules)} active schedules to load")
                 
+                existing_jobs = {
+                    job.id: job for job in self.scheduler.get_jobs()
+                    if job.id.startswith(SCHEDULE_JOB_PREFIXES)
+                }
+                if reset:
+                    for job_id in existing_jobs:
+                        self._remove_job(job_id)
+                    existing_jobs = {}
+                
                 # Restore all active jobs
+                now = datetime.now()
                 restored = 0
+                unchanged = 0
+                loaded_job_ids = set()
+                catchups = []
                 for schedule in schedules:
                     try:
-                        job = self._add_job(
-                            schedule.id,
-                            schedule.script_id,
-                            schedule.profile_id,
-                            schedule.user_id,
-                            schedule.schedule_type,
-                            schedule.schedule_value,
-                            json.loads(schedule.parameters) if schedule.parameters else {}
-                        )
+                        parameters = json.loads(schedule.parameters) if schedule.parameters else {}
+                        job_id = self._get_job_id(schedule.id, schedule.script_id, schedule.schedule_type)
+                        
+                        # A scheduler that already has the job handles its misfires itself
+                        if job_id not in existing_jobs:
+                            catchups.extend(
+                                (run_time, [schedule.script_id, schedule.profile_id, schedule.user_id, parameters, job_id])
+                                for run_time in self._handle_missed_runs(schedule, now)
+                            )
+                        
+                        job = existing_jobs.get(job_id)
+                        if job and self._job_matches(job, schedule, parameters):
+                            unchanged += 1
+                        else:
+                            job = self._schedule_job(
+                                schedule.id,
+                                schedule.script_id,
+                                schedule.profile_id,
+                                schedule.user_id,
+                                schedule.schedule_type,
+                                schedule.schedule_value,
+                                parameters,
+                                schedule
+                            )
+                        
                         if job:
+                            self._apply_job_info(schedule, job)
+                            loaded_job_ids.add(job.id)
                             restored += 1
                     except Exception as e:
                         logger.error(f"Error restoring schedule {schedule.id}: {str(e)}")
                 
-                logger.info(f"Successfully restored {restored} of {len(schedules)} schedules from database")
+                # Remove jobs whose schedule was disabled or deleted
+                for job_id in existing_jobs.keys() - loaded_job_ids:
+                    self._remove_job(job_id)
+                
+                # Write the job info of all schedules and the misfire decisions at once
+                db.session.commit()
+                
+                if catchups:
+                    self._queue_catchups(catchups, now)
+                    dashboard_service.invalidate()
+                
+                logger.info(f"Successfully restored {restored} of {len(schedules)} schedules from database "
+                            f"({unchanged} unchanged, {len(catchups)} catch-up runs queued)")
             except Exception as e:
+                db.session.rollback()
                 logger.error(f"Error loading schedules: {str(e)}", exc_info=True)
     
-    def get_schedules(self, include_disabled=False):
-        """Get all schedules"""
+    def get_schedules(self, include_disabled=False, script_id=None, schedule_type=None, last_status=None,
+                      search=None, sort='created_at', order='desc'):
+        """
+        Get schedules with their names and last run, filtered and sorted.
+        
+        Each schedule's last execution and number of consecutive failures
+        (failed executions since its last successful one) come from aggregates
+        over execution_history by schedule_id, joined in the same query.
+        
+        Args:
+            include_disabled (bool): Include disabled schedules
+            script_id (int): Only schedules of this script
+            schedule_type (str): Only schedules of this type
+            last_status (str): Only schedules whose last execution has this status
+            search (str): Only schedules whose script or profile name contains this text
+            sort (str): One of SCHEDULE_SORT_FIELDS
+            order (str): 'asc' or 'desc'
+        
+        Raises:
+            ValueError: For an unknown sort field or order
+        """
+        if sort not in SCHEDULE_SORT_FIELDS:
+            raise ValueError(f"Invalid sort field. Must be one of: {', '.join(SCHEDULE_SORT_FIELDS)}")
+        if order not in ('asc', 'desc'):
+            raise ValueError("Invalid sort order. Must be 'asc' or 'desc'")
+        
         with self.app.app_context():
-            # Import the model here to avoid circular imports
+            # Import the models here to avoid circular imports
             from app.models.scheduler_orm import ScheduleORM
             from app.models.user_orm import UserORM
+            from app.models.execution_orm import ExecutionORM
+            
+            # Last execution and last successful execution of each schedule
+            runs = db.session.query(
+                ExecutionORM.schedule_id.label('schedule_id'),
+                db.func.max(ExecutionORM.id).label('last_id'),
+                db.func.max(db.case((ExecutionORM.status == 'Success', ExecutionORM.id))).label('last_success_id')
+            ).filter(
+                ExecutionORM.schedule_id.isnot(None)
+            ).group_by(
+                ExecutionORM.schedule_id
+            ).subquery()
+            
+            # Failed executions since the last successful one
+            failed = aliased(ExecutionORM)
+            failures = db.session.query(
+                failed.schedule_id.label('schedule_id'),
+                db.func.count().label('count')
+            ).join(
+                runs, db.and_(failed.schedule_id == runs.c.schedule_id,
+                              failed.id > db.func.coalesce(runs.c.last_success_id, 0))
+            ).filter(
+                failed.status == 'Failed'
+            ).group_by(
+                failed.schedule_id
+            ).subquery()
+            
+            last_execution = aliased(ExecutionORM)
+            consecutive_failures = db.func.coalesce(failures.c.count, 0)
             
             # Build query with joins
             query = db.session.query(
                 ScheduleORM,
                 ScriptORM.name.label('script_name'),
                 AWSProfileORM.name.label('profile_name'),
-                UserORM.username
+                UserORM.username,
+                last_execution.id.label('last_execution_id'),
+                last_execution.status.label('last_status'),
+                last_execution.duration_ms.label('last_duration_ms'),
+                consecutive_failures.label('consecutive_failures')
             ).join(
                 ScriptORM, ScheduleORM.script_id == ScriptORM.id
             ).join(
                 AWSProfileORM, ScheduleORM.profile_id == AWSProfileORM.id
             ).join(
                 UserORM, ScheduleORM.user_id == UserORM.id
+            ).outerjoin(
+                runs, runs.c.schedule_id == ScheduleORM.id
+            ).outerjoin(
+                last_execution, last_execution.id == runs.c.last_id
+            ).outerjoin(
+                failures, failures.c.schedule_id == ScheduleORM.id
             )
             
             # Filter disabled schedules if requested
             if not include_disabled:
                 query = query.filter(ScheduleORM.enabled == 1)
+            if script_id:
+                query = query.filter(ScheduleORM.script_id == script_id)
+            if schedule_type:
+                query = query.filter(ScheduleORM.schedule_type == schedule_type)
+            if last_status:
+                query = query.filter(last_execution.status == last_status)
+            if search:
+                pattern = f"%{search}%"
+                query = query.filter(db.or_(ScriptORM.name.ilike(pattern), AWSProfileORM.name.ilike(pattern)))
             
-            # Order by created_at
-            query = query.order_by(ScheduleORM.created_at.desc())
+            sort_columns = {
+                'created_at': ScheduleORM.created_at,
+                'next_run': ScheduleORM.next_run,
+                'last_run': ScheduleORM.last_run,
+                'script_name': ScriptORM.name,
+                'last_status': last_execution.status,
+                'consecutive_failures': consecutive_failures
+            }
+            sort_column = sort_columns[sort].asc() if order == 'asc' else sort_columns[sort].desc()
+            query = query.order_by(sort_column.nulls_last(), ScheduleORM.id.desc())
             
             # Execute query
             results = query.all()
@@ -124,6 +583,10 @@ class SchedulerService:
                 schedule['script_name'] = row.script_name
                 schedule['profile_name'] = row.profile_name
                 schedule['username'] = row.username
+                schedule['last_execution_id'] = row.last_execution_id
+                schedule['last_status'] = row.last_status
+                schedule['last_duration_ms'] = row.last_duration_ms
+                schedule['consecutive_failures'] = row.consecutive_failures
                 
                 # Format parameters for each schedule
                 if schedule['parameters']:
@@ -177,7 +640,258 @@ class SchedulerService:
             
             return schedule
     
-    def create_schedule(self, script_id, profile_id, user_id, schedule_type, schedule_value, parameters=None):
+    def get_fire_histogram(self, exclude_schedule_id=None):
+        """
+        Count how many jobs fire in each minute of the day.
+        
+        Daily schedules count once at their time including jitter; interval
+        schedules count at every run in the day, starting from their
+        start_timestamp (or next_run when it is not set yet); cron schedules
+        count at their fire times over the coming day.
+        
+        Args:
+            exclude_schedule_id (int): Schedule to leave out, e.g. one being moved
+            
+        Returns:
+            list: Number of runs for each minute of the day, starting at 00:00
+        """
+        with self.app.app_context():
+            # Import the model here to avoid circular imports
+            from app.models.scheduler_orm import ScheduleORM
+            
+            query = db.session.query(
+                ScheduleORM.id,
+                ScheduleORM.schedule_type,
+                ScheduleORM.schedule_value,
+                ScheduleORM.start_timestamp,
+                ScheduleORM.next_run
+            ).filter(ScheduleORM.enabled == 1)
+            
+            if exclude_schedule_id:
+                query = query.filter(ScheduleORM.id != exclude_schedule_id)
+            
+            histogram = [0] * MINUTES_PER_DAY
+            # Number of cron schedules per expression, placed once per expression
+            cron_schedules = {}
+            for schedule_id, schedule_type, schedule_value, start_timestamp, next_run in query.all():
+                try:
+                    if schedule_type == 'daily':
+                        hour, minute, _ = self._get_daily_fire_time(schedule_id, schedule_value)
+                        histogram[hour * 60 + minute] += 1
+                        continue
+                    
+                    if schedule_type == 'cron':
+                        compile_cron(schedule_value)
+                        cron_schedules[schedule_value] = cron_schedules.get(schedule_value, 0) + 1
+                        continue
+                    
+                    if start_timestamp:
+                        first_run = datetime.fromtimestamp(start_timestamp)
+                    elif next_run:
+                        first_run = datetime.fromisoformat(next_run)
+                    else:
+                        continue
+                    
+                    interval_minutes = self._get_interval_minutes(schedule_value)
+                    first_minute = first_run.hour * 60 + first_run.minute
+                    for run in range(max(1, MINUTES_PER_DAY // interval_minutes)):
+                        histogram[(first_minute + run * interval_minutes) % MINUTES_PER_DAY] += 1
+                except (ValueError, TypeError) as e:
+                    logger.warning(f"Cannot place schedule {schedule_id} in fire histogram: {str(e)}")
+            
+            # The coming day covers each minute of the day once
+            origin = datetime.now().replace(second=0, microsecond=0)
+            first_minute = origin.hour * 60 + origin.minute
+            for expression, count in cron_schedules.items():
+                for minute in get_cron_fire_minutes(expression, origin, MINUTES_PER_DAY):
+                    histogram[(first_minute + minute) % MINUTES_PER_DAY] += count
+            
+            return histogram
+    
+    def get_forecast(self, hours=48, threshold=None):
+        """
+        Project how many executions start and run in each minute of the coming hours.
+        
+        Fire times follow the jobs' triggers: daily runs at their time including
+        jitter, interval runs in step with their start_timestamp (or next_run
+        when it is not set yet). Each run is assumed to last its script's
+        average duration over the last FORECAST_HISTORY_DAYS days.
+        
+        Runs of a daily or interval schedule repeat at a fixed period, so
+        schedules are counted per (period, first start) and per (period, first
+        end), and each of those is added to every period-th minute from there
+        on. The cost grows with the number of schedules plus, for each distinct
+        period, the number of distinct first minutes times the runs in the
+        horizon, which is at most the horizon per period and much less for long
+        periods. Cron schedules have no fixed period and mark each of their
+        runs once per expression.
+        
+        Args:
+            hours (int): Length of the forecast
+            threshold (int): Number of running executions counted as overload
+            
+        Returns:
+            dict: Starts and running executions per minute, the peak and the
+                  windows at or above the threshold
+        """
+        # Import the models here to avoid circular imports
+        from app.models.scheduler_orm import ScheduleORM
+        from app.models.execution_stats_orm import ExecutionDailyStatsORM
+        
+        now = datetime.now()
+        origin = now.replace(second=0, microsecond=0)
+        horizon = hours * 60
+        
+        with self.app.app_context():
+            since = (now - timedelta(days=FORECAST_HISTORY_DAYS)).strftime('%Y-%m-%d')
+            durations = ExecutionDailyStatsORM.get_average_durations(since)
+            rows = db.session.query(
+                ScheduleORM.id,
+                ScheduleORM.script_id,
+                ScheduleORM.schedule_type,
+                ScheduleORM.schedule_value,
+                ScheduleORM.start_timestamp,
+                ScheduleORM.next_run
+            ).filter(ScheduleORM.enabled == 1).all()
+        
+        # Runs starting in each minute, and +1/-1 where runs start and end
+        total_starts = [0] * horizon
+        total_changes = [0] * horizon
+        # Schedules per (period, first start), and +1/-1 per (period, first start or end)
+        periodic_starts = {}
+        periodic_changes = {}
+        # Number of cron schedules per (expression, duration), placed once each
+        cron_schedules = {}
+        for schedule_id, script_id, schedule_type, schedule_value, start_timestamp, next_run in rows:
+            duration = max(1, math.ceil(durations.get(script_id, FORECAST_DEFAULT_DURATION_MS) / 60000))
+            try:
+                if schedule_type == 'cron':
+                    compile_cron(schedule_value)
+                    key = (schedule_value, duration)
+                    cron_schedules[key] = cron_schedules.get(key, 0) + 1
+                    continue
+                
+                period, first_run = self._get_first_forecast_run(
+                    schedule_id, schedule_type, schedule_value, start_timestamp, next_run, now
+                )
+            except (ValueError, TypeError) as e:
+                logger.warning(f"Cannot forecast schedule {schedule_id}: {str(e)}")
+                continue
+            
+            first = int((first_run - origin).total_seconds() // 60)
+            if first >= horizon:
+                continue
+            
+            periodic_starts[(period, first)] = periodic_starts.get((period, first), 0) + 1
+            periodic_changes[(period, first)] = periodic_changes.get((period, first), 0) + 1
+            if first + duration < horizon:
+                end = (period, first + duration)
+                periodic_changes[end] = periodic_changes.get(end, 0) - 1
+        
+        fire_minutes = {}
+        for (expression, duration), count in cron_schedules.items():
+            if expression not in fire_minutes:
+                # A run at the start of the current minute has already started
+                fire_minutes[expression] = [minute for minute in get_cron_fire_minutes(expression, origin, horizon)
+                                            if minute or origin == now]
+            for minute in fire_minutes[expression]:
+                total_starts[minute] += count
+                total_changes[minute] += count
+                if minute + duration < horizon:
+                    total_changes[minute + duration] -= count
+        
+        for marks, totals in ((periodic_starts, total_starts), (periodic_changes, total_changes)):
+            for (period, first), count in marks.items():
+                if count:
+                    totals[first::period] = [total + count for total in totals[first::period]]
+        running = list(accumulate(total_changes))
+        
+        def minute_time(minute):
+            return (origin + timedelta(minutes=minute)).isoformat()
+        
+        peak_minute = max(range(horizon), key=running.__getitem__) if horizon else None
+        
+        overload_windows = []
+        if threshold:
+            window_start = None
+            for minute in range(horizon + 1):
+                overloaded = minute < horizon and running[minute] >= threshold
+                if overloaded and window_start is None:
+                    window_start = minute
+                elif not overloaded and window_start is not None:
+                    overload_windows.append({
+                        'start': minute_time(window_start),
+                        'end': minute_time(minute),
+                        'peak': max(running[window_start:minute])
+                    })
+                    window_start = None
+        
+        return {
+            'start': minute_time(0),
+            'hours': hours,
+            'total_runs': sum(total_starts),
+            'peak': {'time': minute_time(peak_minute), 'running': running[peak_minute]} if peak_minute is not None else None,
+            'minutes': [
+                {'time': minute_time(minute), 'starts': total_starts[minute], 'running': running[minute]}
+                for minute in range(horizon) if total_starts[minute] or running[minute]
+            ],
+            'overload_windows': overload_windows
+        }
+    
+    def _get_first_forecast_run(self, schedule_id, schedule_type, schedule_value, start_timestamp, next_run, now):
+        """
+        Get the period in minutes and the next run after now of a schedule's job.
+        
+        Mirrors the daily and interval triggers of _build_trigger without
+        building them.
+        """
+        if schedule_type == 'daily':
+            hour, minute, second = self._get_daily_fire_time(schedule_id, schedule_value)
+            first_run = now.replace(hour=hour, minute=minute, second=second, microsecond=0)
+            if first_run <= now:
+                first_run += timedelta(days=1)
+            return MINUTES_PER_DAY, first_run
+        
+        if schedule_type != 'interval':
+            raise ValueError(f"unknown schedule type {schedule_type}")
+        
+        interval_minutes = self._get_interval_minutes(schedule_value)
+        interval_seconds = interval_minutes * 60
+        
+        if start_timestamp:
+            elapsed_in_current = (now.timestamp() - start_timestamp) % interval_seconds
+            return interval_minutes, now + timedelta(seconds=interval_seconds - elapsed_in_current)
+        
+        if next_run:
+            next_run_time = datetime.fromisoformat(next_run)
+            if next_run_time > now:
+                return interval_minutes, next_run_time
+        
+        # A new interval starts when the job is added
+        return interval_minutes, now + timedelta(minutes=interval_minutes)
+    
+    def _balance_daily_time(self, schedule_value, exclude_schedule_id=None):
+        """
+        Pick the least-loaded minute for a daily schedule.
+        
+        Looks at the `balance_window_minutes` minutes starting at the requested
+        time and returns the one with the fewest runs, preferring earlier ones.
+        
+        Returns:
+            str: The chosen time in HH:MM format
+        """
+        hour, minute = map(int, schedule_value.split(':'))
+        start = hour * 60 + minute
+        
+        histogram = self.get_fire_histogram(exclude_schedule_id)
+        candidates = [(start + offset) % MINUTES_PER_DAY for offset in range(max(1, self.balance_window_minutes))]
+        
+        # min() keeps the first of equally loaded minutes
+        chosen = min(candidates, key=lambda candidate: histogram[candidate])
+        return f"{chosen // 60:02d}:{chosen % 60:02d}"
+    
+    def create_schedule(self, script_id, profile_id, user_id, schedule_type, schedule_value, parameters=None, balance=False,
+                        misfire_policy=None, misfire_grace_seconds=None, max_catchup_runs=None):
         """Create a new schedule with validation"""
         try:
             with self.app.app_context():
@@ -201,28 +915,31 @@ class SchedulerService:
                     }
                 
                 # Validate schedule type
-                if schedule_type not in ['daily', 'interval']:
+                if schedule_type not in SCHEDULE_TYPES:
                     return {
                         'success': False,
                         'message': 'Invalid schedule type'
                     }
                 
                 # Validate schedule value based on type
-                if schedule_type == 'daily':
-                    if schedule_value not in self.ALLOWED_TIME_SLOTS:
-                        return {
-                            'success': False,
-                            'message': 'Invalid schedule time. Please select from available options.'
-                        }
-                elif schedule_type == 'interval':
-                    if schedule_value not in self.ALLOWED_INTERVALS:
-                        return {
-                            'success': False,
-                            'message': 'Invalid interval. Please select from available options.'
-                        }
+                value_error = self._validate_schedule_value(schedule_type, schedule_value)
+                if value_error:
+                    return {
+                        'success': False,
+                        'message': value_error
+                    }
                 
-                # Calculate next run time
-                next_run = self._calculate_next_run(schedule_type, schedule_value)
+                # Validate misfire settings
+                misfire_error = self._validate_misfire_settings(misfire_policy, misfire_grace_seconds, max_catchup_runs)
+                if misfire_error:
+                    return {
+                        'success': False,
+                        'message': misfire_error
+                    }
+                
+                # Move to the least-loaded minute near the requested time
+                if balance and schedule_type == 'daily':
+                    schedule_value = self._balance_daily_time(schedule_value)
                 
                 # Store parameters as JSON
                 parameters_json = json.dumps(parameters) if parameters else None
@@ -236,12 +953,17 @@ class SchedulerService:
                     schedule_value=schedule_value,
                     enabled=1,
                     parameters=parameters_json,
-                    next_run=next_run,
-                    created_at=datetime.now().isoformat()
+                    created_at=datetime.now().isoformat(),
+                    misfire_policy=misfire_policy,
+                    misfire_grace_seconds=misfire_grace_seconds,
+                    max_catchup_runs=max_catchup_runs
                 )
                 
-                # Save to database
+                # Save to database, with the next run of the job's trigger
                 db.session.add(schedule)
+                db.session.flush()
+                schedule.next_run = self._get_next_run(schedule)
+                self._record_change()
                 db.session.commit()
                 
                 # Add job to scheduler
@@ -258,6 +980,7 @@ class SchedulerService:
                 return {
                     'success': True,
                     'id': schedule.id,
+                    'schedule_value': schedule_value,
                     'job_id': job.id if job else None,
                     'next_run': job.next_run_time.isoformat() if job and job.next_run_time else None
                 }
@@ -269,13 +992,13 @@ class SchedulerService:
                 'message': f'Server error: {str(e)}'
             }
     
-    def update_schedule(self, schedule_id, enabled=None, schedule_type=None, schedule_value=None, profile_id=None, parameters=None):
+    def update_schedule(self, schedule_id, enabled=None, schedule_type=None, schedule_value=None, profile_id=None, parameters=None,
+                        misfire_policy=None, misfire_grace_seconds=None, max_catchup_runs=None):
         """Update an existing schedule with validation"""
         try:
             with self.app.app_context():
                 # Import the model here to avoid circular imports
                 from app.models.scheduler_orm import ScheduleORM
-                import time
                 
                 # Get current schedule
                 schedule = ScheduleORM.query.get(schedule_id)
@@ -295,7 +1018,7 @@ class SchedulerService:
                 # Update schedule type if provided
                 if schedule_type is not None:
                     # Validate schedule type
-                    if schedule_type not in ['daily', 'interval']:
+                    if schedule_type not in SCHEDULE_TYPES:
                         return {
                             'success': False,
                             'message': 'Invalid schedule type'
@@ -313,19 +1036,12 @@ class SchedulerService:
                     # Validate schedule value based on type
                     current_type = schedule_type if schedule_type is not None else schedule.schedule_type
                     
-                    if current_type == 'daily':
-                        if schedule_value not in self.ALLOWED_TIME_SLOTS:
-                            return {
-                                'success': False,
-                                'message': 'Invalid schedule time. Please select from available options.'
-                            }
-                    
-                    elif current_type == 'interval':
-                        if schedule_value not in self.ALLOWED_INTERVALS:
-                            return {
-                                'success': False,
-                                'message': 'Invalid interval. Please select from available options.'
-                            }
+                    value_error = self._validate_schedule_value(current_type, schedule_value)
+                    if value_error:
+                        return {
+                            'success': False,
+                            'message': value_error
+                        }
                     
                     # Check if interval value is changing
                     if schedule_value != schedule.schedule_value:
@@ -357,6 +1073,21 @@ class SchedulerService:
                     schedule.parameters = json.dumps(parameters)
                     changes_made = True
                 
+                # Update misfire settings if provided
+                misfire_error = self._validate_misfire_settings(misfire_policy, misfire_grace_seconds, max_catchup_runs)
+                if misfire_error:
+                    return {
+                        'success': False,
+                        'message': misfire_error
+                    }
+                
+                for field, value in (('misfire_policy', misfire_policy),
+                                     ('misfire_grace_seconds', misfire_grace_seconds),
+                                     ('max_catchup_runs', max_catchup_runs)):
+                    if value is not None:
+                        setattr(schedule, field, value)
+                        changes_made = True
+                
                 if not changes_made:
                     return {
                         'success': False,
@@ -373,19 +1104,18 @@ class SchedulerService:
                 
                 # Calculate new next_run if schedule type or value changed
                 if schedule_type is not None or schedule_value is not None:
-                    next_run = self._calculate_next_run(
-                        schedule.schedule_type,
-                        schedule.schedule_value
-                    )
-                    schedule.next_run = next_run
+                    schedule.next_run = self._get_next_run(schedule)
                 
                 # Save changes to database
+                self._record_change()
                 db.session.commit()
                 
+                # Remove the job if disabled, or if it gets a new ID for the new schedule type
+                if schedule.enabled == 0 or schedule.schedule_type != old_schedule_type:
+                    self._remove_job(schedule.job_id)
+                
                 # Handle job updates
                 if schedule.enabled == 0:
-                    # Remove job if disabled
-                    self._remove_job(schedule.job_id)
                     return {
                         'success': True,
                         'message': 'Schedule disabled'
@@ -432,6 +1162,7 @@ class SchedulerService:
                 
                 # Delete from database
                 db.session.delete(schedule)
+                self._record_change()
                 db.session.commit()
                 
                 # Remove from scheduler
@@ -458,15 +1189,15 @@ class SchedulerService:
                 
                 parameters = json.loads(schedule.parameters) if schedule.parameters else {}
                 
-                if not self.run_script_func:
-                    return {'success': False, 'message': 'Run script function not set'}
-                
-                # Run the script
-                execution_id = self.run_script_func(
+                # Run the script now, rather than through the scheduled run queue,
+                # to return its execution ID
+                execution_id = self.execution_service.run_script(
                     schedule.script_id,
                     schedule.profile_id,
                     schedule.user_id,
-                    parameters
+                    parameters,
+                    is_scheduled=1,
+                    schedule_id=schedule.id
                 )
                 
                 if execution_id:
@@ -481,11 +1212,24 @@ class SchedulerService:
     def shutdown(self):
         """Shutdown the scheduler"""
         if hasattr(self, 'scheduler') and self.scheduler:
+            self._stopping.set()
+            
+            # Let another process take over without waiting for the lease to expire
+            if self.leader_election and self.is_leader and self.app:
+                try:
+                    # Import the model here to avoid circular imports
+                    from app.models.scheduler_orm import SchedulerLeaseORM
+                    with self.app.app_context():
+                        SchedulerLeaseORM.release(SCHEDULER_LEASE, self.instance_id)
+                    self.is_leader = False
+                except Exception as e:
+                    logger.error(f"Error releasing scheduler lease: {str(e)}")
+            
             self.scheduler.shutdown()
             logger.info("Scheduler shut down")
     
     def _add_job(self, schedule_id, script_id, profile_id, user_id, schedule_type, schedule_value, parameters):
-        """Add a job to the scheduler"""
+        """Add a job to the scheduler and save its job info to the schedule"""
         if not self.run_script_func:
             logger.error("Cannot add job: run_script_func not set")
             return None
@@ -495,182 +1239,457 @@ class SchedulerService:
             from app.models.scheduler_orm import ScheduleORM
             schedule = ScheduleORM.query.get(schedule_id)
             
-            # Handle different schedule types
-            if schedule_type == 'daily':
-                # Parse time (format: "HH:MM")
-                hour, minute = schedule_value.split(':')
-                trigger = CronTrigger(hour=hour, minute=minute)
-                job_id = f"daily_{script_id}_{schedule_id}"
-            elif schedule_type == 'interval':
-                # Create job ID first so we can use it in logging
-                job_id = f"interval_{script_id}_{schedule_id}"
-                
-                # Special handling for debug interval
-                if schedule_value == "debug-3min":
-                    # 3-minute debug interval
-                    logger.info(f"Setting up special debug interval: 3 minutes for job {job_id}")
-                    interval_minutes = 3
-                else:
-                    # Regular hour-based intervals
-                    hours_interval = int(schedule_value)
-                    interval_minutes = hours_interval * 60
-                    logger.info(f"Setting up interval schedule: {hours_interval} hours ({interval_minutes} minutes) for job {job_id}")
+            job = self._schedule_job(
+                schedule_id, script_id, profile_id, user_id, schedule_type, schedule_value, parameters, schedule
+            )
+            
+            if job and schedule:
+                # Update job_id and next_run in database
+                self._apply_job_info(schedule, job)
+                db.session.commit()
+            
+            return job
+    
+    def _schedule_job(self, schedule_id, script_id, profile_id, user_id, schedule_type, schedule_value, parameters,
+                      schedule=None):
+        """
+        Add a job to the scheduler without committing.
+        
+        Timing info derived for interval schedules is set on `schedule` and is
+        saved by the caller's commit.
+        
+        Returns:
+            Job: The scheduled job, or None if it could not be added
+        """
+        job_id = self._get_job_id(schedule_id, script_id, schedule_type)
+        if not job_id:
+            logger.error(f"Unknown schedule type: {schedule_type}")
+            return None
+        
+        trigger = self._build_trigger(schedule_id, schedule, schedule_type, schedule_value, job_id)
+        
+        try:
+            # Add the job to the scheduler
+            job = self.scheduler.add_job(
+                self.run_script_func,
+                trigger=trigger,
+                args=[script_id, profile_id, user_id, parameters, job_id],  # Pass job_id to run_script_func
+                id=job_id,
+                replace_existing=True,
+                **self._get_misfire_options(schedule)
+            )
+            
+            logger.debug(f"Added job {job_id} to scheduler")
+            return job
+        except Exception as e:
+            logger.error(f"Error adding job: {str(e)}")
+            return None
+    
+    def _get_job_id(self, schedule_id, script_id, schedule_type):
+        """Get the scheduler job ID of a schedule, or None for an unknown schedule type"""
+        if schedule_type not in SCHEDULE_TYPES:
+            return None
+        return f"{schedule_type}_{script_id}_{schedule_id}"
+    
+    def _validate_schedule_value(self, schedule_type, schedule_value):
+        """
+        Validate the value of a schedule of the given type.
+        
+        Daily schedules take a time (HH:MM), interval schedules a number of
+        hours or of minutes with an 'm' suffix (e.g. '15m'), and cron schedules
+        a five-field crontab expression (e.g. '*/15 * * * mon-fri').
+        
+        Returns:
+            str: Error message, or None if the value is valid
+        """
+        if not isinstance(schedule_value, str):
+            return 'Invalid schedule value'
+        
+        if schedule_type == 'daily':
+            try:
+                hour, minute = map(int, schedule_value.split(':'))
+            except ValueError:
+                hour = minute = -1
+            if not (0 <= hour < 24 and 0 <= minute < 60 and len(schedule_value) == 5):
+                return 'Invalid schedule time. Please use HH:MM.'
+        
+        elif schedule_type == 'interval':
+            try:
+                minutes = self._get_interval_minutes(schedule_value)
+            except ValueError:
+                minutes = 0
+            if schedule_value == 'debug-3min' or not 1 <= minutes <= MAX_INTERVAL_MINUTES:
+                return (f'Invalid interval. Please use a number of hours, or of minutes such as 15m, '
+                        f'up to {MAX_INTERVAL_MINUTES // MINUTES_PER_DAY} days.')
+        
+        elif schedule_type == 'cron':
+            if len(schedule_value) > SCHEDULE_VALUE_MAX_LENGTH:
+                return f'Invalid cron expression. It can be at most {SCHEDULE_VALUE_MAX_LENGTH} characters.'
+            try:
+                compile_cron(schedule_value)
+            except ValueError as e:
+                return f'Invalid cron expression: {str(e)}'
+        
+        return None
+    
+    def _get_interval_minutes(self, schedule_value):
+        """Get the length in minutes of an interval schedule"""
+        # Special handling for debug interval
+        if schedule_value == "debug-3min":
+            return 3
+        
+        # Minute-based intervals, e.g. "15m"
+        if schedule_value.endswith('m'):
+            return int(schedule_value[:-1])
+        
+        # Regular hour-based intervals
+        return int(schedule_value) * 60
+    
+    def _build_trigger(self, schedule_id, schedule, schedule_type, schedule_value, job_id):
+        """
+        Build the trigger of a schedule.
+        
+        Interval schedules keep their timing across restarts: the next run is
+        derived from the schedule's start_timestamp, or from its stored next_run
+        when there is no start_timestamp yet. A start_timestamp derived here is
+        set on `schedule` without committing.
+        """
+        if schedule_type == 'daily':
+            hour, minute, second = self._get_daily_fire_time(schedule_id, schedule_value)
+            return CronTrigger(hour=hour, minute=minute, second=second)
+        
+        if schedule_type == 'cron':
+            return compile_cron(schedule_value)
+        
+        interval_minutes = self._get_interval_minutes(schedule_value)
+        interval_seconds = interval_minutes * 60
+        
+        # Get current time and prepare for timestamp calculations
+        now = datetime.now()
+        current_timestamp = time.time()
+        
+        # Check if we have a start timestamp (for persistent timing across restarts)
+        if schedule and schedule.start_timestamp:
+            try:
+                # Calculate how much of the current interval has elapsed since the initial start
+                elapsed_in_current = (current_timestamp - schedule.start_timestamp) % interval_seconds
                 
-                # Get current time and prepare for timestamp calculations
-                import time
-                now = datetime.now()
-                current_timestamp = time.time()
-                logger.info(f"Current timestamp: {current_timestamp}")
+                # Calculate remaining time in the current interval
+                remaining_seconds = interval_seconds - elapsed_in_current
                 
-                # Check if we have a start timestamp (for persistent timing across restarts)
-                if schedule and schedule.start_timestamp:
-                    try:
-                        # Calculate time since the initial start using the persisted timestamp
-                        elapsed_since_start = current_timestamp - schedule.start_timestamp
-                        interval_seconds = interval_minutes * 60
-                        
-                        # Calculate how much of the current interval has elapsed
-                        elapsed_in_current = elapsed_since_start % interval_seconds
-                        
-                        # Calculate remaining time in the current interval
-                        remaining_seconds = interval_seconds - elapsed_in_current
-                        
-                        # If very little time remains (<10 seconds), move to the next interval to avoid immediate triggers
-                        if remaining_seconds < 10:
-                            remaining_seconds += interval_seconds
-                        
-                        # Next run is now plus the remaining time
-                        adjusted_next_run = now + timedelta(seconds=remaining_seconds)
-                        
-                        logger.info(f"Using stored start timestamp: {schedule.start_timestamp}")
-                        logger.info(f"Time elapsed since start: {elapsed_since_start:.2f}s")
-                        logger.info(f"Elapsed in current interval: {elapsed_in_current:.2f}s, remaining: {remaining_seconds:.2f}s")
-                        logger.info(f"Calculated next_run after restart: {adjusted_next_run.isoformat()}")
-                        logger.info(f"Time remaining until next run: {remaining_seconds/60:.2f} minutes")
-                        
-                        trigger = IntervalTrigger(minutes=interval_minutes, start_date=adjusted_next_run)
-                        
-                    except (ValueError, TypeError) as e:
-                        # If there's any issue with timestamp calculations, fall back to next_run if available
-                        logger.warning(f"Error using start_timestamp for job {job_id}: {e}, falling back to next_run")
-                        
-                        # Try to use next_run as a fallback
-                        if schedule.next_run:
-                            try:
-                                next_run_time = datetime.fromisoformat(schedule.next_run)
-                                
-                                if next_run_time > now:
-                                    # Next run is in the future, use it directly
-                                    logger.info(f"Using fallback next_run time: {schedule.next_run}")
-                                    trigger = IntervalTrigger(minutes=interval_minutes, start_date=next_run_time)
-                                else:
-                                    # Next run is in the past, use default interval
-                                    logger.info(f"Next run is in the past, using default interval")
-                                    trigger = IntervalTrigger(minutes=interval_minutes)
-                            except Exception as e2:
-                                logger.warning(f"Error parsing next_run fallback: {e2}, using default interval")
-                                trigger = IntervalTrigger(minutes=interval_minutes)
-                        else:
-                            # No valid next_run, use default interval
-                            logger.warning("No valid next_run time available, using default interval")
-                            trigger = IntervalTrigger(minutes=interval_minutes)
-                        
-                # If no start timestamp, try to use next_run time
-                elif schedule and schedule.next_run:
+                # If very little time remains (<10 seconds), move to the next interval to avoid immediate triggers
+                if remaining_seconds < 10:
+                    remaining_seconds += interval_seconds
+                
+                # Next run is now plus the remaining time
+                adjusted_next_run = now + timedelta(seconds=remaining_seconds)
+                logger.debug(f"Calculated next_run for job {job_id} from start timestamp "
+                             f"{schedule.start_timestamp}: {adjusted_next_run.isoformat()}")
+                
+                return IntervalTrigger(minutes=interval_minutes, start_date=adjusted_next_run)
+            except (ValueError, TypeError) as e:
+                # If there's any issue with timestamp calculations, fall back to next_run if available
+                logger.warning(f"Error using start_timestamp for job {job_id}: {e}, falling back to next_run")
+                
+                if schedule.next_run:
                     try:
                         next_run_time = datetime.fromisoformat(schedule.next_run)
-                        
                         if next_run_time > now:
-                            # Next run is in the future, use the stored next_run directly
-                            logger.info(f"Using stored next_run time for job {job_id}: {schedule.next_run}")
-                            trigger = IntervalTrigger(minutes=interval_minutes, start_date=next_run_time)
-                            
-                            # Also set the start timestamp for future restarts
-                            schedule.start_timestamp = current_timestamp - ((next_run_time - now).total_seconds() % (interval_minutes * 60))
-                            logger.info(f"Setting derived start_timestamp: {schedule.start_timestamp}")
-                            db.session.commit()
-                        else:
-                            # Next run is in the past, use a new interval and set start timestamp
-                            logger.info(f"Next run {schedule.next_run} is in the past, using new interval")
-                            trigger = IntervalTrigger(minutes=interval_minutes)
-                            
-                            # Set start timestamp for future restarts
-                            schedule.start_timestamp = current_timestamp
-                            logger.info(f"Setting new start_timestamp: {schedule.start_timestamp}")
-                            db.session.commit()
-                    except (ValueError, TypeError) as e:
-                        # If there's any issue parsing the stored time, fall back to default
-                        logger.warning(f"Error parsing stored next_run for job {job_id}: {e}, using default interval")
-                        trigger = IntervalTrigger(minutes=interval_minutes)
-                        
-                        # Set start timestamp for future restarts
-                        schedule.start_timestamp = current_timestamp
-                        logger.info(f"Setting fallback start_timestamp: {schedule.start_timestamp}")
-                        db.session.commit()
-                else:
-                    # No existing next_run or start_timestamp, use standard interval
-                    logger.info(f"No existing timing info for job {job_id}, using standard interval")
-                    trigger = IntervalTrigger(minutes=interval_minutes)
-                    
-                    # If we have a schedule object, set start timestamp for future restarts
-                    if schedule:
-                        schedule.start_timestamp = current_timestamp
-                        logger.info(f"Setting initial start_timestamp: {schedule.start_timestamp}")
-                        db.session.commit()
+                            # Next run is in the future, use it directly
+                            return IntervalTrigger(minutes=interval_minutes, start_date=next_run_time)
+                    except Exception as e2:
+                        logger.warning(f"Error parsing next_run fallback: {e2}, using default interval")
                 
-            else:
-                logger.error(f"Unknown schedule type: {schedule_type}")
+                return IntervalTrigger(minutes=interval_minutes)
+        
+        # If no start timestamp, try to use next_run time
+        if schedule and schedule.next_run:
+            try:
+                next_run_time = datetime.fromisoformat(schedule.next_run)
+                
+                if next_run_time > now:
+                    # Next run is in the future, use the stored next_run directly and
+                    # derive the start timestamp for future restarts
+                    schedule.start_timestamp = current_timestamp - ((next_run_time - now).total_seconds() % interval_seconds)
+                    logger.debug(f"Using stored next_run time for job {job_id}: {schedule.next_run}")
+                    return IntervalTrigger(minutes=interval_minutes, start_date=next_run_time)
+                
+                logger.debug(f"Next run {schedule.next_run} of job {job_id} is in the past, using new interval")
+            except (ValueError, TypeError) as e:
+                # If there's any issue parsing the stored time, fall back to default
+                logger.warning(f"Error parsing stored next_run for job {job_id}: {e}, using default interval")
+        
+        # No usable timing info, start a new interval now
+        if schedule:
+            schedule.start_timestamp = current_timestamp
+        return IntervalTrigger(minutes=interval_minutes)
+    
+    def _get_jitter(self, schedule_id):
+        """Get the fixed delay in seconds of a schedule's daily runs, derived from its ID"""
+        if not self.jitter_seconds or not schedule_id:
+            return 0
+        return zlib.crc32(str(schedule_id).encode()) % self.jitter_seconds
+    
+    def _get_daily_fire_time(self, schedule_id, schedule_value):
+        """Get the (hour, minute, second) a daily schedule fires at, including its jitter"""
+        # Parse time (format: "HH:MM")
+        hour, minute = map(int, schedule_value.split(':'))
+        
+        seconds = (hour * 3600 + minute * 60 + self._get_jitter(schedule_id)) % (MINUTES_PER_DAY * 60)
+        return seconds // 3600, seconds // 60 % 60, seconds % 60
+    
+    def _job_matches(self, job, schedule, parameters):
+        """Check whether a scheduled job is up to date with its schedule"""
+        if job.args != (schedule.script_id, schedule.profile_id, schedule.user_id, parameters, job.id):
+            return False
+        
+        options = self._get_misfire_options(schedule)
+        if (job.coalesce, job.misfire_grace_time) != (options['coalesce'], options['misfire_grace_time']):
+            return False
+        
+        if schedule.schedule_type == 'daily':
+            hour, minute, second = self._get_daily_fire_time(schedule.id, schedule.schedule_value)
+            return str(job.trigger) == str(CronTrigger(hour=hour, minute=minute, second=second))
+        
+        if schedule.schedule_type == 'cron':
+            return job.trigger is compile_cron(schedule.schedule_value)
+        
+        return (isinstance(job.trigger, IntervalTrigger) and
+                job.trigger.interval == timedelta(minutes=self._get_interval_minutes(schedule.schedule_value)))
+    
+    def _validate_misfire_settings(self, misfire_policy, misfire_grace_seconds, max_catchup_runs):
+        """Validate misfire settings, returning an error message or None"""
+        if misfire_policy is not None and misfire_policy not in MISFIRE_POLICIES:
+            return f"Invalid misfire policy. Use one of: {', '.join(MISFIRE_POLICIES)}"
+        
+        for name, value in (('grace window', misfire_grace_seconds), ('maximum catch-up runs', max_catchup_runs)):
+            if value is not None and (isinstance(value, bool) or not isinstance(value, int) or value < 0):
+                return f"Invalid {name}. Use a whole number of 0 or more."
+        
+        return None
+    
+    def _get_misfire_settings(self, schedule):
+        """Get the (policy, grace seconds, max catch-up runs) of a schedule, using defaults for unset ones"""
+        policy = getattr(schedule, 'misfire_policy', None) or self.misfire_policy
+        grace = getattr(schedule, 'misfire_grace_seconds', None)
+        max_runs = getattr(schedule, 'max_catchup_runs', None)
+        
+        return (
+            policy if policy in MISFIRE_POLICIES else 'skip',
+            self.misfire_grace_seconds if grace is None else grace,
+            self.max_catchup_runs if max_runs is None else max_runs
+        )
+    
+    def _get_misfire_options(self, schedule):
+        """
+        Get the APScheduler options applying a schedule's misfire policy to
+        runs that start late while the job is scheduled.
+        
+        Runs late by up to the grace window always run, coalesced into one.
+        Later runs are dropped by the scheduler under 'skip', coalesced into
+        one run under 'once', and each run under 'all'.
+        """
+        policy, grace, _ = self._get_misfire_settings(schedule)
+        
+        return {
+            'coalesce': policy != 'all',
+            'misfire_grace_time': max(1, grace) if policy == 'skip' else None
+        }
+    
+    def _get_missed_runs(self, schedule, now, keep=1):
+        """
+        Count the runs of a schedule due between its stored next_run and now.
+        
+        Cron schedules have the days they fire on walked through, up to
+        MAX_CRON_DAYS_COUNTED of them before now; runs before that are not
+        counted, and the first run is the first one counted.
+        
+        Args:
+            keep (int): Number of most recent missed run times to return
+            
+        Returns:
+            tuple: (number of missed runs, time of the first, time of the last,
+                   times of the `keep` most recent oldest first), or None if no
+                   run was missed
+        """
+        if not schedule.next_run:
+            return None
+        
+        try:
+            first = datetime.fromisoformat(schedule.next_run)
+            if first.tzinfo is not None:
+                first = first.astimezone().replace(tzinfo=None)
+            if first >= now:
                 return None
             
+            if schedule.schedule_type == 'cron':
+                return self._get_missed_cron_runs(schedule.schedule_value, first, now, keep)
+            
+            if schedule.schedule_type == 'daily':
+                step = timedelta(days=1)
+            else:
+                step = timedelta(minutes=self._get_interval_minutes(schedule.schedule_value))
+        except (ValueError, TypeError):
+            return None
+        
+        count = int((now - first) / step) + 1
+        last = first + (count - 1) * step
+        return count, first, last, [last - step * offset for offset in reversed(range(min(keep, count)))]
+    
+    def _get_missed_cron_runs(self, expression, first, now, keep):
+        """Count the runs of a crontab expression from first up to now, as _get_missed_runs"""
+        times_of_day = get_cron_times_of_day(expression)
+        start = max(first, now - timedelta(days=MAX_CRON_DAYS_COUNTED))
+        minute = timedelta(minutes=1)
+        
+        # Per day: the day and the range of its times of day that were missed
+        missed_days = []
+        for day in iter_cron_days(expression, start, now + timedelta(microseconds=1)):
+            low = bisect_left(times_of_day, math.ceil((start - day) / minute))
+            high = bisect_right(times_of_day, math.floor((now - day) / minute))
+            if high > low:
+                missed_days.append((day, low, high))
+        
+        count = sum(high - low for _, low, high in missed_days)
+        if not count:
+            return None
+        
+        recent = []
+        for day, low, high in reversed(missed_days):
+            runs = [day + times_of_day[index] * minute for index in range(max(low, high - keep + len(recent)), high)]
+            recent = runs + recent
+            if len(recent) >= keep:
+                break
+        
+        first_day, first_low, _ = missed_days[0]
+        last_day, _, last_high = missed_days[-1]
+        return (count, first_day + times_of_day[first_low] * minute, last_day + times_of_day[last_high - 1] * minute,
+                recent)
+    
+    def _handle_missed_runs(self, schedule, now):
+        """
+        Apply a schedule's misfire policy to the runs it missed before now.
+        
+        Records the decision in the execution history, in the caller's
+        transaction. The most recent missed run within the grace window is
+        run under every policy; older ones are skipped under 'skip', coalesced
+        into one run under 'once', and run up to max_catchup_runs of them,
+        most recent first, under 'all', where 0 catches up on none.
+        
+        Returns:
+            list: Planned times of the runs to catch up on, oldest first
+        """
+        # Import the model here to avoid circular imports
+        from app.models.execution_orm import ExecutionORM
+        
+        policy, grace, max_runs = self._get_misfire_settings(schedule)
+        max_runs = max(0, max_runs)
+        missed = self._get_missed_runs(schedule, now, keep=max_runs + 1 if policy == 'all' else 1)
+        if not missed:
+            return []
+        
+        count, first, last, recent = missed
+        on_time = (now - last).total_seconds() <= grace
+        
+        if policy == 'all':
+            runs = min(count, int(on_time) + max_runs)
+        elif policy == 'once' or on_time:
+            runs = 1
+        else:
+            runs = 0
+        
+        run_times = recent[len(recent) - runs:] if runs else []
+        
+        ExecutionORM(
+            script_id=schedule.script_id,
+            aws_profile_id=schedule.profile_id,
+            user_id=schedule.user_id,
+            status=MISSED_STATUS,
+            start_time=now.isoformat(),
+            end_time=now.isoformat(),
+            output=(f"[SYSTEM] {count} scheduled run(s) missed between {first.isoformat(' ', 'minutes')} "
+                    f"and {last.isoformat(' ', 'minutes')}. Misfire policy '{policy}': "
+                    f"{runs} catch-up run(s) queued, {count - runs} skipped."),
+            parameters=schedule.parameters,
+            is_scheduled=1,
+            schedule_id=schedule.id
+        ).add()
+        
+        logger.info(f"Schedule {schedule.id} missed {count} run(s), queueing {runs} catch-up run(s)")
+        return run_times
+    
+    def _queue_catchups(self, catchups, now):
+        """
+        Add one-off jobs for catch-up runs, oldest planned run first.
+        
+        Catch-up runs start `catchup_interval_seconds` apart so that a restart
+        after downtime does not start every missed run at once.
+        
+        Args:
+            catchups (list): (planned time, run_script_func args) tuples
+            now (datetime): Time the first catch-up run may start
+        """
+        catchups.sort(key=lambda catchup: catchup[0])
+        
+        for position, (run_time, args) in enumerate(catchups):
+            job_id = f"{CATCHUP_JOB_PREFIX}{args[-1]}_{run_time:%Y%m%d%H%M}"
             try:
-                # Add the job to the scheduler
-                job = self.scheduler.add_job(
+                self.scheduler.add_job(
                     self.run_script_func,
-                    trigger=trigger,
-                    args=[script_id, profile_id, user_id, parameters, job_id],  # Pass job_id to run_script_func
+                    trigger=DateTrigger(run_date=now + timedelta(seconds=position * self.catchup_interval_seconds)),
+                    args=args,
                     id=job_id,
-                    replace_existing=True
+                    replace_existing=True,
+                    misfire_grace_time=None
                 )
-                
-                # Update job_id and next_run in database
-                self._update_job_info(schedule_id, job)
-                
-                logger.info(f"Added job {job_id} to scheduler")
-                return job
             except Exception as e:
-                logger.error(f"Error adding job: {str(e)}")
-                return None
+                logger.error(f"Error queueing catch-up job {job_id}: {str(e)}")
     
-    def _update_job_info(self, schedule_id, job):
-        """Update job information in the database"""
-        next_run = job.next_run_time.isoformat() if job.next_run_time else None
+    def _on_job_missed(self, event):
+        """Record a run that the scheduler skipped for starting too late"""
+        if not self.app or not event.job_id.startswith(SCHEDULE_JOB_PREFIXES):
+            return
         
-        with self.app.app_context():
-            # Import the model here to avoid circular imports
+        try:
+            # Import the models here to avoid circular imports
             from app.models.scheduler_orm import ScheduleORM
-            import time
-            
-            # Get schedule
-            schedule = ScheduleORM.query.get(schedule_id)
-            
-            if not schedule:
-                logger.error(f"Schedule not found for ID {schedule_id}")
-                return
-            
-            # Update fields
-            schedule.job_id = job.id
-            schedule.next_run = next_run
+            from app.models.execution_orm import ExecutionORM
             
-            # Set/update timestamp info for interval schedules
-            if schedule.schedule_type == 'interval' and job.next_run_time:
-                # If no start timestamp exists, initialize it
-                if not schedule.start_timestamp:
-                    # Record the current timestamp as reference point
-                    schedule.start_timestamp = time.time()
-                    logger.info(f"Setting initial start_timestamp for job {job.id}: {schedule.start_timestamp}")
+            schedule_id = int(event.job_id.rsplit('_', 1)[-1])
+            with self.app.app_context():
+                schedule = db.session.get(ScheduleORM, schedule_id)
+                if not schedule:
+                    return
+                
+                policy, grace, _ = self._get_misfire_settings(schedule)
+                now = datetime.now().isoformat()
+                ExecutionORM(
+                    script_id=schedule.script_id,
+                    aws_profile_id=schedule.profile_id,
+                    user_id=schedule.user_id,
+                    status=MISSED_STATUS,
+                    start_time=now,
+                    end_time=now,
+                    output=(f"[SYSTEM] Scheduled run due {event.scheduled_run_time.isoformat(' ', 'seconds')} "
+                            f"was more than {grace}s late. Misfire policy '{policy}': skipped."),
+                    parameters=schedule.parameters,
+                    is_scheduled=1,
+                    schedule_id=schedule.id
+                ).add()
+                db.session.commit()
             
-            # Save changes
-            db.session.commit()
+            dashboard_service.invalidate()
+        except Exception as e:
+            logger.error(f"Error recording missed run of job {event.job_id}: {str(e)}")
+    
+    def _apply_job_info(self, schedule, job):
+        """Set the job information of a schedule, to be saved by the caller's commit"""
+        schedule.job_id = job.id
+        schedule.next_run = job.next_run_time.isoformat() if job.next_run_time else None
+        
+        # Record the current timestamp as reference point for interval schedules
+        if schedule.schedule_type == 'interval' and job.next_run_time and not schedule.start_timestamp:
+            schedule.start_timestamp = time.time()
     
     def _remove_job(self, job_id):
         """Remove a job from the scheduler"""
@@ -683,91 +1702,38 @@ class SchedulerService:
         except Exception as e:
             logger.error(f"Error removing job {job_id}: {str(e)}")
     
-    def _calculate_next_run(self, schedule_type, schedule_value):
-        """Calculate the next run time for a schedule"""
-        now = datetime.now()
-        
-        if schedule_type == 'daily':
-            # Parse time (format: "HH:MM")
-            hour, minute = map(int, schedule_value.split(':'))
-            
-            # Create next run date
-            next_run = now.replace(hour=hour, minute=minute, second=0, microsecond=0)
-            
-            # If time has already passed today, move to tomorrow
-            if next_run <= now:
-                next_run += timedelta(days=1)
+    def _get_next_run(self, schedule):
+        """Get the next run time of a schedule from the trigger its job is given"""
+        job_id = self._get_job_id(schedule.id, schedule.script_id, schedule.schedule_type)
+        trigger = self._build_trigger(schedule.id, schedule, schedule.schedule_type, schedule.schedule_value, job_id)
+        next_run = trigger.get_next_fire_time(None, datetime.now(trigger.timezone))
+        return next_run.isoformat() if next_run else None
+    
+    def advance_fired_schedules(self, fired, fired_at):
+        """
+        Move schedules past the runs their jobs fired, whatever the runs' results.
         
-        elif schedule_type == 'interval':
-            # Handle special debug interval
-            if schedule_value == "debug-3min":
-                minutes_interval = 3
-            else:
-                # Regular hour-based intervals
-                hours_interval = int(schedule_value)
-                minutes_interval = hours_interval * 60
-            
-            # Next run is 'minutes_interval' from now
-            next_run = now + timedelta(minutes=minutes_interval)
+        Sets next_run to the job's next run time and last_run to when the run
+        was started, to be saved by the caller's commit. Runs missed while no
+        job existed are counted from next_run, so a run that fired is not
+        counted again after a restart, even if it failed or is still running.
         
-        else:
-            # Default if schedule type is unknown
-            next_run = now + timedelta(hours=1)
+        Args:
+            fired (dict): Schedule ID -> ID of the job that fired
+            fired_at (datetime): Time the runs were started
+        """
+        # Import the model here to avoid circular imports
+        from app.models.scheduler_orm import ScheduleORM
         
-        return next_run.isoformat()
+        if not fired:
+            return
         
-    def update_next_run_after_execution(self, job_id):
-        """Update the next_run time in the database after a successful execution"""
-        if not job_id:
-            logger.warning("Cannot update next_run: no job_id provided")
-            return False
+        for schedule in ScheduleORM.query.filter(ScheduleORM.id.in_(fired)).all():
+            schedule.last_run = fired_at.isoformat()
             
-        try:
-            # Get the job from APScheduler
-            job = self.scheduler.get_job(job_id)
-            if not job or not job.next_run_time:
-                logger.warning(f"Cannot update next_run: job {job_id} not found or has no next_run_time")
-                return False
-                
-            # Extract schedule_id from job_id (format is 'interval_script_id_schedule_id' or 'daily_script_id_schedule_id')
-            parts = job_id.split('_')
-            if len(parts) < 3:
-                logger.warning(f"Cannot update next_run: invalid job_id format: {job_id}")
-                return False
-                
-            # The last part is the schedule_id
-            schedule_id = parts[-1]
-            
-            # Update the database
-            with self.app.app_context():
-                from app.models.scheduler_orm import ScheduleORM
-                import time
-                
-                schedule = ScheduleORM.query.get(schedule_id)
-                if not schedule:
-                    logger.warning(f"Cannot update next_run: schedule {schedule_id} not found")
-                    return False
-                
-                # Update the next_run time
+            job = self.scheduler.get_job(fired[schedule.id])
+            if job and job.next_run_time:
                 schedule.next_run = job.next_run_time.isoformat()
-                
-                # Update last_run time to now
-                schedule.last_run = datetime.now().isoformat()
-                
-                # If this is an interval schedule, we don't update the start_timestamp
-                # That's our reference point for calculating intervals after restart
-                
-                logger.info(f"Updated next_run for schedule {schedule_id} to {schedule.next_run}")
-                logger.info(f"Updated last_run for schedule {schedule_id} to {schedule.last_run}")
-                
-                # Commit to database
-                from app.utils.db import db
-                db.session.commit()
-                return True
-                
-        except Exception as e:
-            logger.error(f"Error updating next_run after execution: {str(e)}", exc_info=True)
-            return False
 
 # Create an instance using ORM mode
 scheduler_service = SchedulerService()
\ No newline at end of file
@@ -19,6 +19,12 @@ class ScriptAdapter:
         """Get a script by ID"""
         return ScriptORM.get_by_id(script_id)
     
+    def get_by_ids(self, script_ids):
+        """Get scripts by ID in one query, as a dictionary keyed by ID"""
+        if not script_ids:
+            return {}
+        return {script.id: script for script in ScriptORM.query.filter(ScriptORM.id.in_(script_ids)).all()}
+    
     def get_all(self):
         """Get all scripts"""
         return ScriptORM.get_all()
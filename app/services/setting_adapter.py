@@ -1,48 +1,175 @@
+import time
 import logging
+import threading
 from app.models import SettingORM
+from app.services.event_bus import event_bus
+from app.utils.db import db
 
 logger = logging.getLogger('yellowstack')
 
+# Socket.IO room and event announcing a settings change to other workers
+SETTINGS_ROOM = 'settings'
+SETTINGS_CHANGED_EVENT = 'settings_changed'
+
+# Setting values read as booleans
+TRUE_VALUES = ('true', '1', 'yes', 'on')
+FALSE_VALUES = ('false', '0', 'no', 'off')
+
 class SettingAdapter:
     """
     Adapter class for the SQLAlchemy ORM Setting model.
     This provides a standardized interface for all setting operations.
+    
+    Settings are read from an in-memory snapshot of the whole table, loaded
+    on first use. Every write through the adapter bumps a version stamp,
+    which makes the snapshot stale; a snapshot loaded while a write was in
+    progress keeps the old version and is reloaded on next use. Writes are
+    also announced to other workers through the Socket.IO message queue,
+    and snapshots are reloaded after `max_age` seconds in any case.
     """
     
-    def __init__(self):
+    def __init__(self, max_age=60):
         """
         Initialize the adapter
+        
+        Args:
+            max_age (float): Seconds before the snapshot is reloaded from the
+                             database; 0 disables caching
         """
         self.use_orm = True  # Always True, kept for backward compatibility
+        self.max_age = max_age
+        self.socketio = None
+        
+        self._version = 0
+        # (engine, version, loaded_at, settings) of the current snapshot
+        self._snapshot = None
+        self._lock = threading.Lock()
+        self._subscription = event_bus.subscribe([SETTINGS_ROOM], max_events=10)
+    
+    def init_app(self, app):
+        """Apply settings from the Flask app configuration"""
+        self.max_age = app.config.get('SETTINGS_CACHE_MAX_AGE', self.max_age)
+        self.invalidate(notify=False)
+    
+    def set_socketio(self, socket_instance):
+        """Set the SocketIO instance used to notify other workers of changes"""
+        self.socketio = socket_instance
     
     def get(self, key, default=None):
         """Get a setting by key with optional default value"""
-        return SettingORM.get(key, default)
+        return self._get_settings().get(key, default)
+    
+    def get_int(self, key, default=0):
+        """Get a setting as an integer, or the default if it is missing or invalid"""
+        try:
+            return int(self.get(key))
+        except (TypeError, ValueError):
+            return default
+    
+    def get_bool(self, key, default=False):
+        """Get a setting as a boolean, or the default if it is missing or invalid"""
+        value = str(self.get(key, '')).strip().lower()
+        if value in TRUE_VALUES:
+            return True
+        if value in FALSE_VALUES:
+            return False
+        return default
     
     def get_all(self):
         """Get all settings as a dictionary"""
-        return SettingORM.get_all()
+        return dict(self._get_settings())
     
     def set(self, key, value):
         """Set a setting value"""
-        return SettingORM.set(key, value)
+        try:
+            return SettingORM.set(key, value)
+        finally:
+            self.invalidate()
     
     def update_multiple(self, settings_dict):
         """Update multiple settings at once"""
         if not settings_dict:
             return False
         
-        return SettingORM.update_multiple(settings_dict)
+        try:
+            return SettingORM.update_multiple(settings_dict)
+        finally:
+            self.invalidate()
     
     def delete(self, key):
         """Delete a setting"""
-        orm_setting = SettingORM.query.filter_by(key=key).first()
-        if orm_setting:
-            success = orm_setting.delete()
-        else:
-            success = True  # Not an error if it doesn't exist
+        try:
+            orm_setting = SettingORM.query.filter_by(key=key).first()
+            if orm_setting:
+                success = orm_setting.delete()
+            else:
+                success = True  # Not an error if it doesn't exist
+        finally:
+            self.invalidate()
         
         return success
+    
+    def invalidate(self, notify=True):
+        """
+        Make the settings snapshot stale so it is reloaded on next use.
+        
+        Args:
+            notify (bool): Also tell other workers to reload their snapshot
+        """
+        with self._lock:
+            self._version += 1
+            self._snapshot = None
+        
+        if notify and self.socketio is not None:
+            try:
+                self.socketio.emit(SETTINGS_CHANGED_EVENT, {'origin': event_bus.bus_id}, to=SETTINGS_ROOM)
+            except Exception as e:
+                logger.error(f"Error announcing settings change: {str(e)}")
+    
+    def _get_settings(self):
+        """Get the settings snapshot, reloading it if it is stale"""
+        self._receive_changes()
+        
+        # Each app has its own database, e.g. in tests
+        engine = db.engine
+        snapshot = self._snapshot
+        if self._is_current(snapshot, engine):
+            return snapshot[3]
+        
+        with self._lock:
+            snapshot = self._snapshot
+            if self._is_current(snapshot, engine):
+                return snapshot[3]
+            version = self._version
+        
+        settings = SettingORM.get_all()
+        
+        with self._lock:
+            # A write during the load leaves the snapshot stale
+            self._snapshot = (engine, version, time.monotonic(), settings)
+        
+        return settings
+    
+    def _is_current(self, snapshot, engine):
+        """Check whether a snapshot can be used"""
+        return (snapshot is not None and snapshot[0] is engine and snapshot[1] == self._version
+                and time.monotonic() - snapshot[2] < self.max_age)
+    
+    def _receive_changes(self):
+        """Invalidate the snapshot for changes announced by other workers"""
+        changed = self._subscription.overflowed
+        self._subscription.overflowed = False
+        
+        while True:
+            item = self._subscription.get(timeout=0)
+            if item is None:
+                break
+            _, event, data = item
+            if event == SETTINGS_CHANGED_EVENT and (data or {}).get('origin') != event_bus.bus_id:
+                changed = True
+        
+        if changed:
+            self.invalidate(notify=False)
 
 # Create a default instance that can be imported directly
-setting_adapter = SettingAdapter()
\ No newline at end of file
+setting_adapter = SettingAdapter()
@@ -1,5 +1,8 @@
+import time
 import logging
+import threading
 from app.models import UserORM
+from app.utils.db import db
 
 logger = logging.getLogger('yellowstack')
 
@@ -7,18 +10,76 @@ class UserAdapter:
     """
     Adapter class for the SQLAlchemy ORM User model.
     This provides a standardized interface for all user operations.
+    
+    Logged-in users are checked on every request, so `get_session_user`
+    keeps them in a short-lived per-process cache. Entries are keyed by the
+    user's auth version, which is bumped when the user is deleted, has
+    their password changed or is granted or revoked admin status, so those
+    changes apply immediately in this process and within `cache_ttl`
+    seconds in other processes.
     """
     
-    def __init__(self):
+    def __init__(self, cache_ttl=30):
         """
         Initialize the adapter
+        
+        Args:
+            cache_ttl (float): Seconds a logged-in user is cached for; 0
+                               disables caching
         """
         self.use_orm = True  # Always True, kept for backward compatibility
+        self.cache_ttl = cache_ttl
+        
+        # (engine, user ID, auth version) -> (user dictionary, cached at)
+        self._session_users = {}
+        self._auth_versions = {}
+        self._lock = threading.Lock()
+    
+    def init_app(self, app):
+        """Apply settings from the Flask app configuration"""
+        self.cache_ttl = app.config.get('USER_CACHE_SECONDS', self.cache_ttl)
+        with self._lock:
+            self._session_users.clear()
     
     def get_by_id(self, user_id):
         """Get a user by ID"""
         return UserORM.get_by_id(user_id)
     
+    def get_session_user(self, user_id):
+        """
+        Get the logged-in user with the given ID, from the cache if possible.
+        
+        Returns:
+            dict: User dictionary, or None if the user does not exist
+        """
+        now = time.monotonic()
+        with self._lock:
+            key = (db.engine, user_id, self._auth_versions.get(user_id, 0))
+            cached = self._session_users.get(key)
+        
+        if cached and now - cached[1] < self.cache_ttl:
+            return cached[0]
+        
+        user = UserORM.get_by_id(user_id)
+        if user is None:
+            return None
+        
+        user = user.to_dict()
+        with self._lock:
+            # Entries of other versions and databases are never read again
+            self._session_users = {cache_key: value for cache_key, value in self._session_users.items()
+                                   if now - value[1] < self.cache_ttl}
+            # A change during the lookup gave the user a new version
+            if key[2] == self._auth_versions.get(user_id, 0):
+                self._session_users[key] = (user, now)
+        
+        return user
+    
+    def invalidate(self, user_id):
+        """Drop a user from the cache of logged-in users"""
+        with self._lock:
+            self._auth_versions[user_id] = self._auth_versions.get(user_id, 0) + 1
+    
     def get_by_username(self, username):
         """Get a user by username"""
         return UserORM.get_by_username(username)
@@ -52,6 +113,7 @@ class UserAdapter:
         else:
             success = False
         
+        self.invalidate(user_id)
         return success
     
     def toggle_admin(self, user_id, is_admin):
@@ -62,6 +124,7 @@ class UserAdapter:
         else:
             success = False
         
+        self.invalidate(user_id)
         return success
     
     def check_password(self, user, password):
@@ -86,6 +149,7 @@ class UserAdapter:
         else:
             success = False
         
+        self.invalidate(user_id)
         return success
 
 # Create a default instance that can be imported directly
@@ -0,0 +1,213 @@
+import socketio as socketio_lib
+import logging
+import threading
+from functools import partial
+from app.services.event_bus import event_bus
+
+# Get the existing logger from the application
+logger = logging.getLogger('yellowstack')
+
+class ClientSendQueue:
+    """Output delivery state of one connected client"""
+
+    def __init__(self):
+        self.pending_bytes = 0
+        self.pending_frames = 0
+        self.dropped_bytes = 0
+        self.dropped_frames = 0
+        self.gap_count = 0
+
+        # Executions in gap mode: execution ID -> [gap start, gap end] offsets
+        self.gaps = {}
+
+    def to_dict(self, sid):
+        """Convert the state to a metrics dictionary"""
+        return {
+            'sid': sid,
+            'pending_bytes': self.pending_bytes,
+            'pending_frames': self.pending_frames,
+            'dropped_bytes': self.dropped_bytes,
+            'dropped_frames': self.dropped_frames,
+            'gap_count': self.gap_count,
+            'gap_executions': sorted(self.gaps)
+        }
+
+class FlowControlManager(socketio_lib.Manager):
+    """
+    Client manager that bounds the output queued for each client.
+
+    Output frames are sent to each client of an execution room separately,
+    with an acknowledgement request. Bytes sent but not yet acknowledged
+    count as that client's send queue. A frame that would take the queue
+    over `max_queue_bytes` is dropped for that client only, which puts the
+    execution into gap mode for it: later frames are dropped too until the
+    queue has drained to half the cap. The client is then sent a
+    'script_output_gap' event with the skipped offset range, to fetch over
+    HTTP, and live frames resume from the latest offset.
+
+    A slow client therefore never holds more than the cap in server memory
+    and never delays delivery to other clients.
+    """
+
+    OUTPUT_EVENT = 'script_output'
+    GAP_EVENT = 'script_output_gap'
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.max_queue_bytes = 1048576
+        self._clients = {}
+        self._clients_lock = threading.Lock()
+
+    def emit(self, event, data, namespace, room=None, skip_sid=None,
+             callback=None, to=None, **kwargs):
+        """Deliver output frames with flow control and other events unchanged"""
+        room = to or room
+        if event != self.OUTPUT_EVENT or callback is not None or not room or not self.max_queue_bytes:
+            return super().emit(event, data, namespace, room=room, skip_sid=skip_sid,
+                                callback=callback, **kwargs)
+
+        namespace = namespace or '/'
+        if namespace not in self.rooms:
+            return
+        if not isinstance(skip_sid, list):
+            skip_sid = [skip_sid]
+
+        for sid, _ in list(self.get_participants(namespace, room)):
+            if sid not in skip_sid:
+                self._send_output(sid, namespace, data)
+
+    def disconnect(self, sid, namespace=None, **kwargs):
+        """Forget the send queue of a disconnected client"""
+        with self._clients_lock:
+            self._clients.pop(sid, None)
+        return super().disconnect(sid, namespace=namespace, **kwargs)
+
+    def get_client_metrics(self):
+        """Get the send queue metrics of every client that received output"""
+        with self._clients_lock:
+            return [queue.to_dict(sid) for sid, queue in self._clients.items()]
+
+    def _send_output(self, sid, namespace, frame):
+        """Send an output frame to one client, or drop it if its queue is full"""
+        size = len(frame.get('output') or '')
+        execution_id = frame.get('execution_id')
+        gap = None
+
+        with self._clients_lock:
+            queue = self._clients.setdefault(sid, ClientSendQueue())
+
+            if execution_id in queue.gaps:
+                if queue.pending_bytes <= self.max_queue_bytes // 2:
+                    # Drained: report the gap and resume with this frame
+                    gap = self._end_gap(queue, execution_id)
+                else:
+                    queue.gaps[execution_id][1] = frame.get('next_offset')
+                    queue.dropped_bytes += size
+                    queue.dropped_frames += 1
+                    return
+            elif queue.pending_bytes + size > self.max_queue_bytes and queue.pending_frames:
+                queue.gaps[execution_id] = [frame.get('offset'), frame.get('next_offset')]
+                queue.gap_count += 1
+                queue.dropped_bytes += size
+                queue.dropped_frames += 1
+                logger.warning(f"Client {sid} is too slow for execution {execution_id} output, "
+                               f"skipping output until its queue drains")
+                return
+
+            queue.pending_bytes += size
+            queue.pending_frames += 1
+
+        if gap:
+            super().emit(self.GAP_EVENT, gap, namespace, to=sid)
+
+        super().emit(self.OUTPUT_EVENT, frame, namespace, to=sid,
+                     callback=partial(self._on_output_ack, sid, namespace, size))
+
+    def _on_output_ack(self, sid, namespace, size, *args):
+        """Release acknowledged bytes and report gaps once the queue has drained"""
+        gaps = []
+
+        with self._clients_lock:
+            queue = self._clients.get(sid)
+            if queue is None:
+                return
+
+            queue.pending_bytes = max(0, queue.pending_bytes - size)
+            queue.pending_frames = max(0, queue.pending_frames - 1)
+
+            if queue.pending_bytes <= self.max_queue_bytes // 2:
+                gaps = [self._end_gap(queue, execution_id) for execution_id in list(queue.gaps)]
+
+        for gap in gaps:
+            super().emit(self.GAP_EVENT, gap, namespace, to=sid)
+
+    def _end_gap(self, queue, execution_id):
+        """Leave gap mode for an execution and build the gap event (lock must be held)"""
+        start, end = queue.gaps.pop(execution_id)
+        return {
+            'execution_id': execution_id,
+            'offset': start,
+            'next_offset': end
+        }
+
+class EventBusManager(FlowControlManager):
+    """
+    Client manager that also publishes delivered events to the event bus.
+
+    This is the point where the Socket.IO server delivers an event to the
+    clients of this process, so the event bus sees the same events, whether
+    they were emitted locally or received from the message queue.
+    """
+
+    def emit(self, event, data, namespace, room=None, skip_sid=None,
+             callback=None, to=None, **kwargs):
+        """Publish the event to the event bus, then deliver it to clients"""
+        if (namespace or '/') == '/':
+            event_bus.publish(event, data, to or room)
+
+        return super().emit(event, data, namespace, room=room, skip_sid=skip_sid,
+                            callback=callback, to=to, **kwargs)
+
+class RedisEventBusManager(socketio_lib.RedisManager, EventBusManager):
+    """Redis pub/sub manager feeding the event bus"""
+
+class KombuEventBusManager(socketio_lib.KombuManager, EventBusManager):
+    """Kombu manager feeding the event bus"""
+
+def create_client_manager(app):
+    """
+    Create the Socket.IO client manager for the configured message queue.
+
+    Without a message queue, events are only delivered to clients connected
+    to the current process. With one, every emit is published to the queue
+    and delivered by each worker to its own clients, so output of a script
+    running in one worker reaches clients connected to any other worker.
+
+    Supported URLs:
+        redis://, rediss://  - Redis pub/sub (RedisManager)
+        anything else        - Kombu transport, e.g. amqp:// or memory://
+                               (memory:// only works within one process and
+                               is meant for tests)
+
+    Args:
+        app: Flask application instance
+
+    Returns:
+        Client manager instance
+    """
+    url = app.config.get('SOCKETIO_MESSAGE_QUEUE')
+    if not url:
+        manager = EventBusManager()
+    else:
+        channel = app.config.get('SOCKETIO_CHANNEL') or 'yellowstack'
+
+        if url.startswith(('redis://', 'rediss://')):
+            manager_class = RedisEventBusManager
+        else:
+            manager_class = KombuEventBusManager
+
+        logger.info(f"Using {manager_class.__name__} message queue for Socket.IO on channel '{channel}'")
+        manager = manager_class(url, channel=channel)
+
+    manager.max_queue_bytes = app.config.get('SOCKETIO_CLIENT_QUEUE_BYTES', manager.max_queue_bytes)
+    return manager
@@ -0,0 +1,65 @@
+from datetime import datetime
+from sqlalchemy.types import BigInteger, TypeDecorator
+
+def to_epoch_ms(value):
+    """
+    Convert a timestamp to epoch milliseconds.
+
+    Args:
+        value: datetime, ISO 8601 string or epoch milliseconds; naive values
+               are in local time
+
+    Returns:
+        int: Milliseconds since the epoch, or None
+    """
+    if value is None or value == '':
+        return None
+    if isinstance(value, bool):
+        raise TypeError("Invalid timestamp: bool")
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value)
+    if isinstance(value, datetime):
+        return int(value.timestamp() * 1000)
+    raise TypeError(f"Invalid timestamp: {value!r}")
+
+def from_epoch_ms(value):
+    """
+    Convert epoch milliseconds to a local ISO 8601 string.
+
+    Returns:
+        str: Local time in ISO format, or None
+    """
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value / 1000).isoformat()
+
+def local_date(value):
+    """Get the local date (YYYY-MM-DD) of a timestamp, or None"""
+    value = to_epoch_ms(value)
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value / 1000).date().isoformat()
+
+class EpochMillis(TypeDecorator):
+    """
+    Timestamp stored as integer epoch milliseconds.
+
+    Accepts datetimes, ISO strings and epoch milliseconds, and returns local
+    ISO strings, so code and clients that work with ISO timestamps are
+    unaffected while the database compares and indexes plain integers.
+    """
+
+    impl = BigInteger
+    cache_ok = True
+
+    def process_bind_param(self, value, dialect):
+        return to_epoch_ms(value)
+
+    def process_literal_param(self, value, dialect):
+        value = to_epoch_ms(value)
+        return 'NULL' if value is None else str(value)
+
+    def process_result_value(self, value, dialect):
+        return from_epoch_ms(value)
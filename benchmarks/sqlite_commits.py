@@ -0,0 +1,77 @@
+"""
+Benchmark SQLite commit throughput with and without the performance profile.
+
+Simulates the write pattern of running executions: several threads each
+appending output to their own execution row and committing every write.
+
+Usage:
+    python benchmarks/sqlite_commits.py [--threads 4] [--commits 500]
+"""
+import argparse
+import os
+import sys
+import tempfile
+import threading
+import time
+from sqlalchemy import create_engine, text
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app.utils.db import SQLITE_PROFILES, register_sqlite_pragmas
+
+def run(profile, threads, commits):
+    """Run the workload against a fresh database and return commits per second"""
+    with tempfile.TemporaryDirectory() as directory:
+        engine = create_engine(f"sqlite:///{os.path.join(directory, 'bench.db')}",
+                               pool_size=threads, max_overflow=0)
+        register_sqlite_pragmas(engine, SQLITE_PROFILES[profile])
+
+        with engine.begin() as connection:
+            connection.exec_driver_sql(
+                "CREATE TABLE execution_history (id INTEGER PRIMARY KEY, status TEXT, output TEXT)"
+            )
+            for i in range(threads):
+                connection.exec_driver_sql(
+                    "INSERT INTO execution_history (id, status, output) VALUES (?, 'Running', '')", (i + 1,)
+                )
+
+        def worker(execution_id):
+            for i in range(commits):
+                # Retry on lock errors so both profiles complete the same work
+                while True:
+                    try:
+                        with engine.begin() as connection:
+                            connection.execute(
+                                text("UPDATE execution_history SET output = output || :line WHERE id = :id"),
+                                {'line': f"line {i}\n", 'id': execution_id}
+                            )
+                        break
+                    except Exception:
+                        time.sleep(0.001)
+
+        workers = [threading.Thread(target=worker, args=(i + 1,)) for i in range(threads)]
+        started = time.perf_counter()
+        for thread in workers:
+            thread.start()
+        for thread in workers:
+            thread.join()
+        elapsed = time.perf_counter() - started
+
+        engine.dispose()
+        return threads * commits / elapsed
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument('--threads', type=int, default=4)
+    parser.add_argument('--commits', type=int, default=500, help='Commits per thread')
+    args = parser.parse_args()
+
+    results = {}
+    for profile in ('default', 'performance'):
+        results[profile] = run(profile, args.threads, args.commits)
+        print(f"{profile:>12}: {results[profile]:8.0f} commits/s")
+
+    print(f"{'speedup':>12}: {results['performance'] / results['default']:8.1f}x")
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,157 @@
+"""Epoch millisecond timestamps
+
+Revision ID: 0003
+Revises: 0002
+Create Date: 2026-10-18 19:42:11.503127
+
+"""
+from datetime import datetime
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '0003'
+down_revision = '0002'
+branch_labels = None
+depends_on = None
+
+# Timestamp columns converted from ISO strings, by table and primary key
+TIMESTAMP_COLUMNS = {
+    ('execution_history', 'id'): ['start_time', 'end_time'],
+    ('schedules', 'id'): ['next_run', 'created_at', 'last_run'],
+    ('users', 'id'): ['created_at'],
+}
+
+# Lengths of the original string columns
+STRING_LENGTHS = {'execution_history': 40, 'schedules': 32, 'users': 32}
+
+BATCH_SIZE = 1000
+
+
+def _to_ms(value):
+    """Convert an ISO string (naive values are local time) to epoch milliseconds"""
+    if not value:
+        return None
+    try:
+        return int(datetime.fromisoformat(value).timestamp() * 1000)
+    except (TypeError, ValueError):
+        return None
+
+
+def _to_iso(value):
+    """Convert epoch milliseconds to a local ISO string"""
+    if value is None:
+        return None
+    return datetime.fromtimestamp(value / 1000).isoformat()
+
+
+def _copy_rows(table, key, columns, convert, extra=None):
+    """
+    Copy each column into its '<column>_new' counterpart in batches.
+
+    `extra` computes additional '<name>_new' values from the source row.
+    """
+    connection = op.get_bind()
+    select = sa.text(f"SELECT {key}, {', '.join(columns)} FROM {table} "
+                     f"WHERE {key} > :last ORDER BY {key} LIMIT {BATCH_SIZE}")
+    targets = columns + list(extra or {})
+    update = sa.text(f"UPDATE {table} SET " +
+                     ', '.join(f"{column}_new = :{column}" for column in targets) +
+                     f" WHERE {key} = :key")
+
+    last = -1
+    while True:
+        rows = connection.execute(select, {'last': last}).all()
+        if not rows:
+            break
+
+        params = []
+        for row in rows:
+            values = {column: convert(getattr(row, column)) for column in columns}
+            for name, compute in (extra or {}).items():
+                values[name] = compute(row)
+            values['key'] = row[0]
+            params.append(values)
+
+        connection.execute(update, params)
+        last = rows[-1][0]
+
+
+def _duration_ms(row):
+    start, end = _to_ms(row.start_time), _to_ms(row.end_time)
+    return end - start if start is not None and end is not None else None
+
+
+def _start_date(row):
+    start = _to_ms(row.start_time)
+    return datetime.fromtimestamp(start / 1000).date().isoformat() if start is not None else None
+
+
+def _replace_columns(table, columns, new_type, extra_columns=(), drop_columns=()):
+    """Swap each column for its converted '<column>_new' counterpart"""
+    with op.batch_alter_table(table, schema=None) as batch_op:
+        # Dependent columns first, as PostgreSQL will not drop the source
+        # of a generated column
+        for column in list(drop_columns) + list(columns):
+            batch_op.drop_column(column)
+        for column in columns:
+            batch_op.alter_column(f"{column}_new", new_column_name=column,
+                                  existing_type=new_type, existing_nullable=True)
+        for column, column_type in extra_columns:
+            batch_op.alter_column(f"{column}_new", new_column_name=column,
+                                  existing_type=column_type, existing_nullable=True)
+
+
+def upgrade():
+    with op.batch_alter_table('execution_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_execution_history_start_date')
+        batch_op.drop_index('ix_execution_history_status_start_time')
+
+    for (table, key), columns in TIMESTAMP_COLUMNS.items():
+        extra = {}
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.add_column(sa.Column(f"{column}_new", sa.BigInteger(), nullable=True))
+            if table == 'execution_history':
+                batch_op.add_column(sa.Column('duration_ms_new', sa.BigInteger(), nullable=True))
+                batch_op.add_column(sa.Column('start_date_new', sa.String(length=10), nullable=True))
+                extra = {'duration_ms': _duration_ms, 'start_date': _start_date}
+
+        _copy_rows(table, key, columns, _to_ms, extra)
+
+        if table == 'execution_history':
+            # The generated start_date column is replaced by a plain one
+            _replace_columns(table, columns, sa.BigInteger(),
+                             extra_columns=[('duration_ms', sa.BigInteger()),
+                                            ('start_date', sa.String(length=10))],
+                             drop_columns=['start_date'])
+        else:
+            _replace_columns(table, columns, sa.BigInteger())
+
+    with op.batch_alter_table('execution_history', schema=None) as batch_op:
+        batch_op.create_index('ix_execution_history_start_date', ['start_date'], unique=False)
+        batch_op.create_index('ix_execution_history_status_start_time', ['status', 'start_time'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('execution_history', schema=None) as batch_op:
+        batch_op.drop_index('ix_execution_history_start_date')
+        batch_op.drop_index('ix_execution_history_status_start_time')
+        batch_op.drop_column('duration_ms')
+        batch_op.drop_column('start_date')
+
+    for (table, key), columns in TIMESTAMP_COLUMNS.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            for column in columns:
+                batch_op.add_column(sa.Column(f"{column}_new", sa.String(length=STRING_LENGTHS[table]),
+                                              nullable=True))
+
+        _copy_rows(table, key, columns, _to_iso)
+        _replace_columns(table, columns, sa.String(length=STRING_LENGTHS[table]))
+
+    with op.batch_alter_table('execution_history', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('start_date', sa.String(length=10),
+                                      sa.Computed('substr(start_time, 1, 10)'), nullable=True))
+        batch_op.create_index('ix_execution_history_start_date', ['start_date'], unique=False)
+        batch_op.create_index('ix_execution_history_status_start_time', ['status', 'start_time'], unique=False)
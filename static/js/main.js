@@ -41,6 +41,12 @@ function initializeSocket() {
         }
     });
     
+    // Status updates are only delivered to the dashboard room,
+    // and room membership is lost on reconnect, so join on every connect
+    socket.on('connect', function() {
+        socket.emit('join_dashboard');
+    });
+    
     // Listen for script status updates
     socket.on('script_status_update', function(data) {
         console.log('Script status update received:', data);
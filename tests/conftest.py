@@ -31,7 +31,7 @@ def app():
         'TESTING': True,
         'SECRET_KEY': 'test_key',
         'DATABASE': ':memory:',
-        'SQLALCHEMY_DATABASE_URI': 'sqlite:///:memory:',
+        'SQLALCHEMY_DATABASE_URI': os.environ.get('TEST_DATABASE_URL', 'sqlite:///:memory:'),
         'SQLALCHEMY_TRACK_MODIFICATIONS': False,
         'PRESERVE_CONTEXT_ON_EXCEPTION': False,
         # We leave CSRF protection disabled for non-CSRF specific tests
@@ -59,6 +59,7 @@ def app():
         # Clean up after test
         db.session.remove()
         db.drop_all()
+        db.engine.dispose()
 
 @pytest.fixture
 def client(app):
@@ -3,7 +3,7 @@ Tests for application initialization in app/__init__.py
 """
 import os
 import pytest
-from unittest.mock import patch, MagicMock, call
+from unittest.mock import patch, MagicMock, call, ANY
 
 from app import (
     create_app, 
@@ -110,9 +110,12 @@ class TestAppInit:
     @patch('app.services.script_service')
     @patch('app.services.aws_service')
     @patch('app.services.execution_service')
+    @patch('app.services.dashboard_service')
+    @patch('app.services.setting_adapter')
+    @patch('app.services.user_adapter')
     @patch('app.services.scheduler_service.scheduler_service')
-    def test_init_services(self, mock_scheduler_service, mock_execution_service, 
-                          mock_aws_service, mock_script_service):
+    def test_init_services(self, mock_scheduler_service, mock_user_adapter, mock_setting_adapter, mock_dashboard_service,
+                          mock_execution_service, mock_aws_service, mock_script_service):
         """Test service initialization"""
         # Create a mock Flask app
         mock_app = MagicMock()
@@ -123,6 +126,11 @@ class TestAppInit:
         # Verify execution service was initialized with socketio and app
         mock_execution_service.set_socketio.assert_called_once_with(socketio)
         mock_execution_service.set_flask_app.assert_called_once_with(mock_app)
+        mock_dashboard_service.init_app.assert_called_once_with(mock_app)
+        mock_setting_adapter.init_app.assert_called_once_with(mock_app)
+        mock_setting_adapter.set_socketio.assert_called_once_with(socketio)
+        mock_user_adapter.init_app.assert_called_once_with(mock_app)
+        mock_aws_service.init_app.assert_called_once_with(mock_app)
         
         # Verify scheduler service was initialized
         mock_scheduler_service.init_app.assert_called_once()
@@ -135,8 +143,9 @@ class TestAppInit:
     
     def test_init_extensions(self):
         """Test extension initialization"""
-        # Create a mock Flask app
+        # Create a mock Flask app without a message queue configured
         mock_app = MagicMock()
+        mock_app.config = {}
         
         # Mock socketio and csrf objects
         mock_socketio = MagicMock()
@@ -155,7 +164,8 @@ class TestAppInit:
                 mock_app, 
                 cors_allowed_origins="*", 
                 async_mode="eventlet", 
-                manage_session=False
+                manage_session=False,
+                client_manager=ANY
             )
             
             # Verify CSRF protection was initialized
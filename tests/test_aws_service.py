@@ -0,0 +1,113 @@
+import threading
+import pytest
+from unittest.mock import patch
+from app.services.aws_service import AWSService
+from tests.utils import create_aws_profile
+
+@pytest.fixture
+def service(app):
+    """Create an AWS service with its own cache"""
+    with app.app_context():
+        yield AWSService(cache_size=4)
+
+def test_clients_are_cached(service):
+    """Test that repeated lookups reuse one client per service"""
+    service.cache_size = 64
+    profile = create_aws_profile()
+    
+    client = service.get_aws_client('s3', profile.id)
+    assert service.get_aws_client('s3', profile.id) is client
+    assert service.get_aws_client('sts', profile.id) is not client
+    
+    # Another region gets its own client
+    other_region = service.get_aws_client('s3', profile.id, region='eu-west-1')
+    assert other_region is not client
+    assert other_region.meta.region_name == 'eu-west-1'
+    
+    # The default profile shares the entries of its ID
+    profile.set_as_default()
+    assert service.get_aws_client('s3') is client
+
+def test_sessions_returned_are_not_shared(service):
+    """Test that callers get their own session rather than the cached one"""
+    profile = create_aws_profile()
+    service.get_aws_client('s3', profile.id)
+    
+    session = service.get_boto3_session(profile.id, region='eu-west-1')
+    assert session is not service.get_boto3_session(profile.id, region='eu-west-1')
+    assert session.region_name == 'eu-west-1'
+    assert session.get_credentials().access_key == profile.aws_access_key
+    assert session is not service._get_session(profile, 'eu-west-1')
+
+def test_resources_are_not_shared(service):
+    """Test that each resource lookup gets a new resource from the cached session"""
+    profile = create_aws_profile()
+    
+    assert service.get_aws_resource('s3', profile.id) is not service.get_aws_resource('s3', profile.id)
+
+def test_least_recently_used_entries_are_dropped(service):
+    """Test that the cache keeps at most cache_size entries"""
+    profile = create_aws_profile()
+    
+    # The session and three clients fill the cache
+    first = service.get_aws_client('s3', profile.id)
+    service.get_aws_client('sts', profile.id)
+    service.get_aws_client('ec2', profile.id)
+    assert service.get_aws_client('s3', profile.id) is first
+    
+    # A new client drops the least recently used entry, the sts client
+    service.get_aws_client('iam', profile.id)
+    assert service.get_aws_client('s3', profile.id) is first
+    with patch('boto3.Session.client', wraps=service.get_boto3_session(profile.id).client) as mock_client:
+        service.get_aws_client('sts', profile.id)
+    mock_client.assert_called_once_with('sts')
+    
+    service.cache_size = 0
+    assert service.get_aws_client('s3', profile.id) is not service.get_aws_client('s3', profile.id)
+
+def test_profile_changes_invalidate_cache(service):
+    """Test that updating or deleting a profile drops its entries"""
+    profile = create_aws_profile()
+    other = create_aws_profile(name='Other Profile')
+    client = service.get_aws_client('s3', profile.id)
+    other_client = service.get_aws_client('s3', other.id)
+    
+    with patch.object(service, '_validate_aws_credentials'):
+        service.update_profile(profile.id, aws_secret_key='new_secret')
+    
+    updated = service.get_aws_client('s3', profile.id)
+    assert updated is not client
+    assert updated._request_signer._credentials.secret_key == 'new_secret'
+    assert service.get_aws_client('s3', other.id) is other_client
+    
+    service.delete_profile(profile.id)
+    with pytest.raises(ValueError):
+        service.get_aws_client('s3', profile.id)
+
+def test_credentials_changed_elsewhere_are_picked_up(service):
+    """Test that credentials changed without this service, e.g. by another worker, get new entries"""
+    profile = create_aws_profile()
+    client = service.get_aws_client('s3', profile.id)
+    
+    profile.aws_access_key = 'rotated_key'
+    profile.save()
+    
+    assert service.get_aws_client('s3', profile.id) is not client
+
+def test_concurrent_lookups_share_one_client(app, service):
+    """Test that threads looking up the same client get the same one"""
+    profile = create_aws_profile()
+    clients = []
+    
+    def lookup():
+        with app.app_context():
+            clients.append(service.get_aws_client('s3', profile.id))
+    
+    threads = [threading.Thread(target=lookup) for _ in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    
+    assert len(clients) == 8
+    assert len({id(client) for client in clients}) == 1
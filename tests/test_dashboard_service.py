@@ -0,0 +1,149 @@
+import pytest
+from datetime import datetime, timedelta
+from unittest.mock import patch
+from app.services.dashboard_service import DashboardService
+from app.services.execution_adapter import execution_adapter
+from tests.utils import create_user, create_script, create_aws_profile
+
+@pytest.fixture
+def setup(app):
+    """Create the records executions refer to"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        profile = create_aws_profile()
+        yield {'user': user, 'script': script, 'profile': profile}
+
+def _create_execution(setup, status='Pending', start_time=None):
+    return execution_adapter.create(setup['script'].id, setup['profile'].id, setup['user'].id,
+                                    status=status, start_time=start_time)
+
+def test_get_state_loads_recent_and_today_counts(setup):
+    """Test loading recent executions and today's counts from the database"""
+    yesterday = (datetime.now() - timedelta(days=1)).isoformat()
+    _create_execution(setup, status='Failed', start_time=yesterday)
+    _create_execution(setup, status='Success')
+    _create_execution(setup, status='Running')
+
+    state = DashboardService(limit=2).get_state()
+
+    assert [execution['status'] for execution in state['executions']] == ['Running', 'Success']
+    assert state['executions'][0]['script_name'] == setup['script'].name
+    assert 'output' not in state['executions'][0]
+    assert state['counts']['Success'] == 1
+    assert state['counts']['Running'] == 1
+    assert 'Failed' not in state['counts']
+    assert state['counts']['date'] == datetime.now().date().isoformat()
+
+def test_only_unfinished_executions_are_tracked(setup):
+    """Test that today's counts come from the rollup and finished executions are not loaded"""
+    _create_execution(setup, status='Success')
+    _create_execution(setup, status='Failed')
+    running_id = _create_execution(setup, status='Running')
+    service = DashboardService()
+
+    state = service.get_state()
+
+    assert service._statuses == {running_id: 'Running'}
+    assert state['counts']['Success'] == 1
+    assert state['counts']['Failed'] == 1
+    assert state['counts']['Running'] == 1
+
+    execution_adapter.update_status(running_id, 'Failed')
+    delta = service.record_status(running_id, 'Failed')
+
+    assert delta['counts']['changes'] == {'Running': -1, 'Failed': 1}
+    assert service._statuses == {}
+    assert service.get_state()['counts']['Failed'] == 2
+
+def test_repeated_final_status_is_counted_once(setup):
+    """Test that a final status emitted twice is not counted again once the execution left the recent list"""
+    execution_id = _create_execution(setup, status='Running')
+    service = DashboardService(limit=1)
+    service.get_state()
+
+    previous_status = execution_adapter.update_status(execution_id, 'Cancelled')
+    assert service.record_status(execution_id, 'Cancelled', previous_status)['counts']['changes'] == \
+        {'Running': -1, 'Cancelled': 1}
+    service.record_status(_create_execution(setup), 'Pending')
+
+    # The thread running the execution reports the cancellation as well
+    previous_status = execution_adapter.update_status(execution_id, 'Cancelled')
+    assert service.record_status(execution_id, 'Cancelled', previous_status)['counts']['changes'] == {}
+
+    assert service.get_state()['counts']['Cancelled'] == 1
+    service.invalidate()
+    assert service.get_state()['counts']['Cancelled'] == 1
+
+def test_record_status_updates_without_queries(setup):
+    """Test that a transition of a known execution is applied in memory"""
+    execution_id = _create_execution(setup, status='Running')
+    service = DashboardService()
+    service.get_state()
+
+    execution_adapter.update_status(execution_id, 'Success')
+    with patch.object(service.execution_adapter, 'get_summary') as mock_summary, \
+         patch.object(service.execution_adapter, 'get_recent_summaries') as mock_recent:
+        delta = service.record_status(execution_id, 'Success')
+
+    mock_summary.assert_not_called()
+    mock_recent.assert_not_called()
+    assert delta['execution']['status'] == 'Success'
+    assert delta['execution']['end_time'] is not None
+    assert delta['counts'] == {'date': datetime.now().date().isoformat(),
+                               'changes': {'Running': -1, 'Success': 1}}
+
+    state = service.get_state()
+    assert state['counts']['Running'] == 0
+    assert state['counts']['Success'] == 1
+
+def test_record_status_adds_new_execution(setup):
+    """Test that a new execution is added to the top of the recent list"""
+    service = DashboardService(limit=2)
+    first = _create_execution(setup)
+    second = _create_execution(setup)
+    service.get_state()
+
+    new_id = _create_execution(setup)
+    delta = service.record_status(new_id, 'Pending')
+
+    assert delta['execution']['id'] == new_id
+    assert delta['counts']['changes'] == {'Pending': 1}
+    assert [execution['id'] for execution in service.get_state()['executions']] == [new_id, second]
+
+def test_record_status_unknown_execution(setup):
+    """Test that transitions of missing executions produce no delta"""
+    assert DashboardService().record_status(9999, 'Running') is None
+
+def test_record_status_of_previous_day(setup):
+    """Test that executions started on another day do not change today's counts"""
+    yesterday = (datetime.now() - timedelta(days=1)).isoformat()
+    execution_id = _create_execution(setup, status='Running', start_time=yesterday)
+    service = DashboardService()
+
+    delta = service.record_status(execution_id, 'Failed')
+
+    assert delta['counts'] == {'date': yesterday[:10], 'changes': {'Running': -1, 'Failed': 1}}
+    assert 'Failed' not in service.get_state()['counts']
+
+def test_state_is_reloaded_after_max_age(setup):
+    """Test that the state is reloaded to pick up other workers' changes"""
+    service = DashboardService(max_age=60)
+    service.get_state()
+    _create_execution(setup, status='Success')
+
+    assert service.get_state()['executions'] == []
+
+    service._loaded_at -= 61
+    assert len(service.get_state()['executions']) == 1
+
+def test_dashboard_state_endpoint(auth_client):
+    """Test the dashboard state API"""
+    state = {'executions': [{'id': 1, 'status': 'Running'}], 'counts': {'date': '2024-01-01', 'Running': 1}}
+
+    with patch('app.routes.execution_api.dashboard_service') as mock_dashboard:
+        mock_dashboard.get_state.return_value = state
+        response = auth_client.get('/api/dashboard_state')
+
+    assert response.status_code == 200
+    assert response.json == {'success': True, **state}
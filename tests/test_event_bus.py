@@ -0,0 +1,80 @@
+import pytest
+from unittest.mock import patch
+from app.services.event_bus import EventBus
+from app.utils.socketio_manager import EventBusManager
+
+def test_publish_reaches_room_subscribers_only():
+    """Test that events are delivered to subscribers of their rooms"""
+    bus = EventBus()
+    subscription = bus.subscribe(['execution:1'])
+    other = bus.subscribe(['execution:2'])
+
+    seq = bus.publish('script_output', {'output': 'one'}, ['dashboard', 'execution:1'])
+
+    assert subscription.get(timeout=0) == (seq, 'script_output', {'output': 'one'})
+    assert other.get(timeout=0) is None
+
+def test_publish_without_room_reaches_everyone():
+    """Test that broadcast events are delivered to all subscribers"""
+    bus = EventBus()
+    subscription = bus.subscribe(['execution:1'])
+
+    bus.publish('announcement', {})
+
+    assert subscription.get(timeout=0)[1] == 'announcement'
+
+def test_unsubscribe():
+    """Test that unsubscribed subscriptions receive nothing"""
+    bus = EventBus()
+    subscription = bus.subscribe(['dashboard'])
+    bus.unsubscribe(subscription)
+
+    bus.publish('script_status_update', {}, 'dashboard')
+
+    assert subscription.get(timeout=0) is None
+
+def test_full_subscription_is_flagged():
+    """Test that a subscriber that falls behind is flagged instead of growing"""
+    bus = EventBus()
+    subscription = bus.subscribe(['dashboard'], max_events=2)
+
+    for i in range(3):
+        bus.publish('script_status_update', {'i': i}, 'dashboard')
+
+    assert subscription.overflowed is True
+    assert [subscription.get(timeout=0)[2]['i'] for _ in range(2)] == [0, 1]
+
+def test_history_since():
+    """Test replaying retained history of a room"""
+    bus = EventBus(history_rooms=['dashboard'], history_size=2)
+    first = bus.publish('a', {}, 'dashboard')
+    bus.publish('output', {}, 'execution:1')
+    bus.publish('b', {}, 'dashboard')
+
+    assert [item[1] for item in bus.history_since('dashboard', first)] == ['b']
+    assert bus.history_since('execution:1', 0) == []
+    assert bus.history_since('dashboard', bus.seq + 1) is None
+
+    # The oldest event is no longer retained
+    bus.publish('c', {}, 'dashboard')
+    assert bus.history_since('dashboard', 0) is None
+    assert [item[1] for item in bus.history_since('dashboard', first)] == ['b', 'c']
+
+def test_event_ids_are_process_specific():
+    """Test that event IDs from another bus are not accepted"""
+    bus = EventBus()
+
+    assert bus.parse_event_id(bus.event_id(7)) == 7
+    assert bus.parse_event_id(EventBus().event_id(7)) is None
+    assert bus.parse_event_id('garbage') is None
+    assert bus.parse_event_id(None) is None
+
+def test_manager_publishes_delivered_events():
+    """Test that events delivered by the Socket.IO manager reach the event bus"""
+    bus = EventBus()
+    subscription = bus.subscribe(['execution:3'])
+
+    with patch('app.utils.socketio_manager.event_bus', bus):
+        EventBusManager().emit('script_output', {'output': 'hi'}, '/', to='execution:3')
+
+    assert subscription.get(timeout=0)[1:] == ('script_output', {'output': 'hi'})
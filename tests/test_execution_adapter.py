@@ -230,6 +230,18 @@ def test_get_stats(app):
             assert today_stats['Success'] >= 3
             assert today_stats['Failed'] >= 2
 
+def test_count_history_from_rollup(app):
+    """Test that only filters the rollup covers are counted from it"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        aws_profile = create_aws_profile()
+        execution_adapter.create(script.id, aws_profile.id, user.id)
+        
+        assert execution_adapter.count_history_from_rollup({'script_id': script.id, 'user_id': ''}) == 1
+        assert execution_adapter.count_history_from_rollup({'user_id': user.id}) is None
+        assert execution_adapter.count_history({'user_id': user.id}) == 1
+
 def test_create(app):
     """Test create method"""
     with app.app_context():
@@ -260,7 +272,7 @@ def test_create(app):
         
         # Test create method with all parameters
         parameters = {'param1': 'value1', 'param2': 'value2'}
-        custom_start_time = datetime.now().isoformat()
+        custom_start_time = datetime.now().replace(microsecond=0).isoformat()
         
         execution_id = execution_adapter.create(
             script_id=script.id,
@@ -300,7 +312,7 @@ def test_update_status(app):
         
         # Test update_status without output
         result = execution_adapter.update_status(execution_id, "Completed")
-        assert result is True
+        assert result == "Running"
         
         # Verify status was updated
         updated_execution = ExecutionORM.get_by_id(execution_id)
@@ -312,7 +324,7 @@ def test_update_status(app):
             "Failed", 
             output="Error occurred during execution"
         )
-        assert result is True
+        assert result == "Completed"
         
         # Verify status and output were updated
         updated_execution = ExecutionORM.get_by_id(execution_id)
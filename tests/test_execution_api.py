@@ -2,7 +2,7 @@ import pytest
 import json
 from unittest.mock import patch, MagicMock
 from app.services.execution_service import execution_service
-from tests.utils import create_user, create_script
+from tests.utils import create_user, create_script, create_aws_profile
 
 def test_get_recent_executions(app, auth_client):
     """Test get_recent_executions endpoint"""
@@ -245,6 +245,32 @@ def test_get_execution_history_with_filters(app, auth_client):
             }
             mock_get_history.assert_called_once_with(2, filters=expected_filters)
 
+def test_get_execution_history_before_id(app, auth_client):
+    """Test get_execution_history endpoint with a cursor"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        aws_profile = create_aws_profile()
+        ids = [execution_service.execution_adapter.create(script.id, aws_profile.id, user.id)
+               for _ in range(5)]
+
+        with patch.object(execution_service.setting_adapter, 'get', return_value='2'):
+            first = auth_client.get('/api/execution_history').json
+            second = auth_client.get(f"/api/execution_history?before_id={first['next_before_id']}").json
+            last = auth_client.get(f"/api/execution_history?before_id={second['next_before_id']}").json
+
+        assert [e['id'] for e in first['executions']] == ids[:-3:-1]
+        assert first['has_more'] is True
+        assert first['total_count'] == 5
+
+        assert [e['id'] for e in second['executions']] == [ids[2], ids[1]]
+        assert second['has_more'] is True
+        assert second['total_count'] == 5
+
+        assert [e['id'] for e in last['executions']] == [ids[0]]
+        assert last['has_more'] is False
+        assert last['next_before_id'] is None
+
 def test_get_execution_stats(app, auth_client):
     """Test get_execution_stats endpoint"""
     with app.app_context():
@@ -433,4 +459,127 @@ def test_provide_input_not_found(app, auth_client):
             assert response.status_code == 400
             data = response.json
             assert data['success'] is False
-            assert 'execution not found' in data['message'].lower() or 'not waiting for input' in data['message'].lower()
\ No newline at end of file
+            assert 'execution not found' in data['message'].lower() or 'not waiting for input' in data['message'].lower()
+def _read_events(response, count):
+    """Read a number of Server-Sent Events from a streaming response"""
+    events = []
+    chunks = iter(response.response)
+    while len(events) < count:
+        chunk = next(chunks)
+        chunk = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if chunk.startswith(':'):
+            events.append({'comment': chunk.strip()})
+            continue
+
+        event = {}
+        for line in chunk.strip().split('\n'):
+            field, _, value = line.partition(': ')
+            event[field] = json.loads(value) if field == 'data' else value
+        events.append(event)
+    return events
+
+def test_stream_execution_finished(app, auth_client):
+    """Test that the stream of a finished execution sends its output and ends"""
+    with patch.object(execution_service, 'get_execution_status', return_value='Success'), \
+         patch.object(execution_service, 'get_output_since', return_value={
+             'execution_id': 1, 'seq': None, 'offset': 2, 'next_offset': 5,
+             'skipped': 0, 'output': 'llo', 'replay': True}) as mock_get_output:
+        response = auth_client.get('/api/executions/1/stream', headers={'Last-Event-ID': '2'}, buffered=False)
+
+        assert response.status_code == 200
+        assert response.mimetype == 'text/event-stream'
+
+        events = _read_events(response, 4)
+        response.close()
+
+    mock_get_output.assert_called_once_with(1, 2)
+    assert events[0] == {'retry': '3000'}
+    assert events[1]['event'] == 'script_output'
+    assert events[1]['id'] == '5'
+    assert events[1]['data']['output'] == 'llo'
+    assert events[2]['event'] == 'script_status_update'
+    assert events[2]['data']['status'] == 'Success'
+    assert events[3]['event'] == 'end'
+
+def test_stream_execution_live_output(app, auth_client):
+    """Test that live frames are streamed without duplicating replayed output"""
+    from app.services.event_bus import event_bus
+    app.config['SSE_HEARTBEAT_SECONDS'] = 0.01
+
+    replay = {'execution_id': 1, 'seq': 1, 'offset': 0, 'next_offset': 3,
+              'skipped': 0, 'output': 'abc', 'replay': True}
+
+    with patch.object(execution_service, 'get_execution_status', return_value='Running'), \
+         patch.object(execution_service, 'get_output_since', return_value=replay):
+        response = auth_client.get('/api/executions/1/stream', buffered=False)
+        events = _read_events(response, 3)
+
+        # Overlaps the replayed output by one character
+        event_bus.publish('script_output', {'execution_id': 1, 'seq': 2, 'offset': 2, 'next_offset': 5,
+                                            'skipped': 0, 'output': 'cde'}, 'execution:1')
+        # Already sent
+        event_bus.publish('script_output', {'execution_id': 1, 'seq': 1, 'offset': 0, 'next_offset': 3,
+                                            'skipped': 0, 'output': 'abc'}, 'execution:1')
+        events += _read_events(response, 2)
+        response.close()
+
+    assert [event.get('event') for event in events[1:3]] == ['script_output', 'script_status_update']
+    assert events[3]['data']['output'] == 'de'
+    assert events[3]['data']['offset'] == 3
+    assert events[3]['id'] == '5'
+    assert events[4] == {'comment': ': heartbeat'}
+
+def test_stream_execution_not_found(auth_client):
+    """Test streaming an execution that does not exist"""
+    with patch.object(execution_service, 'get_execution_status', return_value=None):
+        response = auth_client.get('/api/executions/999/stream')
+
+    assert response.status_code == 404
+
+def test_stream_execution_requires_login(client):
+    """Test that streams require an authenticated session"""
+    assert client.get('/api/executions/1/stream').status_code == 401
+    assert client.get('/api/executions/stream').status_code == 401
+
+def test_stream_executions_resumes_from_last_event_id(app, auth_client):
+    """Test that the status stream replays events after Last-Event-ID"""
+    from app.services.event_bus import event_bus
+
+    first = event_bus.publish('script_status_update', {'execution_id': 1, 'status': 'Running'}, 'dashboard')
+    event_bus.publish('script_status_update', {'execution_id': 1, 'status': 'Success'}, 'dashboard')
+
+    response = auth_client.get('/api/executions/stream', headers={'Last-Event-ID': event_bus.event_id(first)},
+                               buffered=False)
+    events = _read_events(response, 2)
+    response.close()
+
+    assert events[1]['event'] == 'script_status_update'
+    assert events[1]['data'] == {'execution_id': 1, 'status': 'Success'}
+    assert events[1]['id'] == event_bus.event_id(first + 1)
+
+def test_stream_executions_unknown_event_id_resyncs(auth_client):
+    """Test that an event ID from another process asks the client to reload"""
+    response = auth_client.get('/api/executions/stream', headers={'Last-Event-ID': 'other-5'}, buffered=False)
+    events = _read_events(response, 2)
+    response.close()
+
+    assert events[1]['event'] == 'resync'
+
+def test_get_execution_output_range(auth_client):
+    """Test fetching a range of execution output"""
+    frame = {'execution_id': 1, 'seq': None, 'offset': 2, 'next_offset': 4,
+             'skipped': 0, 'output': 'cd', 'replay': True}
+
+    with patch.object(execution_service, 'get_output_since', return_value=frame) as mock_get_output:
+        response = auth_client.get('/api/execution_output/1?offset=2&end=4')
+
+    mock_get_output.assert_called_once_with(1, 2, 4)
+    assert response.status_code == 200
+    assert response.json['frame'] == frame
+
+def test_get_execution_output_not_found(auth_client):
+    """Test fetching output of a missing execution"""
+    with patch.object(execution_service, 'get_output_since', return_value=None):
+        response = auth_client.get('/api/execution_output/999')
+
+    assert response.status_code == 404
@@ -345,8 +345,9 @@ def test_to_dict(app):
         aws_profile = create_aws_profile(user_id=user.id)
         
         # Create an execution with all fields
-        start_time = datetime.now().isoformat()
-        end_time = datetime.now().isoformat()
+        # Timestamps are stored with millisecond precision
+        start_time = datetime.now().replace(microsecond=0).isoformat()
+        end_time = datetime.now().replace(microsecond=0).isoformat()
         
         execution = ExecutionORM(
             script_id=script.id,
@@ -415,4 +416,44 @@ def test_parse_parameters(app):
         
         # Test with invalid JSON
         execution.parameters = 'invalid json'
-        assert execution.parse_parameters() == {}
\ No newline at end of file
+        assert execution.parse_parameters() == {}
+def test_timestamps_stored_as_epoch_milliseconds(app):
+    """Test that timestamps are stored as integers and derived columns are kept in sync"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        aws_profile = create_aws_profile()
+
+        execution = ExecutionORM(
+            script_id=script.id,
+            aws_profile_id=aws_profile.id,
+            user_id=user.id,
+            start_time='2024-05-06T23:59:58.500'
+        )
+        execution.save()
+
+        assert execution.start_date == '2024-05-06'
+        assert execution.duration_ms is None
+
+        execution.end_time = datetime(2024, 5, 7, 0, 0, 1)
+        db.session.commit()
+
+        stored = db.session.execute(
+            db.text("SELECT start_time, end_time FROM execution_history WHERE id = :id"),
+            {'id': execution.id}
+        ).one()
+        assert stored.end_time - stored.start_time == 2500
+
+        db.session.expire_all()
+        execution = ExecutionORM.get_by_id(execution.id)
+        assert execution.start_time == '2024-05-06T23:59:58.500000'
+        assert execution.end_time == '2024-05-07T00:00:01'
+
+        execution_dict = execution.to_dict()
+        assert execution_dict['duration_ms'] == 2500
+        assert execution_dict['start_time_ms'] == stored.start_time
+        assert execution_dict['end_time_ms'] == stored.end_time
+
+        # ISO strings in filters are compared as epoch milliseconds
+        assert ExecutionORM.query.filter(ExecutionORM.start_time < '2024-05-07').count() == 1
+        assert ExecutionORM.query.filter(ExecutionORM.start_time >= '2024-05-07').count() == 0
@@ -2,12 +2,17 @@ import pytest
 import json
 import os
 import tempfile
+import time
 from unittest.mock import patch, MagicMock
 from datetime import datetime, timedelta
+from sqlalchemy import event
 from app.services.execution_service import execution_service
+from app.services.output_stream import OutputBatcher, register_batcher, unregister_batcher
 from app.models.execution_orm import ExecutionORM
+from app.models.execution_timing_orm import ExecutionTimingORM
 from app.models.script_orm import ScriptORM
 from app.models.aws_profile_orm import AWSProfileORM
+from app.utils.db import db
 from tests.utils import create_user, create_script, create_aws_profile
 
 @pytest.fixture
@@ -362,7 +367,7 @@ def test_cancel_execution(mock_running_processes, mock_psutil, app):
     running_processes_dict = {}
     
     # Set up execution adapter mock
-    with patch('app.services.execution_adapter.ExecutionAdapter.update_status') as mock_update_status, \
+    with patch('app.services.execution_adapter.ExecutionAdapter.cancel', return_value=True) as mock_cancel, \
          patch('app.services.execution_adapter.ExecutionAdapter.append_output') as mock_append_output, \
          patch('app.services.execution_adapter.ExecutionAdapter.get_by_id_with_details') as mock_get_details:
         
@@ -403,9 +408,8 @@ def test_cancel_execution(mock_running_processes, mock_psutil, app):
                 result = execution_service.cancel_execution(execution_id)
                 
                 # Verify cancellation was attempted
-                mock_update_status.assert_called_with(
-                    execution_id=execution_id,
-                    status="Cancelled",
+                mock_cancel.assert_called_with(
+                    execution_id,
                     output="\n[SYSTEM] Cancellation requested by user - terminating process..."
                 )
                 
@@ -421,6 +425,36 @@ def test_cancel_execution(mock_running_processes, mock_psutil, app):
                 # Don't check if removed from dictionary since the actual implementation
                 # uses del which won't work on our mock dictionary in the test
 
+def test_cancel_message_is_saved_in_stream_order(app):
+    """Test that the cancel message of a streaming execution is saved after its buffered output"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        aws_profile = create_aws_profile()
+        execution_id = execution_service.execution_adapter.create(
+            script.id, aws_profile.id, user.id, status='Running', start_time=datetime.now().isoformat())
+        
+        frames = []
+        batcher = OutputBatcher(execution_id, frames.append, flush_interval=60)
+        register_batcher(batcher)
+        try:
+            # Output the running thread has streamed but not saved yet
+            batcher.write("line 1\n", persist=True)
+            
+            assert execution_service.cancel_execution(execution_id) is True
+            assert execution_service.execution_adapter.get_by_id(execution_id).output is None
+            
+            # The running thread saves its remaining output when the process exits
+            execution_service._save_output(execution_id, batcher, close=True)
+        finally:
+            unregister_batcher(execution_id)
+        
+        execution = execution_service.execution_adapter.get_by_id(execution_id)
+        assert execution.status == 'Cancelled'
+        assert execution.output == "line 1\n\n[SYSTEM] Cancellation requested by user - terminating process..."
+        assert ''.join(frame['output'] for frame in frames) == execution.output
+        assert frames[-1]['next_offset'] == len(execution.output)
+
 def test_cancel_execution_not_running(app):
     """Test cancelling a non-running execution"""
     with app.app_context():
@@ -502,4 +536,170 @@ def test_check_hung_executions(mock_update_status, mock_datetime, app):
             )
             
             # Check the normal execution is not updated
-            assert mock_update_status.call_count == 1
\ No newline at end of file
+            assert mock_update_status.call_count == 1
+def test_history_count_cached_for_user_filter(app):
+    """Test that totals needing a scan are cached until a new execution is created"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        aws_profile = create_aws_profile()
+        adapter = execution_service.execution_adapter
+        execution_service._history_counts.clear()
+
+        adapter.create(script.id, aws_profile.id, user.id)
+        filters = {'user_id': user.id}
+
+        with patch.object(adapter, 'count_history', wraps=adapter.count_history) as mock_count:
+            assert execution_service.count_execution_history(filters) == 1
+            assert execution_service.count_execution_history(filters) == 1
+            assert mock_count.call_count == 1
+
+            # A new execution invalidates the cached count
+            adapter.create(script.id, aws_profile.id, user.id)
+            assert execution_service.count_execution_history(filters) == 2
+            assert mock_count.call_count == 2
+
+        # Counts the rollup can answer are not cached
+        with patch.object(adapter, 'count_history_from_rollup',
+                          wraps=adapter.count_history_from_rollup) as mock_rollup:
+            assert execution_service.count_execution_history({'script_id': script.id}) == 2
+            assert execution_service.count_execution_history({'script_id': script.id}) == 2
+            assert mock_rollup.call_count == 2
+            assert all(key[0] != (('script_id', script.id),) for key in execution_service._history_counts)
+
+def test_get_execution_history_keyset_matches_pages(app):
+    """Test that following cursors returns the same executions as page numbers"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        aws_profile = create_aws_profile()
+        for _ in range(7):
+            execution_service.execution_adapter.create(script.id, aws_profile.id, user.id)
+
+        paged = []
+        for page in range(1, 4):
+            paged += [e['id'] for e in execution_service.get_execution_history(page=page, per_page=3)['executions']]
+
+        keyset = []
+        result = execution_service.get_execution_history(page=1, per_page=3)
+        keyset += [e['id'] for e in result['executions']]
+        while result['next_before_id']:
+            result = execution_service.get_execution_history(per_page=3, before_id=result['next_before_id'])
+            keyset += [e['id'] for e in result['executions']]
+
+        assert keyset == paged
+        assert len(keyset) == 7
+
+def test_scheduled_run_records_timings(app):
+    """Test that a scheduled run records its lags from the planned fire time"""
+    script_file = tempfile.NamedTemporaryFile(suffix='.py', delete=False, mode='w')
+    script_file.write("print('hello')\n")
+    script_file.close()
+    
+    try:
+        user = create_user()
+        script = create_script(path=script_file.name, user_id=user.id)
+        aws_profile = create_aws_profile()
+        execution_id = execution_service.execution_adapter.create(script.id, aws_profile.id, user.id, is_scheduled=1)
+        
+        planned = datetime.now() - timedelta(seconds=2)
+        timing = {'planned_at': planned, 'dispatched_at': planned + timedelta(seconds=1)}
+        with patch('app.services.execution_service.socketio', MagicMock()):
+            execution_service._run_script_thread(
+                execution_id, script_file.name, dict(os.environ), [], None,
+                is_scheduled=1, job_id=f'daily_{script.id}_7', timing=timing
+            )
+        
+        timings = db.session.get(ExecutionTimingORM, execution_id)
+        assert timings.schedule_id == 7
+        assert timings.dispatch_lag_ms == 1000
+        assert 2000 <= timings.start_lag_ms <= timings.first_output_lag_ms
+    finally:
+        os.unlink(script_file.name)
+
+def test_enqueue_scheduled_run_does_no_database_work(app):
+    """Test that queueing scheduled runs is fast and leaves the database alone"""
+    statements = []
+    
+    def count_statement(*args):
+        statements.append(args)
+    
+    event.listen(db.engine, 'before_cursor_execute', count_statement)
+    try:
+        with patch.object(execution_service, '_start_dispatcher'):
+            started = time.monotonic()
+            for i in range(1000):
+                execution_service.enqueue_scheduled_run(1, 1, 1, job_id=f'daily_1_{i}')
+            elapsed = time.monotonic() - started
+    finally:
+        event.remove(db.engine, 'before_cursor_execute', count_statement)
+        runs = []
+        while not execution_service._scheduled_runs.empty():
+            runs.append(execution_service._scheduled_runs.get_nowait())
+    
+    assert statements == []
+    assert elapsed < 1
+    assert len(runs) == 1000
+    assert runs[0]['job_id'] == 'daily_1_0'
+
+@patch('threading.Thread')
+def test_failed_batch_is_retried_run_by_run(mock_thread, app):
+    """Test that a batch that cannot be committed does not lose its other runs"""
+    user = create_user()
+    script = create_script(user_id=user.id)
+    aws_profile = create_aws_profile()
+    planned = datetime.now()
+    runs = [
+        {'script_id': script.id, 'profile_id': aws_profile.id, 'user_id': user.id, 'parameters': None,
+         'job_id': f'daily_{script.id}_{i}', 'scheduled_at': planned, 'dispatched_at': planned}
+        for i in range(3)
+    ]
+    run_batch = execution_service.run_scheduled_batch
+    
+    def fail_with_second_run(batch):
+        if runs[1] in batch:
+            raise Exception('database is locked')
+        return run_batch(batch)
+    
+    with patch.object(execution_service, 'app', app), \
+         patch.object(execution_service, 'run_scheduled_batch', side_effect=fail_with_second_run):
+        execution_ids = execution_service._dispatch_batch(runs)
+    
+    assert len(execution_ids) == 2
+    assert mock_thread.return_value.start.call_count == 2
+    
+    # The run that could not be started is recorded rather than dropped
+    failed = ExecutionORM.query.filter_by(schedule_id=1).one()
+    assert failed.status == 'Failed'
+    assert 'database is locked' in failed.output
+    assert {execution.schedule_id for execution in ExecutionORM.query.filter_by(status='Pending')} == {0, 2}
+
+@patch('threading.Thread')
+def test_run_scheduled_batch(mock_thread, app):
+    """Test that a batch of scheduled runs is started with one commit"""
+    user = create_user()
+    script = create_script(user_id=user.id)
+    aws_profile = create_aws_profile()
+    planned = datetime.now()
+    
+    runs = [
+        {'script_id': script.id, 'profile_id': aws_profile.id, 'user_id': user.id, 'parameters': {'param1': str(i)},
+         'job_id': f'daily_{script.id}_{i}', 'scheduled_at': planned, 'dispatched_at': planned}
+        for i in range(3)
+    ]
+    # Runs of deleted scripts are skipped
+    runs.append(dict(runs[0], script_id=9999, job_id='daily_9999_9'))
+    
+    with patch.object(db.session, 'commit', wraps=db.session.commit) as mock_commit:
+        execution_ids = execution_service.run_scheduled_batch(runs)
+    
+    assert mock_commit.call_count == 1
+    assert len(execution_ids) == 3
+    executions = [db.session.get(ExecutionORM, execution_id) for execution_id in execution_ids]
+    assert [execution.parameters for execution in executions] == [json.dumps({'param1': str(i)}) for i in range(3)]
+    assert all(execution.is_scheduled == 1 and execution.status == 'Pending' for execution in executions)
+    
+    assert mock_thread.return_value.start.call_count == 3
+    thread_args = mock_thread.call_args.kwargs['args']
+    assert thread_args[6] == f'daily_{script.id}_2'
+    assert thread_args[7] == {'planned_at': planned, 'dispatched_at': planned}
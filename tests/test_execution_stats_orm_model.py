@@ -0,0 +1,137 @@
+import pytest
+from datetime import date, datetime, timedelta
+from app.models.execution_orm import ExecutionORM
+from app.models.execution_stats_orm import ExecutionDailyStatsORM
+from app.utils.db import db
+from tests.utils import create_user, create_script, create_aws_profile
+
+def _rollup():
+    """Get the non-empty rollup rows as comparable tuples"""
+    rows = ExecutionDailyStatsORM.query.filter(ExecutionDailyStatsORM.count != 0).all()
+    return sorted((row.date, row.script_id, row.status, row.count, row.total_duration, row.failures)
+                  for row in rows)
+
+def _create_execution(script, aws_profile, user, status='Pending', start_time=None):
+    """Create and save an execution"""
+    execution = ExecutionORM(
+        script_id=script.id,
+        aws_profile_id=aws_profile.id,
+        user_id=user.id,
+        status=status,
+        start_time=start_time or datetime.now().isoformat()
+    )
+    execution.save()
+    return execution
+
+def test_transitions_update_rollup(app):
+    """Test that each status transition moves the execution between rollup rows"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        aws_profile = create_aws_profile()
+        today = date.today().isoformat()
+
+        execution = _create_execution(script, aws_profile, user)
+        assert _rollup() == [(today, script.id, 'Pending', 1, 0, 0)]
+
+        execution.update_status('Running')
+        assert _rollup() == [(today, script.id, 'Running', 1, 0, 0)]
+
+        execution.update_status('Failed')
+        assert _rollup() == [(today, script.id, 'Failed', 1, execution.duration_ms, 1)]
+
+        other = _create_execution(script, aws_profile, user, status='Running')
+        assert other.cancel() is True
+
+        rows = _rollup()
+        assert (today, script.id, 'Cancelled', 1, other.duration_ms, 0) in rows
+        assert len(rows) == 2
+
+def test_rebuild_matches_incremental_rollup(app):
+    """Test that rebuilding from history gives the incrementally maintained rollup"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        aws_profile = create_aws_profile()
+        yesterday = (datetime.now() - timedelta(days=1)).isoformat()
+
+        for status in ['Success', 'Failed', 'Failed']:
+            execution = _create_execution(script, aws_profile, user, status='Running', start_time=yesterday)
+            execution.update_status(status)
+        _create_execution(script, aws_profile, user)
+
+        incremental = _rollup()
+
+        db.session.execute(db.text("UPDATE execution_daily_stats SET count = 99"))
+        db.session.commit()
+
+        assert ExecutionDailyStatsORM.rebuild() == 3
+        assert _rollup() == incremental
+
+def test_deleting_script_moves_rollup_rows(app):
+    """Test that the counts of a deleted script's executions move to script 0 with them"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        other = create_script(name='other_script', user_id=user.id)
+        aws_profile = create_aws_profile()
+        yesterday = (datetime.now() - timedelta(days=1)).isoformat()
+
+        for status in ['Success', 'Failed']:
+            execution = _create_execution(script, aws_profile, user, status='Running', start_time=yesterday)
+            execution.update_status(status)
+        _create_execution(other, aws_profile, user, status='Success', start_time=yesterday)
+        orphan = ExecutionORM(aws_profile_id=aws_profile.id, user_id=user.id,
+                              status='Success', start_time=yesterday)
+        orphan.save()
+
+        assert script.delete() is True
+
+        rows = _rollup()
+        assert [row[1:4] for row in rows] == [(0, 'Failed', 1), (0, 'Success', 2), (other.id, 'Success', 1)]
+
+        ExecutionDailyStatsORM.rebuild()
+        assert _rollup() == rows
+
+def test_get_stats_reads_rollup(app):
+    """Test that chart data comes from the rollup and respects the day range"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        aws_profile = create_aws_profile()
+        today = date.today()
+
+        for days_ago, status in [(0, 'Success'), (0, 'Failed'), (2, 'Success'), (30, 'Success')]:
+            start_time = (datetime.now() - timedelta(days=days_ago)).isoformat()
+            execution = _create_execution(script, aws_profile, user, status='Running', start_time=start_time)
+            execution.update_status(status)
+
+        stats = ExecutionORM.get_stats(days=7)
+
+        assert [entry['date'] for entry in stats] == [
+            (today - timedelta(days=2)).isoformat(), today.isoformat()
+        ]
+        assert stats[-1] == {'date': today.isoformat(), 'Success': 1, 'Failed': 1, 'Running': 0, 'Cancelled': 0}
+
+        # Executions that are no longer running do not leave empty entries
+        assert len(ExecutionORM.get_stats(days=365)) == 3
+
+def test_rebuild_stats_command(app):
+    """Test the rebuild-stats CLI command"""
+    from app import register_commands
+
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        aws_profile = create_aws_profile()
+        _create_execution(script, aws_profile, user)
+        ExecutionDailyStatsORM.query.delete()
+        db.session.commit()
+
+    register_commands(app)
+    result = app.test_cli_runner().invoke(args=['rebuild-stats'])
+
+    assert result.exit_code == 0
+    assert 'Rebuilt execution daily stats: 1 rows' in result.output
+    with app.app_context():
+        assert [row[2:4] for row in _rollup()] == [('Pending', 1)]
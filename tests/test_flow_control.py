@@ -0,0 +1,142 @@
+import pytest
+import socketio as socketio_lib
+from unittest.mock import patch
+from app.utils.socketio_manager import EventBusManager
+
+@pytest.fixture
+def server():
+    """Create a Socket.IO server whose packets are captured instead of sent"""
+    manager = EventBusManager()
+    manager.max_queue_bytes = 10
+    server = socketio_lib.Server(async_mode='threading', client_manager=manager)
+    server.sent = []
+
+    def send_packet(eio_sid, pkt):
+        server.sent.append((eio_sid, pkt.data, pkt.id))
+
+    def send_eio_packet(eio_sid, eio_pkt):
+        pkt = socketio_lib.packet.Packet(encoded_packet=eio_pkt.data)
+        server.sent.append((eio_sid, pkt.data, pkt.id))
+
+    with patch.object(server, '_send_packet', side_effect=send_packet), \
+         patch.object(server, '_send_eio_packet', side_effect=send_eio_packet):
+        yield server
+
+def _connect(server, eio_sid, room='execution:1'):
+    sid = server.manager.connect(eio_sid, '/')
+    server.manager.enter_room(sid, '/', room)
+    return sid
+
+def _frame(offset, text, execution_id=1):
+    return {'execution_id': execution_id, 'offset': offset,
+            'next_offset': offset + len(text), 'skipped': 0, 'output': text}
+
+def _ack_all(server, sid, eio_sid):
+    """Acknowledge every output frame sent to a client so far"""
+    for sent_sid, _, ack_id in list(server.sent):
+        if sent_sid == eio_sid and ack_id is not None and ack_id in server.manager.callbacks.get(sid, {}):
+            server.manager.trigger_callback(sid, ack_id, [])
+
+def _received(server, eio_sid):
+    return [(data[0], data[1]) for sent_sid, data, _ in server.sent if sent_sid == eio_sid]
+
+def test_frames_request_acknowledgement(server):
+    """Test that output frames are sent per client and tracked until acknowledged"""
+    sid = _connect(server, 'client')
+
+    server.manager.emit('script_output', _frame(0, 'abcd'), '/', to='execution:1')
+
+    assert _received(server, 'client') == [('script_output', _frame(0, 'abcd'))]
+    assert server.sent[0][2] is not None
+
+    metrics = server.manager.get_client_metrics()
+    assert metrics[0]['pending_bytes'] == 4
+    assert metrics[0]['pending_frames'] == 1
+
+    _ack_all(server, sid, 'client')
+    assert server.manager.get_client_metrics()[0]['pending_bytes'] == 0
+
+def test_slow_client_skips_output_without_affecting_others(server):
+    """Test that a client over its queue cap enters gap mode while others receive everything"""
+    slow_sid = _connect(server, 'slow')
+    fast_sid = _connect(server, 'fast')
+
+    offset = 0
+    for text in ['aaaa', 'bbbb', 'cccc', 'dddd']:
+        server.manager.emit('script_output', _frame(offset, text), '/', to='execution:1')
+        offset += len(text)
+        _ack_all(server, fast_sid, 'fast')
+
+    assert [data['output'] for _, data in _received(server, 'fast')] == ['aaaa', 'bbbb', 'cccc', 'dddd']
+    assert [data['output'] for _, data in _received(server, 'slow')] == ['aaaa', 'bbbb']
+
+    slow = next(item for item in server.manager.get_client_metrics() if item['sid'] == slow_sid)
+    assert slow['pending_bytes'] == 8
+    assert slow['dropped_bytes'] == 8
+    assert slow['dropped_frames'] == 2
+    assert slow['gap_count'] == 1
+    assert slow['gap_executions'] == [1]
+
+    # Once drained, the client is told which range to fetch over HTTP
+    _ack_all(server, slow_sid, 'slow')
+    assert _received(server, 'slow')[-1] == ('script_output_gap', {
+        'execution_id': 1, 'offset': 8, 'next_offset': 16
+    })
+
+    # Live output resumes from the latest offset
+    server.manager.emit('script_output', _frame(16, 'eeee'), '/', to='execution:1')
+    assert _received(server, 'slow')[-1] == ('script_output', _frame(16, 'eeee'))
+
+def test_gap_reported_when_next_frame_arrives(server):
+    """Test that a drained client gets the gap event before the next frame"""
+    sid = _connect(server, 'client')
+    server.manager.max_queue_bytes = 4
+
+    server.manager.emit('script_output', _frame(0, 'aaaa'), '/', to='execution:1')
+    server.manager.emit('script_output', _frame(4, 'bbbb'), '/', to='execution:1')
+
+    # Release the queue without triggering the acknowledgement handler
+    server.manager._clients[sid].pending_bytes = 0
+
+    server.manager.emit('script_output', _frame(8, 'cccc'), '/', to='execution:1')
+
+    assert _received(server, 'client')[-2:] == [
+        ('script_output_gap', {'execution_id': 1, 'offset': 4, 'next_offset': 8}),
+        ('script_output', _frame(8, 'cccc'))
+    ]
+
+def test_other_events_are_not_flow_controlled(server):
+    """Test that status events are delivered without acknowledgement tracking"""
+    _connect(server, 'client')
+
+    server.manager.emit('script_status_update', {'execution_id': 1, 'status': 'Running'}, '/', to='execution:1')
+
+    assert _received(server, 'client') == [('script_status_update', {'execution_id': 1, 'status': 'Running'})]
+    assert server.manager.get_client_metrics() == []
+
+def test_disconnect_forgets_client(server):
+    """Test that the send queue of a disconnected client is dropped"""
+    sid = _connect(server, 'client')
+    server.manager.emit('script_output', _frame(0, 'abcd'), '/', to='execution:1')
+
+    server.manager.disconnect(sid, '/')
+
+    assert server.manager.get_client_metrics() == []
+
+def test_socket_clients_endpoint_requires_admin(auth_client):
+    """Test that client metrics are only available to admins"""
+    with auth_client.session_transaction() as session:
+        session['is_admin'] = 0
+
+    assert auth_client.get('/api/socket_clients').status_code == 403
+
+def test_socket_clients_endpoint(auth_client):
+    """Test the client metrics endpoint"""
+    with auth_client.session_transaction() as session:
+        session['is_admin'] = 1
+
+    response = auth_client.get('/api/socket_clients')
+
+    assert response.status_code == 200
+    assert response.json['success'] is True
+    assert isinstance(response.json['clients'], list)
@@ -0,0 +1,247 @@
+import os
+import tempfile
+import pytest
+from unittest.mock import patch, MagicMock
+from app.services.output_stream import OutputBatcher, output_batchers, register_batcher, unregister_batcher
+from app.services.execution_service import execution_service
+from tests.utils import create_user, create_script, create_aws_profile
+
+def test_batcher_coalesces_writes_until_flush():
+    """Test that writes are merged into a single frame"""
+    frames = []
+    batcher = OutputBatcher(1, frames.append, flush_interval=60, flush_chars=1000)
+
+    batcher.write("line 1\n")
+    batcher.write("line 2\n")
+    assert frames == []
+
+    batcher.flush()
+
+    assert len(frames) == 1
+    assert frames[0] == {
+        'execution_id': 1,
+        'seq': 1,
+        'offset': 0,
+        'next_offset': 14,
+        'skipped': 0,
+        'output': "line 1\nline 2\n"
+    }
+
+def test_batcher_flushes_on_size():
+    """Test that reaching flush_chars sends a frame immediately"""
+    frames = []
+    batcher = OutputBatcher(1, frames.append, flush_interval=60, flush_chars=10)
+
+    batcher.write("12345")
+    assert frames == []
+
+    batcher.write("67890")
+    assert len(frames) == 1
+    assert frames[0]['output'] == "1234567890"
+
+def test_batcher_flushes_on_interval():
+    """Test that pending output is flushed once the interval has elapsed"""
+    frames = []
+    batcher = OutputBatcher(1, frames.append, flush_interval=0.5, flush_chars=1000)
+    batcher.write("hello")
+
+    batcher.flush_if_due(now=batcher._last_flush + 0.1)
+    assert frames == []
+
+    batcher.flush_if_due(now=batcher._last_flush + 0.6)
+    assert [frame['output'] for frame in frames] == ["hello"]
+
+def test_batcher_sequence_and_offsets_are_contiguous():
+    """Test that consecutive frames have increasing seq and contiguous offsets"""
+    frames = []
+    batcher = OutputBatcher(1, frames.append, flush_interval=60, flush_chars=1000, start_offset=100)
+
+    for text in ["abc", "defg", "h"]:
+        batcher.write(text)
+        batcher.flush()
+
+    assert [frame['seq'] for frame in frames] == [1, 2, 3]
+    assert [frame['offset'] for frame in frames] == [100, 103, 107]
+    assert frames[-1]['next_offset'] == 108
+
+def test_batcher_skips_backlog_beyond_max_frame():
+    """Test that a burst larger than max_frame_chars keeps only its tail"""
+    frames = []
+    batcher = OutputBatcher(1, frames.append, flush_interval=60, flush_chars=1000, max_frame_chars=4)
+
+    batcher.write("0123456789")
+    batcher.flush()
+
+    assert frames[0]['output'] == "6789"
+    assert frames[0]['offset'] == 6
+    assert frames[0]['skipped'] == 6
+    assert frames[0]['next_offset'] == 10
+    assert batcher.dropped_chars == 6
+
+def test_batcher_ignores_empty_flush():
+    """Test that flushing with nothing pending sends no frame"""
+    emit = MagicMock()
+    batcher = OutputBatcher(1, emit)
+
+    batcher.flush()
+    batcher.write("")
+    batcher.flush()
+
+    emit.assert_not_called()
+
+def test_persisted_output_is_kept_until_taken():
+    """Test that output written to persist is handed out once, in write order"""
+    frames = []
+    batcher = OutputBatcher(1, frames.append, flush_interval=60, flush_chars=1000)
+    batcher.write("a", persist=True)
+    batcher.write("b")
+    batcher.write("c", persist=True)
+
+    assert batcher.unsaved_size == 2
+    assert batcher.take_unsaved() == "ac"
+    assert batcher.take_unsaved(close=True) == ""
+
+    # Once closed, output to persist is refused and not streamed
+    assert batcher.write("d", persist=True) is False
+    assert batcher.write("e") is True
+    batcher.flush()
+    assert [frame['output'] for frame in frames] == ["abce"]
+
+def test_unregister_flushes_pending_output():
+    """Test that unregistering a batcher sends remaining output"""
+    frames = []
+    batcher = OutputBatcher(99, frames.append, flush_interval=60, flush_chars=1000)
+    register_batcher(batcher)
+    batcher.write("tail")
+
+    assert unregister_batcher(99) is batcher
+    assert 99 not in output_batchers
+    assert [frame['output'] for frame in frames] == ["tail"]
+
+def test_run_script_streams_frames_matching_stored_output(app):
+    """Test that streamed frames reassemble into the stored execution output"""
+    script_file = tempfile.NamedTemporaryFile(suffix='.py', delete=False, mode='w')
+    script_file.write("for i in range(500):\n    print('line', i)\n")
+    script_file.close()
+
+    try:
+        with app.app_context():
+            user = create_user()
+            script = create_script(path=script_file.name, user_id=user.id)
+            profile = create_aws_profile()
+            execution_id = execution_service.execution_adapter.create(script.id, profile.id, user.id)
+
+            mock_socketio = MagicMock()
+            with patch('app.services.execution_service.socketio', mock_socketio):
+                execution_service._run_script_thread(
+                    execution_id, script_file.name, dict(os.environ), [], None
+                )
+
+            frames = [call.args[1] for call in mock_socketio.emit.call_args_list
+                      if call.args[0] == 'script_output']
+
+            # Far fewer frames than lines, all addressed to the execution room
+            assert 0 < len(frames) < 500
+            assert all(call.kwargs['to'] == f'execution:{execution_id}'
+                       for call in mock_socketio.emit.call_args_list
+                       if call.args[0] == 'script_output')
+
+            offset = 0
+            for frame in frames:
+                assert frame['offset'] == offset
+                offset = frame['next_offset']
+
+            execution = execution_service.execution_adapter.get_by_id(execution_id)
+            assert execution.status == 'Success'
+            assert ''.join(frame['output'] for frame in frames) == execution.output
+    finally:
+        os.unlink(script_file.name)
+
+def test_read_since_returns_recent_output():
+    """Test that recent output can be read back from an offset"""
+    batcher = OutputBatcher(1, MagicMock(), flush_interval=60, flush_chars=1000)
+    batcher.write("hello ")
+    batcher.flush()
+    batcher.write("world")
+
+    # Pending output is flushed before reading
+    assert batcher.read_since(0) == (0, "hello world", 2)
+    assert batcher.read_since(3) == (3, "lo world", 2)
+    assert batcher.read_since(11) == (11, "", 2)
+
+def test_read_since_reports_output_no_longer_in_memory():
+    """Test that the start offset moves forward once old frames are discarded"""
+    batcher = OutputBatcher(1, MagicMock(), flush_interval=60, flush_chars=1000, replay_chars=5)
+    for text in ["aaaa", "bbbb", "cccc"]:
+        batcher.write(text)
+        batcher.flush()
+
+    start_offset, text, _ = batcher.read_since(0)
+    assert start_offset == 8
+    assert text == "cccc"
+
+def test_get_output_since_from_database(app):
+    """Test replaying output of a finished execution from the database"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        profile = create_aws_profile()
+        execution_id = execution_service.execution_adapter.create(script.id, profile.id, user.id)
+        execution_service.execution_adapter.append_output(execution_id, "0123456789")
+
+        frame = execution_service.get_output_since(execution_id, 4)
+
+        assert frame['offset'] == 4
+        assert frame['next_offset'] == 10
+        assert frame['output'] == "456789"
+        assert frame['skipped'] == 0
+        assert frame['replay'] is True
+
+        assert execution_service.get_output_since(9999, 0) is None
+
+def test_get_output_since_combines_database_and_memory(app):
+    """Test that output not yet written to the database is replayed from memory"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        profile = create_aws_profile()
+        execution_id = execution_service.execution_adapter.create(script.id, profile.id, user.id)
+        execution_service.execution_adapter.append_output(execution_id, "persisted|")
+
+        # Only the last frame is kept in memory
+        batcher = OutputBatcher(execution_id, MagicMock(), flush_interval=60, flush_chars=1000,
+                                start_offset=10, replay_chars=1)
+        register_batcher(batcher)
+        try:
+            batcher.write("live-1|")
+            batcher.flush()
+            execution_service.execution_adapter.append_output(execution_id, "live-1|")
+            batcher.write("live-2")
+
+            frame = execution_service.get_output_since(execution_id, 2)
+            missing = execution_service.get_output_since(execution_id, 20)
+        finally:
+            unregister_batcher(execution_id)
+
+        assert frame['offset'] == 2
+        assert frame['output'] == "rsisted|live-1|live-2"
+        assert frame['next_offset'] == 23
+        assert frame['seq'] == 2
+
+        # Served from memory alone
+        assert missing['offset'] == 20
+        assert missing['output'] == "e-2"
+
+def test_get_output_since_stops_at_end(app):
+    """Test reading a bounded range of output"""
+    with app.app_context():
+        user = create_user()
+        script = create_script(user_id=user.id)
+        profile = create_aws_profile()
+        execution_id = execution_service.execution_adapter.create(script.id, profile.id, user.id)
+        execution_service.execution_adapter.append_output(execution_id, "0123456789")
+
+        frame = execution_service.get_output_since(execution_id, 2, end=5)
+
+        assert frame['output'] == "234"
+        assert frame['next_offset'] == 5
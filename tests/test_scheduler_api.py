@@ -59,7 +59,8 @@ def test_get_schedules(app, auth_client):
             assert data['schedules'][1]['id'] == 2
             
             # Verify get_schedules was called with default parameters
-            mock_get_schedules.assert_called_once_with(False)
+            mock_get_schedules.assert_called_once_with(False, script_id=None, schedule_type=None, last_status=None,
+                                                      search=None, sort='created_at', order='desc')
 
 def test_get_schedules_include_disabled(app, auth_client):
     """Test get_schedules endpoint with include_disabled=true"""
@@ -79,7 +80,22 @@ def test_get_schedules_include_disabled(app, auth_client):
             assert len(data['schedules']) == 0
             
             # Verify get_schedules was called with include_disabled=True
-            mock_get_schedules.assert_called_once_with(True)
+            mock_get_schedules.assert_called_once_with(True, script_id=None, schedule_type=None, last_status=None,
+                                                      search=None, sort='created_at', order='desc')
+
+def test_get_schedules_filtered_and_sorted(app, auth_client):
+    """Test get_schedules endpoint with filters and sorting"""
+    with patch.object(scheduler_service, 'get_schedules', return_value=[]) as mock_get_schedules:
+        response = auth_client.get('/api/schedules?script_id=3&schedule_type=daily&last_status=Failed'
+                                   '&search=backup&sort=consecutive_failures&order=asc')
+    
+    assert response.status_code == 200
+    mock_get_schedules.assert_called_once_with(False, script_id=3, schedule_type='daily', last_status='Failed',
+                                               search='backup', sort='consecutive_failures', order='asc')
+    
+    response = auth_client.get('/api/schedules?sort=owner')
+    assert response.status_code == 400
+    assert 'sort' in response.json['message']
 
 def test_get_schedule_by_id(app, auth_client):
     """Test get_schedule_by_id endpoint"""
@@ -137,6 +153,53 @@ def test_get_schedule_not_found(app, auth_client):
             assert data['success'] is False
             assert 'not found' in data['message'].lower()
 
+def test_get_schedule_histogram(app, auth_client):
+    """Test schedule histogram endpoint"""
+    histogram = [0] * (24 * 60)
+    histogram[2 * 60] = 5
+    histogram[2 * 60 + 1] = 2
+    
+    with patch.object(scheduler_service, 'get_fire_histogram', return_value=histogram):
+        response = auth_client.get('/api/schedules/histogram')
+    
+    assert response.status_code == 200
+    data = response.json
+    assert data['success'] is True
+    assert data['histogram'] == [{'time': '02:00', 'count': 5}, {'time': '02:01', 'count': 2}]
+    assert data['total_runs'] == 7
+    assert data['peak'] == {'time': '02:00', 'count': 5}
+
+def test_get_schedule_forecast(app, auth_client):
+    """Test schedule forecast endpoint"""
+    forecast = {'start': '2025-01-01T00:00:00', 'hours': 12, 'total_runs': 0, 'peak': None,
+                'minutes': [], 'overload_windows': []}
+    
+    with patch.object(scheduler_service, 'get_forecast', return_value=forecast) as mock_get_forecast:
+        response = auth_client.get('/api/schedules/forecast?hours=12&threshold=5')
+    
+    assert response.status_code == 200
+    assert response.json == {'success': True, **forecast}
+    mock_get_forecast.assert_called_once_with(12, 5)
+    
+    response = auth_client.get('/api/schedules/forecast?hours=10000')
+    assert response.status_code == 400
+    assert response.json['success'] is False
+
+def test_get_scheduler_metrics(app, auth_client):
+    """Test scheduler metrics endpoint"""
+    metrics = {'hours': 6, 'global': {'runs': 0}, 'schedules': {}, 'executor': {'max_workers': 10}}
+    
+    with patch.object(scheduler_service, 'get_metrics', return_value=metrics) as mock_get_metrics:
+        response = auth_client.get('/api/scheduler/metrics?hours=6')
+    
+    assert response.status_code == 200
+    assert response.json == {'success': True, 'metrics': metrics}
+    mock_get_metrics.assert_called_once_with(6)
+    
+    response = auth_client.get('/api/scheduler/metrics?hours=0')
+    assert response.status_code == 400
+    assert response.json['success'] is False
+
 def test_create_schedule(app, auth_client):
     """Test create_schedule endpoint"""
     with app.app_context():
@@ -180,7 +243,11 @@ def test_create_schedule(app, auth_client):
                 user_id=1,  # from auth_client
                 schedule_type='daily',
                 schedule_value='12:00',
-                parameters=schedule_data['parameters']  # The API passes this directly
+                parameters=schedule_data['parameters'],  # The API passes this directly
+                balance=False,
+                misfire_policy=None,
+                misfire_grace_seconds=None,
+                max_catchup_runs=None
             )
 
 def test_create_schedule_missing_data(app, auth_client):
@@ -267,7 +334,10 @@ def test_update_schedule(app, auth_client):
                 schedule_type='interval',
                 schedule_value='8',
                 profile_id=2,
-                parameters=update_data['parameters']  # The API passes this directly
+                parameters=update_data['parameters'],  # The API passes this directly
+                misfire_policy=None,
+                misfire_grace_seconds=None,
+                max_catchup_runs=None
             )
 
 def test_update_schedule_empty_data(app, auth_client):
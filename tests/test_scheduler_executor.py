@@ -0,0 +1,42 @@
+import threading
+from datetime import datetime, timedelta
+from apscheduler.schedulers.background import BackgroundScheduler
+from app.services.scheduler_executor import InstrumentedThreadPoolExecutor, get_scheduled_run_time
+
+def test_jobs_see_their_planned_run_time():
+    """Test that a job can read the time it was planned to run at, and pool usage is counted"""
+    executor = InstrumentedThreadPoolExecutor(max_workers=2)
+    scheduler = BackgroundScheduler(executors={'default': executor})
+    scheduler.start()
+
+    started = threading.Event()
+    release = threading.Event()
+    run_times = []
+
+    def job():
+        run_times.append(get_scheduled_run_time())
+        started.set()
+        release.wait(5)
+
+    try:
+        planned = datetime.now() + timedelta(milliseconds=50)
+        scheduler.add_job(job, 'date', run_date=planned, id='timed-job')
+
+        assert started.wait(5)
+        stats = executor.get_stats()
+        assert stats['max_workers'] == 2
+        assert stats['running'] == 1
+        assert stats['saturation'] == 0.5
+
+        release.set()
+    finally:
+        release.set()
+        scheduler.shutdown(wait=True)
+
+    assert run_times[0].replace(tzinfo=None) == planned
+    assert executor.get_stats()['running'] == 0
+    assert executor.get_stats()['peak_running'] == 1
+    assert executor.get_stats()['submitted'] == 1
+
+    # Outside scheduled jobs there is no planned run time
+    assert get_scheduled_run_time() is None
@@ -96,9 +96,10 @@ def test_to_dict(app):
         aws_profile = create_aws_profile(user_id=user.id)
         
         # Create a schedule with all fields
-        next_run = datetime.now() + timedelta(hours=1)
+        # Timestamps are stored with millisecond precision
+        next_run = datetime.now().replace(microsecond=0) + timedelta(hours=1)
         next_run_str = next_run.isoformat()
-        last_run = datetime.now() - timedelta(hours=1)
+        last_run = datetime.now().replace(microsecond=0) - timedelta(hours=1)
         last_run_str = last_run.isoformat()
         start_timestamp = datetime.now().timestamp()
         
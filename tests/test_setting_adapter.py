@@ -0,0 +1,94 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from app.models.setting_orm import SettingORM
+from app.services.event_bus import event_bus
+from app.services.setting_adapter import SettingAdapter, SETTINGS_ROOM, SETTINGS_CHANGED_EVENT
+
+@pytest.fixture
+def adapter(app):
+    """Create a settings adapter with its own cache"""
+    with app.app_context():
+        yield SettingAdapter()
+
+def test_reads_are_served_from_one_load(adapter):
+    """Test that all settings are loaded once for any number of reads"""
+    with patch.object(SettingORM, 'get_all', wraps=SettingORM.get_all) as mock_get_all:
+        assert adapter.get('history_limit') == '10'
+        assert adapter.get('timezone') == 'UTC'
+        assert adapter.get('missing', 'default') == 'default'
+        assert adapter.get_all()['enable_ai_help'] == 'true'
+
+    assert mock_get_all.call_count == 1
+
+def test_writes_invalidate_cache(adapter):
+    """Test that writes through the adapter are visible to the next read"""
+    assert adapter.get('history_limit') == '10'
+
+    adapter.set('history_limit', '25')
+    assert adapter.get('history_limit') == '25'
+
+    adapter.update_multiple({'history_limit': '50', 'theme': 'dark'})
+    assert adapter.get('history_limit') == '50'
+    assert adapter.get('theme') == 'dark'
+
+    adapter.delete('theme')
+    assert adapter.get('theme') is None
+
+def test_write_during_load_leaves_snapshot_stale(adapter):
+    """Test that a snapshot loaded while a write happens is not kept"""
+    get_all = SettingORM.get_all
+
+    def load_then_write():
+        settings = get_all()
+        adapter.set('history_limit', '25')
+        return settings
+
+    with patch.object(SettingORM, 'get_all', side_effect=load_then_write):
+        assert adapter.get('history_limit') == '10'
+
+    assert adapter.get('history_limit') == '25'
+
+def test_max_age_reloads_snapshot(adapter):
+    """Test that the snapshot is reloaded once it is older than max_age"""
+    adapter.get('history_limit')
+
+    # Changed without going through this adapter, e.g. by another worker
+    SettingORM.set('history_limit', '25')
+    assert adapter.get('history_limit') == '10'
+
+    adapter.max_age = 0
+    assert adapter.get('history_limit') == '25'
+
+def test_typed_accessors(adapter):
+    """Test reading settings as integers and booleans"""
+    adapter.update_multiple({'limit': '15', 'bad_limit': 'many', 'flag': ' Yes ', 'off_flag': '0', 'bad_flag': 'maybe'})
+
+    assert adapter.get_int('limit') == 15
+    assert adapter.get_int('bad_limit', 10) == 10
+    assert adapter.get_int('missing', 10) == 10
+
+    assert adapter.get_bool('flag') is True
+    assert adapter.get_bool('off_flag', True) is False
+    assert adapter.get_bool('bad_flag', True) is True
+    assert adapter.get_bool('missing') is False
+
+def test_writes_are_announced_to_other_workers(adapter):
+    """Test that a write emits the settings change event"""
+    socketio = MagicMock()
+    adapter.set_socketio(socketio)
+
+    adapter.set('history_limit', '25')
+
+    socketio.emit.assert_called_once_with(SETTINGS_CHANGED_EVENT, {'origin': event_bus.bus_id}, to=SETTINGS_ROOM)
+
+def test_announcement_from_another_worker_invalidates_cache(adapter):
+    """Test that a change announced by another process is picked up"""
+    adapter.get('history_limit')
+    SettingORM.set('history_limit', '25')
+
+    # This process's own announcements are ignored
+    event_bus.publish(SETTINGS_CHANGED_EVENT, {'origin': event_bus.bus_id}, SETTINGS_ROOM)
+    assert adapter.get('history_limit') == '10'
+
+    event_bus.publish(SETTINGS_CHANGED_EVENT, {'origin': 'other-worker'}, SETTINGS_ROOM)
+    assert adapter.get('history_limit') == '25'
@@ -0,0 +1,114 @@
+import pytest
+from unittest.mock import patch, MagicMock
+from flask_socketio import SocketIO
+from app.routes.socket_events import register_socket_events
+from app.services.execution_service import execution_service, execution_room, DASHBOARD_ROOM
+
+@pytest.fixture
+def socketio(app):
+    """Create a SocketIO instance with the room handlers registered"""
+    socketio = SocketIO(app, async_mode='threading', manage_session=False)
+    register_socket_events(socketio)
+    return socketio
+
+@pytest.fixture
+def socket_client(socketio, app, auth_client):
+    """Create an authenticated Socket.IO test client"""
+    return socketio.test_client(app, flask_test_client=auth_client)
+
+def test_execution_room_name():
+    """Test room naming for executions"""
+    assert execution_room(42) == 'execution:42'
+    assert DASHBOARD_ROOM == 'dashboard'
+
+def test_join_execution_receives_only_its_output(socketio, socket_client):
+    """Test that output is only delivered to clients in the execution room"""
+    ack = socket_client.emit('join_execution', {'execution_id': 1}, callback=True)
+    assert ack == {'success': True}
+
+    socketio.emit('script_output', {'execution_id': 1, 'output': 'one'}, to=execution_room(1))
+    socketio.emit('script_output', {'execution_id': 2, 'output': 'two'}, to=execution_room(2))
+
+    received = socket_client.get_received()
+    outputs = [msg['args'][0]['output'] for msg in received if msg['name'] == 'script_output']
+    assert outputs == ['one']
+
+def test_leave_execution(socketio, socket_client):
+    """Test that leaving a room stops delivery"""
+    socket_client.emit('join_execution', {'execution_id': 1}, callback=True)
+    socket_client.emit('leave_execution', {'execution_id': 1}, callback=True)
+
+    socketio.emit('script_output', {'execution_id': 1, 'output': 'one'}, to=execution_room(1))
+
+    assert socket_client.get_received() == []
+
+def test_join_execution_requires_execution_id(socket_client):
+    """Test that joining without a valid execution ID is rejected"""
+    ack = socket_client.emit('join_execution', {'execution_id': 'abc'}, callback=True)
+    assert ack['success'] is False
+
+def test_join_requires_login(socketio, app, client):
+    """Test that unauthenticated clients cannot join rooms"""
+    socket_client = socketio.test_client(app, flask_test_client=client)
+
+    ack = socket_client.emit('join_dashboard', callback=True)
+    assert ack['success'] is False
+
+    socketio.emit('script_status_update', {'execution_id': 1, 'status': 'Running'}, to=DASHBOARD_ROOM)
+    assert socket_client.get_received() == []
+
+def test_dashboard_receives_status_once(socketio, socket_client):
+    """Test that status updates reach the dashboard room once per client"""
+    socket_client.emit('join_dashboard', callback=True)
+    socket_client.emit('join_execution', {'execution_id': 5}, callback=True)
+
+    with patch('app.services.execution_service.socketio', socketio):
+        execution_service._emit_status_update(5, 'Success', script_id=3)
+
+    received = socket_client.get_received()
+    assert len(received) == 1
+    assert received[0]['name'] == 'script_status_update'
+    assert received[0]['args'][0] == {'execution_id': 5, 'status': 'Success', 'script_id': 3}
+
+def test_emit_status_update_targets_rooms():
+    """Test that status updates are addressed to the dashboard and execution rooms"""
+    mock_socketio = MagicMock()
+
+    with patch('app.services.execution_service.socketio', mock_socketio), \
+         patch('app.services.execution_service.dashboard_service') as mock_dashboard:
+        mock_dashboard.record_status.return_value = None
+        execution_service._emit_status_update(7, 'Running')
+
+    mock_socketio.emit.assert_called_once_with(
+        'script_status_update',
+        {'execution_id': 7, 'status': 'Running'},
+        to=[DASHBOARD_ROOM, 'execution:7']
+    )
+
+def test_join_execution_with_offset_replays_output(socket_client):
+    """Test that joining with an offset returns the missing output in the acknowledgement"""
+    replay = {'execution_id': 1, 'offset': 3, 'next_offset': 5, 'output': 'lo', 'replay': True}
+
+    with patch.object(execution_service, 'get_output_since', return_value=replay) as mock_get:
+        ack = socket_client.emit('join_execution', {'execution_id': 1, 'offset': 3}, callback=True)
+
+    mock_get.assert_called_once_with(1, 3)
+    assert ack == {'success': True, 'replay': replay}
+
+def test_join_execution_with_invalid_offset(socket_client):
+    """Test that an invalid offset is rejected"""
+    ack = socket_client.emit('join_execution', {'execution_id': 1, 'offset': 'abc'}, callback=True)
+    assert ack == {'success': False, 'message': 'Invalid offset'}
+
+def test_emit_status_update_pushes_dashboard_delta():
+    """Test that the dashboard delta of a transition is sent to the dashboard room"""
+    mock_socketio = MagicMock()
+    delta = {'execution': {'id': 7, 'status': 'Success'}, 'counts': {'date': '2024-01-01', 'changes': {}}}
+
+    with patch('app.services.execution_service.socketio', mock_socketio), \
+         patch('app.services.execution_service.dashboard_service') as mock_dashboard:
+        mock_dashboard.record_status.return_value = delta
+        execution_service._emit_status_update(7, 'Success', previous_status='Running')
+
+    mock_dashboard.record_status.assert_called_once_with(7, 'Success', 'Running')
+    mock_socketio.emit.assert_called_with('dashboard_update', delta, to=DASHBOARD_ROOM)
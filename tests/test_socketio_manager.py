@@ -0,0 +1,82 @@
+import time
+import pytest
+import socketio as socketio_lib
+from unittest.mock import patch
+from flask import Flask
+from flask_socketio import SocketIO
+from app.utils.socketio_manager import (
+    create_client_manager, EventBusManager, KombuEventBusManager
+)
+from app.services.execution_service import execution_room
+
+def _make_app(message_queue, channel='test-channel'):
+    """Create a bare Flask app with message queue settings"""
+    app = Flask(__name__)
+    app.config['SECRET_KEY'] = 'test'
+    app.config['SOCKETIO_MESSAGE_QUEUE'] = message_queue
+    app.config['SOCKETIO_CHANNEL'] = channel
+    return app
+
+def test_no_message_queue_uses_in_process_manager():
+    """Test that the in-process manager is used without a message queue"""
+    manager = create_client_manager(_make_app(''))
+
+    assert type(manager) is EventBusManager
+
+def test_redis_url_creates_redis_manager():
+    """Test that redis URLs select the Redis manager"""
+    with patch('app.utils.socketio_manager.RedisEventBusManager') as mock_manager:
+        mock_manager.__name__ = 'RedisEventBusManager'
+        manager = create_client_manager(_make_app('redis://localhost:6379/0'))
+
+    mock_manager.assert_called_once_with('redis://localhost:6379/0', channel='test-channel')
+    assert manager is mock_manager.return_value
+
+def test_other_url_creates_kombu_manager():
+    """Test that other URLs select the Kombu manager"""
+    pytest.importorskip('kombu')
+
+    manager = create_client_manager(_make_app('memory://'))
+
+    assert isinstance(manager, KombuEventBusManager)
+    assert manager.channel == 'test-channel'
+
+def test_emit_reaches_client_of_another_worker():
+    """Test that an emit from one server is delivered to a client connected to another"""
+    pytest.importorskip('kombu')
+
+    # Two servers sharing a queue stand in for two workers
+    worker_app = _make_app('memory://', channel='test-workers')
+    worker = SocketIO(worker_app, async_mode='threading',
+                      client_manager=create_client_manager(worker_app))
+
+    web_app = _make_app('memory://', channel='test-workers')
+    web = socketio_lib.Server(async_mode='threading', client_manager=create_client_manager(web_app))
+
+    # A client connected to the web server only, in the execution room
+    sid = web.manager.connect('eio-client', '/')
+    web.manager.enter_room(sid, '/', execution_room(3))
+
+    sent = []
+
+    def send_eio_packet(eio_sid, eio_pkt):
+        pkt = socketio_lib.packet.Packet(encoded_packet=eio_pkt.data)
+        sent.append((eio_sid, pkt.data))
+
+    def send_packet(eio_sid, pkt):
+        sent.append((eio_sid, pkt.data))
+
+    # Output frames are sent with an acknowledgement request, other events pre-encoded
+    with patch.object(web, '_send_eio_packet', side_effect=send_eio_packet), \
+         patch.object(web, '_send_packet', side_effect=send_packet):
+        web.manager.initialize()
+        time.sleep(0.2)
+
+        worker.emit('script_output', {'execution_id': 3, 'output': 'hello'}, to=execution_room(3))
+
+        for _ in range(50):
+            if sent:
+                break
+            time.sleep(0.1)
+
+    assert sent == [('eio-client', ['script_output', {'execution_id': 3, 'output': 'hello'}])]
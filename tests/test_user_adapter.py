@@ -0,0 +1,93 @@
+import pytest
+from unittest.mock import patch
+from flask import Blueprint
+from app.auth.login_required import login_required
+from app.models.user_orm import UserORM
+from app.services.user_adapter import UserAdapter, user_adapter
+from tests.utils import create_user
+
+@pytest.fixture
+def adapter(app):
+    """Create a user adapter with its own cache"""
+    with app.app_context():
+        yield UserAdapter()
+
+def test_session_user_is_cached(adapter):
+    """Test that repeated lookups of a logged-in user hit the database once"""
+    user = create_user(username='cached_user')
+
+    with patch.object(UserORM, 'get_by_id', wraps=UserORM.get_by_id) as mock_get_by_id:
+        first = adapter.get_session_user(user.id)
+        second = adapter.get_session_user(user.id)
+
+    assert first['username'] == second['username'] == 'cached_user'
+    assert mock_get_by_id.call_count == 1
+
+def test_missing_user_is_not_cached(adapter):
+    """Test that a missing user is looked up again"""
+    assert adapter.get_session_user(9999) is None
+
+    with patch.object(UserORM, 'get_by_id', return_value=None) as mock_get_by_id:
+        assert adapter.get_session_user(9999) is None
+
+    mock_get_by_id.assert_called_once_with(9999)
+
+@pytest.mark.parametrize('change', [
+    lambda adapter, user_id: adapter.delete(user_id),
+    lambda adapter, user_id: adapter.toggle_admin(user_id, False),
+    lambda adapter, user_id: adapter.set_password(user_id, 'new-password'),
+])
+def test_user_changes_invalidate_cache(adapter, change):
+    """Test that deleting a user or changing their password or admin status drops the cached entry"""
+    user = create_user(username='changed_user', is_admin=1)
+    adapter.get_session_user(user.id)
+
+    change(adapter, user.id)
+
+    with patch.object(UserORM, 'get_by_id', wraps=UserORM.get_by_id) as mock_get_by_id:
+        adapter.get_session_user(user.id)
+
+    mock_get_by_id.assert_called_once_with(user.id)
+
+def test_cache_expires_after_ttl(adapter):
+    """Test that changes made elsewhere are picked up once the entry expires"""
+    user = create_user(username='expiring_user', is_admin=1)
+    adapter.get_session_user(user.id)
+
+    # Changed without going through this adapter, e.g. by another worker
+    user.toggle_admin(0)
+    assert adapter.get_session_user(user.id)['is_admin'] == 1
+
+    adapter.cache_ttl = 0
+    assert adapter.get_session_user(user.id)['is_admin'] == 0
+
+def test_login_required_does_not_query_cached_user(app, client):
+    """Test that authenticated requests are served without a user lookup"""
+    bp = Blueprint('test_bp', __name__)
+
+    @bp.route('/protected')
+    @login_required
+    def protected_route():
+        return 'Protected Content'
+
+    app.register_blueprint(bp)
+
+    with app.app_context():
+        user = create_user(username='request_user')
+    with client.session_transaction() as sess:
+        sess['user_id'] = user.id
+
+    client.get('/protected')
+    with patch.object(UserORM, 'get_by_id') as mock_get_by_id:
+        response = client.get('/protected')
+
+    assert response.status_code == 200
+    mock_get_by_id.assert_not_called()
+
+    # Deleting the user ends the session on the next request
+    with app.app_context():
+        user_adapter.delete(user.id)
+    response = client.get('/protected')
+
+    assert response.status_code == 302
+    assert '/login' in response.location